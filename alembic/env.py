@@ -1,11 +1,13 @@
 import asyncio
 from logging.config import fileConfig
+from typing import Any
 
 from sqlalchemy import Connection, engine_from_config, pool
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from alembic import context
 from app.core.config import get_settings
+from app.core.plates import PLATE_TRGM_INDEX
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -29,6 +31,17 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_object(
+    object: Any, name: str | None, type_: str, reflected: bool, compare_to: Any
+) -> bool:
+    # monthly partitions of application_event are created by the app,
+    # see app/core/application_events.py
+    if type_ == "table" and reflected and compare_to is None and name is not None:
+        return not name.startswith("application_event_")
+    # needs pg_trgm, created by migration only, see app/core/plates.py
+    return not (type_ == "index" and name == PLATE_TRGM_INDEX)
+
+
 def get_database_uri() -> str:
     return get_settings().sqlalchemy_database_uri.render_as_string(hide_password=False)
 
@@ -50,6 +63,7 @@ def run_migrations_offline() -> None:
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_object=include_object,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
@@ -61,7 +75,10 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection: Connection | None) -> None:
     context.configure(
-        connection=connection, target_metadata=target_metadata, compare_type=True
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,38 @@
+"""Application feed keyset index
+
+Revision ID: 8723e2c87246
+Revises: 655303341c42
+Create Date: 2026-10-18 11:30:12.402133
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8723e2c87246"
+down_revision = "655303341c42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_application_created_at_id",
+            "application",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_application_created_at_id",
+            table_name="application",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
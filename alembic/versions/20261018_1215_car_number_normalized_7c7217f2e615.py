@@ -0,0 +1,72 @@
+"""Car normalized plate number
+
+Revision ID: 7c7217f2e615
+Revises: 8723e2c87246
+Create Date: 2026-10-18 12:15:40.118022
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c7217f2e615"
+down_revision = "8723e2c87246"
+branch_labels = None
+depends_on = None
+
+# frozen copy of app.core.plates.plate_sql_expression("number")
+NUMBER_NORMALIZED_EXPRESSION = (
+    "translate(number, "
+    "'АВЕКМНОРСТУХавекмнорстухabcdefghijklmnopqrstuvwxyz -._', "
+    "'ABEKMHOPCTYXABEKMHOPCTYXABCDEFGHIJKLMNOPQRSTUVWXYZ')"
+)
+
+
+def upgrade():
+    # stored generated column, existing rows are backfilled by table rewrite:
+    # car is locked ACCESS EXCLUSIVE (no reads or writes) until every row is
+    # rewritten, on a table of millions of rows run it in a maintenance window
+    op.add_column(
+        "car",
+        sa.Column(
+            "number_normalized",
+            sa.String(length=256, collation="C"),
+            sa.Computed(NUMBER_NORMALIZED_EXPRESSION, persisted=True),
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_car_number_normalized"),
+            "car",
+            ["number_normalized"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            op.f("ix_application_car_id"),
+            "application",
+            ["car_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f("ix_application_car_id"),
+            table_name="application",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            op.f("ix_car_number_normalized"),
+            table_name="car",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("car", "number_normalized")
@@ -0,0 +1,113 @@
+"""Hot lookup indexes
+
+Revision ID: 9951f0d6eb4f
+Revises: 7c7217f2e615
+Create Date: 2026-10-18 13:10:05.551870
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9951f0d6eb4f"
+down_revision = "7c7217f2e615"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_application_client_id_created_at",
+            "application",
+            ["client_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_application_car_id_status",
+            "application",
+            ["car_id", "status"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # superseded by ix_application_car_id_status
+        op.drop_index(
+            "ix_application_car_id",
+            table_name="application",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.create_index(
+            "ix_car_client_id_not_deleted",
+            "car",
+            ["client_id"],
+            unique=False,
+            postgresql_where=sa.text("NOT is_deleted"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_refresh_token_user_id",
+            "refresh_token",
+            ["user_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_user_account_role",
+            "user_account",
+            ["role"],
+            unique=False,
+            postgresql_include=["user_name"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_user_account_role",
+            table_name="user_account",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_refresh_token_user_id",
+            table_name="refresh_token",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_car_client_id_not_deleted",
+            table_name="car",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.create_index(
+            "ix_application_car_id",
+            "application",
+            ["car_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_application_car_id_status",
+            table_name="application",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_application_client_id_created_at",
+            table_name="application",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
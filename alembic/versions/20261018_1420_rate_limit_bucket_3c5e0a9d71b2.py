@@ -0,0 +1,33 @@
+"""Rate limit bucket
+
+Revision ID: 3c5e0a9d71b2
+Revises: 9951f0d6eb4f
+Create Date: 2026-10-18 14:20:41.203118
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c5e0a9d71b2"
+down_revision = "9951f0d6eb4f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # UNLOGGED, buckets are short lived and may be lost on crash
+    op.create_table(
+        "rate_limit_bucket",
+        sa.Column("key", sa.String(length=256), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade():
+    op.drop_table("rate_limit_bucket")
@@ -0,0 +1,69 @@
+"""Refresh token hash
+
+Revision ID: b4e91c07d25a
+Revises: 3c5e0a9d71b2
+Create Date: 2026-10-18 15:10:12.480913
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b4e91c07d25a"
+down_revision = "3c5e0a9d71b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # dead tokens are never needed again, no point hashing them
+    op.execute(
+        "DELETE FROM refresh_token WHERE used OR exp <= extract(epoch FROM now())"
+    )
+    op.add_column(
+        "refresh_token",
+        sa.Column("token_hash", sa.LargeBinary(length=32), nullable=True),
+    )
+    op.execute(
+        "UPDATE refresh_token SET token_hash = sha256(convert_to(refresh_token, 'UTF8'))"
+    )
+    op.alter_column("refresh_token", "token_hash", nullable=False)
+    op.create_index(
+        op.f("ix_refresh_token_token_hash"),
+        "refresh_token",
+        ["token_hash"],
+        unique=True,
+    )
+    op.drop_index(op.f("ix_refresh_token_refresh_token"), table_name="refresh_token")
+    op.drop_column("refresh_token", "refresh_token")
+    op.create_index(
+        op.f("ix_refresh_token_exp"), "refresh_token", ["exp"], unique=False
+    )
+    op.create_index(
+        "ix_refresh_token_used",
+        "refresh_token",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("used"),
+    )
+
+
+def downgrade():
+    # raw tokens cannot be recovered from hashes, users have to log in again
+    op.execute("DELETE FROM refresh_token")
+    op.drop_index("ix_refresh_token_used", table_name="refresh_token")
+    op.drop_index(op.f("ix_refresh_token_exp"), table_name="refresh_token")
+    op.add_column(
+        "refresh_token",
+        sa.Column("refresh_token", sa.String(length=512), nullable=False),
+    )
+    op.create_index(
+        op.f("ix_refresh_token_refresh_token"),
+        "refresh_token",
+        ["refresh_token"],
+        unique=True,
+    )
+    op.drop_index(op.f("ix_refresh_token_token_hash"), table_name="refresh_token")
+    op.drop_column("refresh_token", "token_hash")
@@ -0,0 +1,37 @@
+"""Token revocation
+
+Revision ID: 5d0f6b2a8e17
+Revises: b4e91c07d25a
+Create Date: 2026-10-18 16:00:27.905316
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d0f6b2a8e17"
+down_revision = "b4e91c07d25a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "token_revocation",
+        sa.Column("sub", sa.String(length=256), nullable=False),
+        sa.Column("revoked_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("sub"),
+    )
+    op.create_index(
+        op.f("ix_token_revocation_revoked_at"),
+        "token_revocation",
+        ["revoked_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_token_revocation_revoked_at"), table_name="token_revocation")
+    op.drop_table("token_revocation")
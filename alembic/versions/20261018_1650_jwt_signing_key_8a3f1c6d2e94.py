@@ -0,0 +1,43 @@
+"""JWT signing key
+
+Revision ID: 8a3f1c6d2e94
+Revises: 5d0f6b2a8e17
+Create Date: 2026-10-18 16:50:12.408113
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8a3f1c6d2e94"
+down_revision = "5d0f6b2a8e17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "jwt_signing_key",
+        sa.Column("kid", sa.String(length=64), nullable=False),
+        sa.Column("algorithm", sa.String(length=16), nullable=False),
+        sa.Column("private_key", sa.Text(), nullable=False),
+        sa.Column(
+            "public_jwk", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.Column("created_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("kid"),
+    )
+    op.create_index(
+        op.f("ix_jwt_signing_key_created_at"),
+        "jwt_signing_key",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_jwt_signing_key_created_at"), table_name="jwt_signing_key")
+    op.drop_table("jwt_signing_key")
@@ -0,0 +1,47 @@
+"""Application work queues
+
+Revision ID: e27b4d9c1a06
+Revises: 8a3f1c6d2e94
+Create Date: 2026-10-18 18:00:41.572930
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e27b4d9c1a06"
+down_revision = "8a3f1c6d2e94"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_application_diag_queue",
+        "application",
+        [sa.text("priority DESC"), "arrival_time", "created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'DIAGNOSTIC' AND diag_id IS NULL"),
+    )
+    op.create_index(
+        "ix_application_repair_queue",
+        "application",
+        [sa.text("priority DESC"), "arrival_time", "created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'REPAIR' AND mechanic_id IS NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_application_repair_queue",
+        table_name="application",
+        postgresql_where=sa.text("status = 'REPAIR' AND mechanic_id IS NULL"),
+    )
+    op.drop_index(
+        "ix_application_diag_queue",
+        table_name="application",
+        postgresql_where=sa.text("status = 'DIAGNOSTIC' AND diag_id IS NULL"),
+    )
@@ -0,0 +1,91 @@
+"""Application priority smallint
+
+Revision ID: 7c1e5a3f9b28
+Revises: e27b4d9c1a06
+Create Date: 2026-10-18 18:30:08.114702
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c1e5a3f9b28"
+down_revision = "e27b4d9c1a06"
+branch_labels = None
+depends_on = None
+
+# Priority member name -> value, as of this migration
+PRIORITY_VALUES = {"HIGH": 1, "MEDIUM": 2, "LOW": 3}
+QUEUE_INDEXES = {
+    "ix_application_diag_queue": "status = 'DIAGNOSTIC' AND diag_id IS NULL",
+    "ix_application_repair_queue": "status = 'REPAIR' AND mechanic_id IS NULL",
+}
+
+
+def _drop_queue_indexes():
+    for name, where in QUEUE_INDEXES.items():
+        op.drop_index(name, table_name="application", postgresql_where=sa.text(where))
+
+
+def _create_queue_indexes(priority):
+    for name, where in QUEUE_INDEXES.items():
+        op.create_index(
+            name,
+            "application",
+            [priority, "arrival_time", "created_at", "id"],
+            unique=False,
+            postgresql_where=sa.text(where),
+        )
+
+
+def upgrade():
+    _drop_queue_indexes()
+    when_name = " ".join(
+        f"WHEN '{name}' THEN {value}" for name, value in PRIORITY_VALUES.items()
+    )
+    op.alter_column(
+        "application",
+        "priority",
+        existing_type=sa.Enum(*PRIORITY_VALUES, name="priority"),
+        type_=sa.SmallInteger(),
+        existing_nullable=False,
+        postgresql_using=f"CASE priority {when_name} END",
+    )
+    sa.Enum(name="priority").drop(op.get_bind(), checkfirst=False)
+    op.create_check_constraint(
+        "ck_application_priority",
+        "application",
+        f"priority IN ({', '.join(str(v) for v in PRIORITY_VALUES.values())})",
+    )
+    op.create_index(
+        "ix_application_status_priority_arrival_time",
+        "application",
+        ["status", "priority", "arrival_time"],
+        unique=False,
+    )
+    _create_queue_indexes("priority")
+
+
+def downgrade():
+    _drop_queue_indexes()
+    op.drop_index(
+        "ix_application_status_priority_arrival_time", table_name="application"
+    )
+    op.drop_constraint("ck_application_priority", "application", type_="check")
+    priority_enum = sa.Enum("LOW", "MEDIUM", "HIGH", name="priority")
+    priority_enum.create(op.get_bind(), checkfirst=False)
+    when_value = " ".join(
+        f"WHEN {value} THEN '{name}'::priority"
+        for name, value in PRIORITY_VALUES.items()
+    )
+    op.alter_column(
+        "application",
+        "priority",
+        existing_type=sa.SmallInteger(),
+        type_=priority_enum,
+        existing_nullable=False,
+        postgresql_using=f"CASE priority {when_value} END",
+    )
+    _create_queue_indexes(sa.text("priority DESC"))
@@ -0,0 +1,120 @@
+"""Application workload
+
+Revision ID: 3b9d2f6e0c45
+Revises: 7c1e5a3f9b28
+Create Date: 2026-10-18 19:00:12.804316
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3b9d2f6e0c45"
+down_revision = "7c1e5a3f9b28"
+branch_labels = None
+depends_on = None
+
+# frozen copy of app.core.workload.workload_ddl()
+WORKLOAD_DDL = [
+    """CREATE FUNCTION application_workload_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO application_workload AS w (user_id, status, diag_count, mechanic_count)
+    SELECT user_id, status, sum(diag_count), sum(mechanic_count)
+    FROM (
+        SELECT diag_id, status, 1, 0 FROM new_rows WHERE diag_id IS NOT NULL
+        UNION ALL
+        SELECT mechanic_id, status, 0, 1 FROM new_rows WHERE mechanic_id IS NOT NULL
+    ) AS delta (user_id, status, diag_count, mechanic_count)
+    GROUP BY user_id, status
+    HAVING sum(diag_count) <> 0 OR sum(mechanic_count) <> 0
+    ORDER BY user_id, status
+    ON CONFLICT (user_id, status) DO UPDATE SET
+        diag_count = w.diag_count + excluded.diag_count,
+        mechanic_count = w.mechanic_count + excluded.mechanic_count;
+    RETURN NULL;
+END
+$$""",
+    "CREATE TRIGGER application_workload_insert AFTER INSERT ON application REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION application_workload_insert()",
+    """CREATE FUNCTION application_workload_update() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO application_workload AS w (user_id, status, diag_count, mechanic_count)
+    SELECT user_id, status, sum(diag_count), sum(mechanic_count)
+    FROM (
+        SELECT diag_id, status, -1, 0 FROM old_rows WHERE diag_id IS NOT NULL
+        UNION ALL
+        SELECT mechanic_id, status, 0, -1 FROM old_rows WHERE mechanic_id IS NOT NULL
+        UNION ALL
+        SELECT diag_id, status, 1, 0 FROM new_rows WHERE diag_id IS NOT NULL
+        UNION ALL
+        SELECT mechanic_id, status, 0, 1 FROM new_rows WHERE mechanic_id IS NOT NULL
+    ) AS delta (user_id, status, diag_count, mechanic_count)
+    GROUP BY user_id, status
+    HAVING sum(diag_count) <> 0 OR sum(mechanic_count) <> 0
+    ORDER BY user_id, status
+    ON CONFLICT (user_id, status) DO UPDATE SET
+        diag_count = w.diag_count + excluded.diag_count,
+        mechanic_count = w.mechanic_count + excluded.mechanic_count;
+    RETURN NULL;
+END
+$$""",
+    "CREATE TRIGGER application_workload_update AFTER UPDATE ON application REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION application_workload_update()",
+    """CREATE FUNCTION application_workload_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO application_workload AS w (user_id, status, diag_count, mechanic_count)
+    SELECT user_id, status, sum(diag_count), sum(mechanic_count)
+    FROM (
+        SELECT diag_id, status, -1, 0 FROM old_rows WHERE diag_id IS NOT NULL
+        UNION ALL
+        SELECT mechanic_id, status, 0, -1 FROM old_rows WHERE mechanic_id IS NOT NULL
+    ) AS delta (user_id, status, diag_count, mechanic_count)
+    GROUP BY user_id, status
+    HAVING sum(diag_count) <> 0 OR sum(mechanic_count) <> 0
+    ORDER BY user_id, status
+    ON CONFLICT (user_id, status) DO UPDATE SET
+        diag_count = w.diag_count + excluded.diag_count,
+        mechanic_count = w.mechanic_count + excluded.mechanic_count;
+    RETURN NULL;
+END
+$$""",
+    "CREATE TRIGGER application_workload_delete AFTER DELETE ON application REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION application_workload_delete()",
+]
+
+BACKFILL = """
+INSERT INTO application_workload (user_id, status, diag_count, mechanic_count)
+SELECT user_id, status, sum(diag_count), sum(mechanic_count)
+    FROM (
+        SELECT diag_id, status, 1, 0 FROM application WHERE diag_id IS NOT NULL
+        UNION ALL
+        SELECT mechanic_id, status, 0, 1 FROM application WHERE mechanic_id IS NOT NULL
+    ) AS delta (user_id, status, diag_count, mechanic_count)
+    GROUP BY user_id, status"""
+
+
+def upgrade():
+    op.create_table(
+        "application_workload",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="status", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("diag_count", sa.Integer(), nullable=False),
+        sa.Column("mechanic_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "status"),
+    )
+    # triggers lock application against writes until commit, so backfill
+    # counts exactly the rows they did not see
+    for statement in WORKLOAD_DDL:
+        op.execute(statement)
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    for operation in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER application_workload_{operation} ON application")
+        op.execute(f"DROP FUNCTION application_workload_{operation}()")
+    op.drop_table("application_workload")
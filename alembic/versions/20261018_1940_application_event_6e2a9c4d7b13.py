@@ -0,0 +1,81 @@
+"""Application event log
+
+Revision ID: 6e2a9c4d7b13
+Revises: 3b9d2f6e0c45
+Create Date: 2026-10-18 19:40:27.115842
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6e2a9c4d7b13"
+down_revision = "3b9d2f6e0c45"
+branch_labels = None
+depends_on = None
+
+# frozen copy of app.core.application_events.event_trigger_ddl()
+EVENT_TRIGGER_DDL = [
+    """CREATE FUNCTION application_event_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO application_event (app_id, from_status, to_status, created_at)
+    SELECT id, NULL::status, status, created_at FROM new_rows
+    ORDER BY 1;
+    RETURN NULL;
+END
+$$""",
+    "CREATE TRIGGER application_event_insert AFTER INSERT ON application REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION application_event_insert()",
+    """CREATE FUNCTION application_event_update() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO application_event (app_id, from_status, to_status, created_at)
+    SELECT new_rows.id, old_rows.status, new_rows.status, now() FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id WHERE new_rows.status <> old_rows.status
+    ORDER BY 1;
+    RETURN NULL;
+END
+$$""",
+    "CREATE TRIGGER application_event_update AFTER UPDATE ON application REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION application_event_update()",
+]
+
+
+def upgrade():
+    status_type = postgresql.ENUM(name="status", create_type=False)
+    op.create_table(
+        "application_event",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("app_id", sa.BigInteger(), nullable=False),
+        sa.Column("from_status", status_type, nullable=True),
+        sa.Column("to_status", status_type, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_application_event_app_id_created_at",
+        "application_event",
+        ["app_id", "created_at"],
+        unique=False,
+    )
+    # monthly partitions are created by the app on start
+    op.execute(
+        "CREATE TABLE application_event_default PARTITION OF application_event DEFAULT"
+    )
+    for statement in EVENT_TRIGGER_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    for operation in ("insert", "update"):
+        op.execute(f"DROP TRIGGER application_event_{operation} ON application")
+        op.execute(f"DROP FUNCTION application_event_{operation}()")
+    op.drop_index(
+        "ix_application_event_app_id_created_at", table_name="application_event"
+    )
+    op.drop_table("application_event")
@@ -0,0 +1,38 @@
+"""Arrival booking
+
+Revision ID: 9f4c1e7a2d58
+Revises: 6e2a9c4d7b13
+Create Date: 2026-10-18 20:10:53.226417
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9f4c1e7a2d58"
+down_revision = "6e2a9c4d7b13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing arrival_time values were never checked against bays,
+    # they are not turned into bookings
+    op.create_table(
+        "arrival_booking",
+        sa.Column("app_id", sa.BigInteger(), nullable=False),
+        sa.Column("slot_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("bay", sa.SmallInteger(), nullable=False),
+        sa.CheckConstraint("bay >= 1", name="ck_arrival_booking_bay"),
+        sa.ForeignKeyConstraint(["app_id"], ["application.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("app_id"),
+        sa.UniqueConstraint(
+            "slot_start", "bay", name="uq_arrival_booking_slot_start_bay"
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("arrival_booking")
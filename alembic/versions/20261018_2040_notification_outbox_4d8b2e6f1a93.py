@@ -0,0 +1,82 @@
+"""Notification outbox
+
+Revision ID: 4d8b2e6f1a93
+Revises: 9f4c1e7a2d58
+Create Date: 2026-10-18 20:40:12.604318
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4d8b2e6f1a93"
+down_revision = "9f4c1e7a2d58"
+branch_labels = None
+depends_on = None
+
+# frozen copy of app.core.notifications.OUTBOX_TRIGGER_DDL
+OUTBOX_TRIGGER_DDL = [
+    """CREATE FUNCTION notification_outbox_update() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO notification_outbox (client_id, app_id, status)
+    SELECT new_rows.client_id, new_rows.id, new_rows.status
+    FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+    WHERE new_rows.status <> old_rows.status
+    ORDER BY new_rows.id;
+    IF FOUND THEN
+        PERFORM pg_notify('notification_outbox', '');
+    END IF;
+    RETURN NULL;
+END
+$$""",
+    "CREATE TRIGGER notification_outbox_update AFTER UPDATE ON application REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notification_outbox_update()",
+]
+
+
+def upgrade():
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("client_id", sa.BigInteger(), nullable=False),
+        sa.Column("app_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "status", postgresql.ENUM(name="status", create_type=False), nullable=False
+        ),
+        sa.Column(
+            "attempts", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_notification_outbox_due",
+        "notification_outbox",
+        ["next_attempt_at"],
+        unique=False,
+        postgresql_where=sa.text("failed_at IS NULL"),
+    )
+    for statement in OUTBOX_TRIGGER_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER notification_outbox_update ON application")
+    op.execute("DROP FUNCTION notification_outbox_update()")
+    op.drop_index("ix_notification_outbox_due", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
@@ -0,0 +1,38 @@
+"""Car plate trigram index
+
+Revision ID: 8e3f1c5a7b24
+Revises: 4d8b2e6f1a93
+Create Date: 2026-10-18 21:10:37.482913
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8e3f1c5a7b24"
+down_revision = "4d8b2e6f1a93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # plate search is substring LIKE, see app/core/plates.py, without pg_trgm
+    # installed on the server it stays a scan of car
+    available = op.get_bind().scalar(
+        sa.text("SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    )
+    if not available:
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_car_number_normalized_trgm "
+            "ON car USING gin (number_normalized gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_car_number_normalized_trgm")
@@ -0,0 +1,39 @@
+"""Token revocation time with fraction of second
+
+Revision ID: 2c7d9e4b6a15
+Revises: 8e3f1c5a7b24
+Create Date: 2026-10-18 21:40:19.276540
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "2c7d9e4b6a15"
+down_revision = "8e3f1c5a7b24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column(
+        "token_revocation",
+        "revoked_at",
+        existing_type=sa.Integer(),
+        type_=sa.Float(),
+        existing_nullable=False,
+    )
+
+
+def downgrade():
+    # rounded up, tokens of the revocation second stay revoked
+    op.alter_column(
+        "token_revocation",
+        "revoked_at",
+        existing_type=sa.Float(),
+        type_=sa.Integer(),
+        existing_nullable=False,
+        postgresql_using="ceil(revoked_at)::integer",
+    )
@@ -4,3 +4,12 @@ REFRESH_TOKEN_NOT_FOUND = "Refresh token not found"
 REFRESH_TOKEN_EXPIRED = "Refresh token expired"
 REFRESH_TOKEN_ALREADY_USED = "Refresh token already used"
 EMAIL_ADDRESS_ALREADY_USED = "Cannot use this email address"
+APPLICATION_NOT_FOUND = "Application not found"
+LOGIN_RATE_LIMITED = "Too many login attempts, try again later"
+ROLE_FORBIDDEN = "Not enough permissions"
+ROLE_CLAIM_TOO_OLD = "Token too old for role based access, refresh it"
+NO_APPLICATION_TO_CLAIM = "No application waiting in queue"
+INVALID_STATUS_TRANSITION = "Application status cannot be changed to requested one"
+ARRIVAL_TIME_NOT_SLOT = "Arrival time is not a future slot of working hours"
+ARRIVAL_SLOT_FULL = "No free bay at this arrival time"
+ASSIGNEE_NOT_FOUND = "Assigned user not found"
@@ -1,11 +1,18 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api import api_messages
-from app.api.endpoints import auth, users, client, admin, superuser, diagnostic, mechanic
+from app.api import api_messages, deps
+from app.api.endpoints import auth, users, client, admin, superuser, diagnostic, mechanic, imports, well_known, board
+from app.models import Role
 
 auth_router = APIRouter()
 auth_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 
+# public, outside api_router and its 401/403 responses
+well_known_router = APIRouter()
+well_known_router.include_router(
+    well_known.router, prefix="/.well-known", tags=["well-known"]
+)
+
 api_router = APIRouter(
     responses={
         401: {
@@ -25,16 +32,56 @@ api_router = APIRouter(
                             "summary": api_messages.JWT_ERROR_USER_REMOVED,
                             "value": {"detail": api_messages.JWT_ERROR_USER_REMOVED},
                         },
+                        "role claim too old": {
+                            "summary": "Role based endpoint and token issued too long ago",
+                            "value": {"detail": api_messages.ROLE_CLAIM_TOO_OLD},
+                        },
                     }
                 }
             },
         },
+        403: {
+            "description": "Role in access token is not allowed for this endpoint",
+            "content": {
+                "application/json": {
+                    "example": {"detail": api_messages.ROLE_FORBIDDEN}
+                }
+            },
+        },
     }
 )
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(client.router, prefix="/client", tags=["client"])
-api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(deps.require_roles(Role.ADMIN))],
+)
 api_router.include_router(auth.router, prefix="/superadmin", tags=["superadmin"])
-api_router.include_router(superuser.router, prefix="/superuser", tags=["superuser"])
-api_router.include_router(diagnostic.router, prefix="/diagnostic", tags=["diagnostic"])
-api_router.include_router(mechanic.router, prefix="/mechanic", tags=["mechanic"])
\ No newline at end of file
+api_router.include_router(
+    superuser.router,
+    prefix="/superuser",
+    tags=["superuser"],
+    dependencies=[Depends(deps.require_roles(Role.SUPERADMIN))],
+)
+api_router.include_router(
+    diagnostic.router,
+    prefix="/diagnostic",
+    tags=["diagnostic"],
+    dependencies=[Depends(deps.require_roles(Role.DIAGNOSTIC, Role.ADMIN))],
+)
+api_router.include_router(
+    mechanic.router,
+    prefix="/mechanic",
+    tags=["mechanic"],
+    dependencies=[Depends(deps.require_roles(Role.MECHANIC, Role.ADMIN))],
+)
+api_router.include_router(
+    imports.router,
+    prefix="/import",
+    tags=["import"],
+    dependencies=[Depends(deps.require_roles(Role.ADMIN))],
+)
+# roles are checked by the endpoint itself, it needs token payload to filter events
+api_router.include_router(board.router, prefix="/board", tags=["board"])
@@ -1,30 +1,50 @@
-from collections.abc import AsyncGenerator
-from typing import Annotated
+import time
+from collections.abc import AsyncGenerator, Callable, Coroutine
+from typing import Annotated, Any
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import api_messages
 from app.core import database_session
-from app.core.security.jwt import verify_jwt_token
-from app.models import User
+from app.core.config import get_settings
+from app.core.security.jwt import JWTTokenPayload, verify_jwt_token
+from app.core.user_cache import cache_user, get_cached_user
+from app.models import Role, User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/access-token")
 
+# clients that must see their own just committed writes send this header
+# and read endpoints then go to primary instead of possibly lagging replica
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
 
 async def get_session() -> AsyncGenerator[AsyncSession]:
     async with database_session.get_async_session() as session:
         yield session
 
 
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession]:
+    if request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true"):
+        session = database_session.get_async_session()
+    else:
+        session = database_session.get_async_read_session()
+    async with session:
+        yield session
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     session: AsyncSession = Depends(get_session),
 ) -> User:
     token_payload = verify_jwt_token(token)
 
+    user: User | None = await get_cached_user(session, token_payload.sub)
+    if user is not None:
+        return user
+
     user = await session.scalar(select(User).where(User.user_id == token_payload.sub))
 
     if user is None:
@@ -32,4 +52,35 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=api_messages.JWT_ERROR_USER_REMOVED,
         )
+    cache_user(token_payload.sub, user)
     return user
+
+
+def require_roles(
+    *roles: Role,
+) -> Callable[[str], Coroutine[Any, Any, JWTTokenPayload]]:
+    # Authorizes from token claims alone, no database query. Role claim is
+    # trusted only for jwt_role_claim_max_age_secs after token was issued,
+    # older tokens must be refreshed, which reads current role from database.
+    # SUPERADMIN passes every role check.
+    allowed = {*roles, Role.SUPERADMIN}
+
+    async def check_roles(
+        token: Annotated[str, Depends(oauth2_scheme)],
+    ) -> JWTTokenPayload:
+        token_payload = verify_jwt_token(token)
+
+        max_age_secs = get_settings().security.jwt_role_claim_max_age_secs
+        if time.time() - token_payload.iat > max_age_secs:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=api_messages.ROLE_CLAIM_TOO_OLD,
+            )
+        if token_payload.role not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=api_messages.ROLE_FORBIDDEN,
+            )
+        return token_payload
+
+    return check_roles
@@ -1,23 +1,22 @@
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, literal, select, tuple_
 from starlette import status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api import deps
-from app.models import Application, Car, Client, User, Role
-from sqlalchemy.orm import selectinload
+from app.api import api_messages, deps
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.core.plates import normalize_plate
+from app.models import ACTIVE_STATUSES, Application, ApplicationWorkload, Car, Client, User, Role, Status, Priority
+from app.repositories.applications import bulk_update_apps, existing_app_ids, find_app_detail, update_app
+from app.repositories.arrival_slots import book_arrival_slot, free_slots
 
-from app.schemas.requests import ApplyAppAdminRequest, RejectAppAdminRequest, ApplyTimeAdminRequest
-from app.schemas.responses import DiagNamesList, AdminGetFinishAppResponse,AppListItem, AdminGetStartAppResponse
+from app.schemas.requests import ApplyAppAdminRequest, RejectAppAdminRequest, ApplyTimeAdminRequest, BulkAppUpdateRequest
+from app.schemas.responses import DiagNamesList, FreeSlotResponse, StaffWorkloadResponse, AdminGetFinishAppResponse, AppListPage, AdminGetStartAppResponse, BulkAppUpdateResponse
 router = APIRouter()
 
-async def find_app(app_id: int,session: AsyncSession):
-    app = await session.scalar(select(Application).where(Application.id == app_id))
-    if app is None:
-        raise HTTPException(status_code=404, detail="Application not found")
-    return app
-
 @router.get(
     "/get_app/{app_id}",
     status_code=status.HTTP_200_OK,
@@ -26,29 +25,10 @@ async def find_app(app_id: int,session: AsyncSession):
 async def start_app(
         app_id: int,
         session: AsyncSession = Depends(deps.get_session)):
-    app = await find_app(app_id, session)
-    if not app:
-        raise HTTPException(status_code=404, detail="Заявка не найдена")
-    result_car = await session.execute(select(Car).where(Car.id == app.car_id))
-    car = result_car.scalars().first()
-    if not car:
-        raise HTTPException(status_code=404, detail="Машина не найдена")
-    result_client = await session.execute(select(Client).where(Client.client_id == app.client_id))
-    client = result_client.scalars().first()
-    if not client:
-        raise HTTPException(status_code=404, detail="клиент не найден")
-    return AdminGetStartAppResponse(
-        app_id = app.id,
-        client_id = app.client_id,
-        car_id = app.car_id,
-        problem = app.problem,
-        conn = app.conn,
-        phone = client.phone,
-        brand = car.brand,
-        model = car.model,
-        number = car.number,
-        year = car.year
-    )
+    app = await find_app_detail(app_id, session)
+    if app is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Заявка не найдена")
+    return app
 
 @router.post(
     "/adminapply",
@@ -60,15 +40,23 @@ async def adminapply_app(
     apply_data: ApplyAppAdminRequest,
     session: AsyncSession = Depends(deps.get_session)
 ):
-    app = await find_app(app_id, session)
-
-    app.admin_comment = apply_data.admin_comment
-    app.status = apply_data.status
-    app.priority = apply_data.priority
-    app.diag_id = apply_data.diag_id
-
+    app = await update_app(
+        app_id,
+        session,
+        values={
+            "admin_comment": apply_data.admin_comment,
+            "status": apply_data.status,
+            "priority": apply_data.priority,
+            "diag_id": apply_data.diag_id,
+        },
+        returning=(
+            Application.admin_comment,
+            Application.status,
+            Application.priority,
+            Application.diag_id,
+        ),
+    )
     await session.commit()
-    await session.refresh(app)
 
     return app
 
@@ -82,55 +70,198 @@ async def adminreject_app(
         reject_data: RejectAppAdminRequest,
         session: AsyncSession = Depends(deps.get_session)
 ):
-    app = await find_app(app_id, session)
-
-    app.admin_comment = reject_data.admin_comment
-    app.status = reject_data.status
-
+    app = await update_app(
+        app_id,
+        session,
+        values={
+            "admin_comment": reject_data.admin_comment,
+            "status": reject_data.status,
+        },
+        returning=(Application.admin_comment, Application.status),
+    )
     await session.commit()
-    await session.refresh(app)
     return app
 
 @router.post(
     "/adminapplytime",
     status_code=status.HTTP_200_OK,
-    response_model=ApplyTimeAdminRequest)
+    response_model=ApplyTimeAdminRequest,
+    responses={
+        409: {"description": api_messages.ARRIVAL_SLOT_FULL},
+        422: {"description": api_messages.ARRIVAL_TIME_NOT_SLOT},
+    },
+)
 async def adminapply_time(
         app_id: int,
         arrival_time: datetime,
         session: AsyncSession = Depends(deps.get_session)
 ):
-    app = await find_app(app_id, session)
-    app.arrival_time = arrival_time
+    # arrival_time must be start of a slot with free bay, see get_free_slots
+    app = await book_arrival_slot(session, app_id, arrival_time, datetime.now(UTC))
     await session.commit()
-    await session.refresh(app)
     return app
 
+@router.get(
+    "/free_slots",
+    status_code=status.HTTP_200_OK,
+    response_model=list[FreeSlotResponse]
+)
+async def get_free_slots(
+        day: date,
+        days: int = Query(default=1, ge=1, le=31),
+        session: AsyncSession = Depends(deps.get_read_session)
+):
+    # not yet started slots of day and following days with number of free bays
+    slots = await free_slots(session, day, days, datetime.now(UTC))
+    return [{"start": start, "free_bays": free_bays} for start, free_bays in slots]
+
+@router.post(
+    "/bulk_update",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkAppUpdateResponse
+)
+async def adminbulk_update_apps(
+        bulk_data: BulkAppUpdateRequest,
+        session: AsyncSession = Depends(deps.get_session)
+):
+    shared = bulk_data.shared.model_dump(exclude_none=True)
+    changes = [
+        (app.app_id, {**shared, **app.model_dump(exclude_none=True, exclude={"app_id"})})
+        for app in bulk_data.apps
+    ]
+    updated = await bulk_update_apps(session, changes)
+    await session.commit()
+    missing = [app_id for app_id, _ in changes if app_id not in updated]
+    # missing ones that exist were refused by unknown assignee or status
+    # transition check, looked up only when something was refused
+    existing = await existing_app_ids(session, missing) if missing else set()
+    diag_ids = {values["diag_id"] for app_id, values in changes if app_id in existing and "diag_id" in values}
+    known_diag_ids = set(
+        await session.scalars(select(User.user_id).where(User.user_id.in_(diag_ids)))
+    ) if diag_ids else set()
+
+    def refused_detail(app_id: int, values: dict[str, Any]) -> str:
+        if app_id not in existing:
+            return api_messages.APPLICATION_NOT_FOUND
+        if "diag_id" in values and values["diag_id"] not in known_diag_ids:
+            return api_messages.ASSIGNEE_NOT_FOUND
+        return api_messages.INVALID_STATUS_TRANSITION
+
+    return {
+        "results": [
+            {**updated[app_id], "updated": True}
+            if app_id in updated
+            else {"app_id": app_id, "updated": False, "detail": refused_detail(app_id, values)}
+            for app_id, values in changes
+        ]
+    }
+
+@dataclass
+class AppListFilters:
+    client_id: int | None = None
+    plate: str | None = None
+    car_id: Annotated[str | None, Query(deprecated=True, description="Use `plate`")] = None
+    app_status: Annotated[Status | None, Query(alias="status")] = None
+    priority: Priority | None = None
+    diag_id: int | None = None
+    mechanic_id: int | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+
 @router.get(
     "/get_all_apps",
     status_code=status.HTTP_200_OK,
-    response_model=list[AppListItem]
+    response_model=AppListPage
 )
 async def get_all_apps(
-    client_id: int | None = None,
-    car_id: str | None = None,
-    session: AsyncSession = Depends(deps.get_session)
+    filters: AppListFilters = Depends(),
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(deps.get_read_session)
 ):
     query = (
-        select(Application)
-        .options(selectinload(Application.car),
-        selectinload(Application.client))
-        .order_by(Application.created_at.desc())
+        select(
+            Application.id,
+            Application.client_id,
+            Application.car_id,
+            Application.problem,
+            Application.conn,
+            Application.created_at,
+            Car.brand,
+            Car.model,
+            Car.number,
+            Car.year,
+            Client.user_name,
+            Client.phone,
+        )
+        .join(Car, Car.id == Application.car_id)
+        .join(Client, Client.client_id == Application.client_id)
+        .order_by(Application.created_at.desc(), Application.id.desc())
+        .limit(limit + 1)
     )
-    if client_id:
-        query = query.where(Application.client_id == client_id)
-    if car_id:
-        query = query.where(Car.number.ilike(f"%{car_id}%"))
-    result = await session.execute(query)
-    apps = result.scalars().all()
-    if not apps:
+    if filters.client_id:
+        query = query.where(Application.client_id == filters.client_id)
+    plate = normalize_plate(filters.plate or filters.car_id or "")
+    if plate:
+        query = query.where(Car.number_normalized.contains(plate, autoescape=True))
+    if filters.app_status is not None:
+        query = query.where(Application.status == filters.app_status)
+    if filters.priority is not None:
+        query = query.where(Application.priority == filters.priority)
+    if filters.diag_id is not None:
+        query = query.where(Application.diag_id == filters.diag_id)
+    if filters.mechanic_id is not None:
+        query = query.where(Application.mechanic_id == filters.mechanic_id)
+    if filters.created_from is not None:
+        query = query.where(Application.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.where(Application.created_at < filters.created_to)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Application.created_at, Application.id)
+            < tuple_(
+                literal(cursor_created_at, Application.created_at.type),
+                literal(cursor_id, Application.id.type),
+            )
+        )
+
+    rows = (await session.execute(query)).all()
+    if not rows and not cursor:
         raise HTTPException(status_code=404, detail="Не найдено")
-    return [AppListItem.model_validate(app) for app in apps]
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+    return {
+        "items": [
+            {
+                "id": row.id,
+                "client_id": row.client_id,
+                "car_id": row.car_id,
+                "problem": row.problem,
+                "conn": row.conn,
+                "created_at": row.created_at,
+                "car": {
+                    "id": row.car_id,
+                    "brand": row.brand,
+                    "model": row.model,
+                    "number": row.number,
+                    "year": row.year,
+                },
+                "client": {
+                    "client_id": row.client_id,
+                    "user_name": row.user_name,
+                    "phone": row.phone,
+                },
+            }
+            for row in page
+        ],
+        "next_cursor": next_cursor,
+    }
 
 @router.get(
     "/diagnostics",
@@ -138,7 +269,7 @@ async def get_all_apps(
     response_model=list[DiagNamesList]
 )
 async def get_diagnostics(
-        session: AsyncSession = Depends(deps.get_session
+        session: AsyncSession = Depends(deps.get_read_session
 )):
     result = await session.execute(
         select(User.user_id, User.user_name)
@@ -146,4 +277,48 @@ async def get_diagnostics(
     )
     rows = result.mappings().all()
 
-    return rows
\ No newline at end of file
+    return rows
+
+@router.get(
+    "/workload",
+    status_code=status.HTTP_200_OK,
+    response_model=list[StaffWorkloadResponse]
+)
+async def get_workload(
+        role: Role | None = None,
+        session: AsyncSession = Depends(deps.get_read_session)
+):
+    # diagnostics and mechanics, least loaded first, read from application_workload
+    # so cost does not depend on number of applications
+    roles = [r for r in (Role.DIAGNOSTIC, Role.MECHANIC) if role in (None, r)]
+    result = await session.execute(
+        select(
+            User.user_id,
+            User.user_name,
+            User.role,
+            ApplicationWorkload.status,
+            ApplicationWorkload.diag_count,
+            ApplicationWorkload.mechanic_count,
+        )
+        .outerjoin(
+            ApplicationWorkload,
+            and_(
+                ApplicationWorkload.user_id == User.user_id,
+                ApplicationWorkload.status.in_(ACTIVE_STATUSES),
+            ),
+        )
+        .where(User.role.in_(roles))
+    )
+
+    staff: dict[int, StaffWorkloadResponse] = {}
+    for row in result:
+        member = staff.setdefault(
+            row.user_id,
+            StaffWorkloadResponse(user_id=row.user_id, user_name=row.user_name, role=row.role, open_apps=0, by_status={}),
+        )
+        count = row.diag_count if row.role == Role.DIAGNOSTIC else row.mechanic_count
+        if count:
+            member.by_status[row.status] = count
+            member.open_apps += count
+
+    return sorted(staff.values(), key=lambda member: (member.open_apps, member.user_id))
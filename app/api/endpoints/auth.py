@@ -1,22 +1,24 @@
-import secrets
-import time
+import math
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import api_messages, deps
-from app.core.config import get_settings
 from app.core.security.jwt import create_jwt_token
 from app.core.security.password import (
     DUMMY_PASSWORD,
-    get_password_hash,
-    verify_password,
+    check_password,
+    hash_password,
+    password_needs_rehash,
 )
-from app.models import RefreshToken, User
+from app.core.security.rate_limit import get_login_rate_limiter
+from app.core.user_cache import invalidate_user
+from app.models import User
+from app.repositories.refresh_tokens import create_refresh_token, use_refresh_token
 from app.schemas.requests import RefreshTokenRequest, UserCreateRequest
 from app.schemas.responses import AccessTokenResponse, UserResponse
 
@@ -29,6 +31,12 @@ ACCESS_TOKEN_RESPONSES: dict[int | str, dict[str, Any]] = {
             "application/json": {"example": {"detail": api_messages.PASSWORD_INVALID}}
         },
     },
+    429: {
+        "description": "Too many login attempts for this username or client address, see Retry-After header",
+        "content": {
+            "application/json": {"example": {"detail": api_messages.LOGIN_RATE_LIMITED}}
+        },
+    },
 }
 
 REFRESH_TOKEN_RESPONSES: dict[int | str, dict[str, Any]] = {
@@ -60,48 +68,96 @@ REFRESH_TOKEN_RESPONSES: dict[int | str, dict[str, Any]] = {
 }
 
 
+def parse_user_id(username: str) -> int | None:
+    # username is user_id, anything else cannot match bigint column
+    try:
+        user_id = int(username)
+    except ValueError:
+        return None
+    return user_id if 0 < user_id < 2**63 else None
+
+
+async def rehash_password(session: AsyncSession, user: User, password: str) -> None:
+    # moves hash to configured bcrypt cost, plain password is known only here
+    try:
+        new_hash = await hash_password(password)
+    except HTTPException:
+        # hasher saturated, login must not fail because of it, next one retries
+        return
+    # only if password was not changed meanwhile
+    result = await session.execute(
+        update(User)
+        .where(
+            User.user_id == user.user_id,
+            User.hashed_password == user.hashed_password,
+        )
+        .values(hashed_password=new_hash)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        await invalidate_user(session, user.user_id)
+
+
+async def check_login_rate_limit(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+) -> None:
+    # runs before endpoint body, rejected attempt costs no bcrypt work
+    retry_after = await get_login_rate_limiter().check(
+        form_data.username, request.client.host if request.client else None
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=api_messages.LOGIN_RATE_LIMITED,
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
 @router.post(
     "/access-token",
     response_model=AccessTokenResponse,
     responses=ACCESS_TOKEN_RESPONSES,
+    dependencies=[Depends(check_login_rate_limit)],
     description="OAuth2 compatible token, get an access token for future requests using username and password",
 )
 async def login_access_token(
     session: AsyncSession = Depends(deps.get_session),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> AccessTokenResponse:
-    user = await session.scalar(select(User).where(User.user_id == form_data.username))
+    user_id = parse_user_id(form_data.username)
+    user = None
+    if user_id is not None:
+        user = await session.scalar(select(User).where(User.user_id == user_id))
 
     if user is None:
         # this is naive method to not return early
-        verify_password(form_data.password, DUMMY_PASSWORD)
+        await check_password(form_data.password, DUMMY_PASSWORD)
 
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=api_messages.PASSWORD_INVALID,
         )
 
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await check_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=api_messages.PASSWORD_INVALID,
         )
 
-    jwt_token = create_jwt_token(user_id=str(user.user_id))
+    if password_needs_rehash(user.hashed_password):
+        await rehash_password(session, user, form_data.password)
 
-    refresh_token = RefreshToken(
-        user_id=user.user_id,
-        refresh_token=secrets.token_urlsafe(32),
-        exp=int(time.time() + get_settings().security.refresh_token_expire_secs),
-    )
-    session.add(refresh_token)
+    jwt_token = create_jwt_token(user_id=str(user.user_id), role=user.role)
+
+    refresh_token, refresh_token_exp = create_refresh_token(session, user.user_id)
     await session.commit()
 
     return AccessTokenResponse(
         access_token=jwt_token.access_token,
         expires_at=jwt_token.payload.exp,
-        refresh_token=refresh_token.refresh_token,
-        refresh_token_expires_at=refresh_token.exp,
+        refresh_token=refresh_token,
+        refresh_token_expires_at=refresh_token_exp,
     )
 
 
@@ -115,46 +171,18 @@ async def refresh_token(
     data: RefreshTokenRequest,
     session: AsyncSession = Depends(deps.get_session),
 ) -> AccessTokenResponse:
-    token = await session.scalar(
-        select(RefreshToken)
-        .where(RefreshToken.refresh_token == data.refresh_token)
-        .with_for_update(skip_locked=True)
-    )
+    user_id, role = await use_refresh_token(session, data.refresh_token)
 
-    if token is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=api_messages.REFRESH_TOKEN_NOT_FOUND,
-        )
-    elif time.time() > token.exp:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=api_messages.REFRESH_TOKEN_EXPIRED,
-        )
-    elif token.used:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=api_messages.REFRESH_TOKEN_ALREADY_USED,
-        )
+    jwt_token = create_jwt_token(user_id=str(user_id), role=role)
 
-    token.used = True
-    session.add(token)
-
-    jwt_token = create_jwt_token(user_id=str(token.user_id))
-
-    refresh_token = RefreshToken(
-        user_id=token.user_id,
-        refresh_token=secrets.token_urlsafe(32),
-        exp=int(time.time() + get_settings().security.refresh_token_expire_secs),
-    )
-    session.add(refresh_token)
+    refresh_token, refresh_token_exp = create_refresh_token(session, user_id)
     await session.commit()
 
     return AccessTokenResponse(
         access_token=jwt_token.access_token,
         expires_at=jwt_token.payload.exp,
-        refresh_token=refresh_token.refresh_token,
-        refresh_token_expires_at=refresh_token.exp,
+        refresh_token=refresh_token,
+        refresh_token_expires_at=refresh_token_exp,
     )
 
 
@@ -177,7 +205,7 @@ async def register_new_user(
 
     user = User(
         email=new_user.email,
-        hashed_password=get_password_hash(new_user.password),
+        hashed_password=await hash_password(new_user.password),
     )
     session.add(user)
 
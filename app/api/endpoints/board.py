@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api import deps
+from app.core.app_board import BoardViewer, get_app_board
+from app.core.config import get_settings
+from app.core.security.jwt import JWTTokenPayload
+from app.models import Role
+
+router = APIRouter()
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Server sent events, `application` with AppBoardEvent json data, "
+            "`resync` when events were lost and list must be reloaded",
+            "content": {"text/event-stream": {}},
+        }
+    },
+    description="Live stream of application changes visible to current user",
+)
+async def board_events(
+    token: JWTTokenPayload = Depends(
+        deps.require_roles(Role.ADMIN, Role.DIAGNOSTIC, Role.MECHANIC)
+    ),
+) -> StreamingResponse:
+    # role comes from token, no database session is held by the stream
+    assert token.role is not None
+    viewer = BoardViewer(user_id=int(token.sub), role=token.role)
+    settings = get_settings()
+    return StreamingResponse(
+        get_app_board().stream(
+            viewer,
+            keepalive_secs=settings.board.keepalive_secs,
+            until=token.iat + settings.security.jwt_role_claim_max_age_secs,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from app.api import deps
+from app.core.app_board import app_event_notify
 from app.models import Client, Car, Application, ACTIVE_STATUSES
 from app.schemas.requests import AppRegisterRequest, ClientRegisterRequest, CarRegisterRequest
 from app.schemas.responses import CheckClient, GetAppsResponse, CheckCarResponse
@@ -19,7 +20,7 @@ router = APIRouter()
     response_model=CheckClient)
 async def check_client(
         client_id: int,
-        session: AsyncSession = Depends(deps.get_session)):
+        session: AsyncSession = Depends(deps.get_read_session)):
     stmt = select(Client).where(Client.client_id == bindparam("client_id", type_=BigInteger))
     client = await session.scalar(stmt.params(client_id=client_id))
     if not client:
@@ -53,7 +54,7 @@ async def register_client(
 )
 async def my_car(
         client_id: int,
-        session: AsyncSession = Depends(deps.get_session)
+        session: AsyncSession = Depends(deps.get_read_session)
 ):
     result = await session.execute(select(Car).where(Car.client_id == client_id, Car.is_deleted == False))
     cars = result.scalars().all()
@@ -88,6 +89,10 @@ async def add_app(
         created_at = datetime.now()
     )
     session.add(new_app)
+    await session.flush()
+    await session.execute(
+        select(app_event_notify("created")).where(Application.id == new_app.id)
+    )
     await session.commit()
     return {"id": new_app.id}
 
@@ -128,7 +133,7 @@ async def replace_phone(
             )
 async def get_apps(
         client_id: int,
-        session: AsyncSession = Depends(deps.get_session)
+        session: AsyncSession = Depends(deps.get_read_session)
 ):
     result = await session.execute(select(Application).where(Application.client_id == client_id))
     apps = result.scalars().all()
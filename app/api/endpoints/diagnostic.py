@@ -1,20 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
 from starlette import status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api import deps
-from app.models import Application
+from app.api import api_messages, deps
+from app.core.security.jwt import JWTTokenPayload
+from app.models import Application, Role
+from app.repositories.applications import DIAGNOSTIC_QUEUE, claim_next_app, find_app_detail, update_app
 
-from app.schemas.responses import DiagGetAppResponse
+from app.schemas.responses import ClaimedAppResponse, DiagGetAppResponse
 from app.schemas.requests import DiagFinishRequest
 router = APIRouter()
 
-async def find_app(app_id: int,session: AsyncSession):
-    app = await session.scalar(select(Application).where(Application.id == app_id))
-    if app is None:
-        raise HTTPException(status_code=404, detail="Application not found")
-    return app
-
 @router.get(
     "/get_app",
     status_code=status.HTTP_200_OK,
@@ -24,7 +19,9 @@ async def get_app(
         app_id: int,
         session: AsyncSession = Depends(deps.get_session)
 ):
-    app = await find_app(app_id, session)
+    app = await find_app_detail(app_id, session)
+    if app is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=api_messages.APPLICATION_NOT_FOUND)
     return app
 
 @router.post(
@@ -36,12 +33,36 @@ async def diag_finish(
         app_id: int,
         diag_apply_data: DiagFinishRequest,
         session: AsyncSession = Depends(deps.get_session)):
-    app = await find_app(app_id, session)
+    app = await update_app(
+        app_id,
+        session,
+        values={
+            "diag_comment": diag_apply_data.diag_comment,
+            "status": diag_apply_data.status,
+            "diag_price": diag_apply_data.diag_price,
+        },
+        returning=(Application.diag_comment, Application.status, Application.diag_price),
+    )
+    await session.commit()
+    return app
 
-    app.diag_comment=diag_apply_data.diag_comment
-    app.diag_price=diag_apply_data.diag_price
 
+@router.post(
+    "/claim_next",
+    status_code=status.HTTP_200_OK,
+    response_model=ClaimedAppResponse,
+    responses={404: {"description": api_messages.NO_APPLICATION_TO_CLAIM}},
+    description="Assign most urgent unassigned application of the queue to current user",
+)
+async def diag_claim_next(
+        token: JWTTokenPayload = Depends(deps.require_roles(Role.DIAGNOSTIC)),
+        session: AsyncSession = Depends(deps.get_session)
+):
+    app = await claim_next_app(session, DIAGNOSTIC_QUEUE, int(token.sub))
+    if app is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=api_messages.NO_APPLICATION_TO_CLAIM,
+        )
     await session.commit()
-    await session.refresh(app)
     return app
-    
\ No newline at end of file
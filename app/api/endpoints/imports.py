@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.api import deps
+from app.bulk_import import ImportFormat, ImportKind, ImportReport, run_import
+
+router = APIRouter()
+
+
+@router.post(
+    "/{kind}",
+    status_code=status.HTTP_200_OK,
+    response_model=ImportReport,
+    description="Stream NDJSON or CSV body of clients, cars or applications, "
+    "valid rows are loaded in one transaction, invalid are reported",
+)
+async def bulk_import(
+    kind: ImportKind,
+    request: Request,
+    format: ImportFormat = ImportFormat.ndjson,
+    session: AsyncSession = Depends(deps.get_session),
+):
+    report = await run_import(session, kind, format, request.stream())
+    await session.commit()
+    return report
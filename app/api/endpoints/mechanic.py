@@ -1,21 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
 from starlette import status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api import deps
-from app.models import Application
+from app.api import api_messages, deps
+from app.core.security.jwt import JWTTokenPayload
+from app.models import Application, Role
+from app.repositories.applications import REPAIR_QUEUE, claim_next_app, find_app_detail, update_app
 
-from app.schemas.responses import MechanicGetResponse
+from app.schemas.responses import ClaimedAppResponse, MechanicGetResponse
 from app.schemas.requests import MechanicFinishRequest
 
 router = APIRouter()
 
-async def find_app(app_id: int,session: AsyncSession):
-    app = await session.scalar(select(Application).where(Application.id == app_id))
-    if app is None:
-        raise HTTPException(status_code=404, detail="Application not found")
-    return app
-
 @router.get(
     "/mechanic_getapp",
     status_code=status.HTTP_200_OK,
@@ -25,7 +20,9 @@ async def mechanic_get_app(
         app_id: int,
         session: AsyncSession = Depends(deps.get_session)
 ):
-    app = await find_app(app_id, session)
+    app = await find_app_detail(app_id, session)
+    if app is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=api_messages.APPLICATION_NOT_FOUND)
     return app
 
 @router.post(
@@ -38,11 +35,40 @@ async def mechanic_finish_app(
         mechanic_data: MechanicFinishRequest,
         session: AsyncSession = Depends(deps.get_session)
 ):
-    app = await find_app(app_id, session)
+    app = await update_app(
+        app_id,
+        session,
+        values={
+            "mechanic_comment": mechanic_data.mechanic_comment,
+            "status": mechanic_data.status,
+            "mechanic_price": mechanic_data.mechanic_price,
+        },
+        returning=(
+            Application.mechanic_comment,
+            Application.status,
+            Application.mechanic_price,
+        ),
+    )
+    await session.commit()
+    return app
 
-    app.mechanic_comment = mechanic_data.mechanic_comment
-    app.mechanic_price = mechanic_data.mechanic_price
 
+@router.post(
+    "/claim_next",
+    status_code=status.HTTP_200_OK,
+    response_model=ClaimedAppResponse,
+    responses={404: {"description": api_messages.NO_APPLICATION_TO_CLAIM}},
+    description="Assign most urgent unassigned application of the queue to current user",
+)
+async def mechanic_claim_next(
+        token: JWTTokenPayload = Depends(deps.require_roles(Role.MECHANIC)),
+        session: AsyncSession = Depends(deps.get_session)
+):
+    app = await claim_next_app(session, REPAIR_QUEUE, int(token.sub))
+    if app is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=api_messages.NO_APPLICATION_TO_CLAIM,
+        )
     await session.commit()
-    await session.refresh(app)
-    return app
\ No newline at end of file
+    return app
@@ -4,6 +4,8 @@ from sqlalchemy import select
 from starlette import status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
+from app.core.security.password import PasswordHasherStats, get_password_hasher
+from app.core.user_cache import invalidate_user
 from app.models import User
 from app.schemas.requests import AddUserRequest
 
@@ -30,5 +32,11 @@ async def add_user(
         phone=user_data.phone
     )
     session.add(new_user)
+    await invalidate_user(session, new_user.user_id)
     await session.commit()
     return new_user
+
+
+@router.get("/password_hasher", response_model=PasswordHasherStats)
+async def password_hasher_stats():
+    return get_password_hasher().stats()
@@ -3,7 +3,9 @@ from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.core.security.password import get_password_hash
+from app.core.security.password import hash_password
+from app.core.security.revocation import revoke_user_tokens
+from app.core.user_cache import invalidate_user
 from app.models import User
 from app.schemas.requests import UserUpdatePasswordRequest
 from app.schemas.responses import UserResponse
@@ -28,6 +30,8 @@ async def delete_current_user(
     session: AsyncSession = Depends(deps.get_session),
 ) -> None:
     await session.execute(delete(User).where(User.user_id == current_user.user_id))
+    await invalidate_user(session, current_user.user_id)
+    await revoke_user_tokens(session, current_user.user_id)
     await session.commit()
 
 
@@ -41,6 +45,8 @@ async def reset_current_user_password(
     session: AsyncSession = Depends(deps.get_session),
     current_user: User = Depends(deps.get_current_user),
 ) -> None:
-    current_user.hashed_password = get_password_hash(user_update_password.password)
+    current_user.hashed_password = await hash_password(user_update_password.password)
     session.add(current_user)
+    await invalidate_user(session, current_user.user_id)
+    await revoke_user_tokens(session, current_user.user_id)
     await session.commit()
@@ -0,0 +1,26 @@
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, Response
+
+from app.core.config import get_settings
+from app.core.security.signing_keys import get_key_ring
+
+router = APIRouter()
+
+
+@router.get(
+    "/jwks.json",
+    description="Public keys verifying access tokens, see header `kid` of token",
+    responses={304: {"description": "Keys did not change since `If-None-Match` ETag"}},
+)
+async def jwks(request: Request) -> Response:
+    body = json.dumps(get_key_ring().jwks(), separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {
+        "Cache-Control": f"public, max-age={get_settings().security.jwks_max_age_secs}",
+        "ETag": etag,
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
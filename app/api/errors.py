@@ -0,0 +1,43 @@
+# HTTP responses of domain errors raised by repositories,
+# see app/repositories/errors.py
+
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+
+from app.api import api_messages
+from app.repositories.errors import (
+    ApplicationNotFoundError,
+    ArrivalSlotFullError,
+    ArrivalTimeNotSlotError,
+    InvalidStatusTransitionError,
+)
+
+DOMAIN_ERROR_RESPONSES: dict[type[Exception], tuple[int, str]] = {
+    ApplicationNotFoundError: (
+        status.HTTP_404_NOT_FOUND,
+        api_messages.APPLICATION_NOT_FOUND,
+    ),
+    InvalidStatusTransitionError: (
+        status.HTTP_409_CONFLICT,
+        api_messages.INVALID_STATUS_TRANSITION,
+    ),
+    ArrivalTimeNotSlotError: (
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        api_messages.ARRIVAL_TIME_NOT_SLOT,
+    ),
+    ArrivalSlotFullError: (
+        status.HTTP_409_CONFLICT,
+        api_messages.ARRIVAL_SLOT_FULL,
+    ),
+}
+
+
+async def domain_error_handler(_: Request, exc: Exception) -> JSONResponse:
+    status_code, detail = DOMAIN_ERROR_RESPONSES[type(exc)]
+    return JSONResponse({"detail": detail}, status_code=status_code)
+
+
+def add_domain_error_handlers(app: FastAPI) -> None:
+    for error in DOMAIN_ERROR_RESPONSES:
+        app.add_exception_handler(error, domain_error_handler)
@@ -0,0 +1,129 @@
+# Measures bcrypt cost on this host and recommends password_bcrypt_rounds
+#
+# For every rounds value it runs samples password checks on a thread pool of
+# security.password_hash_workers threads, all of them busy, the same way
+# one loaded app worker runs them (see app/core/security/password.py).
+# Reported are p50 / p99 duration of one check and throughput of the pool.
+# Recommended is the highest rounds whose p99 fits into target p99 latency,
+# queueing above the pool size is not included, it is bounded by
+# password_hash_queue and rejected with 503.
+#
+# Run it on production hardware, with other load it will see in production,
+# total throughput of the host is throughput * number of uvicorn workers
+# (as long as there are enough cores). Existing hashes are moved to new
+# value on users next login.
+#
+# Usage:
+#
+# python -m app.bcrypt_calibration
+# python -m app.bcrypt_calibration --target-p99-ms 300 --min-rounds 10 --max-rounds 14
+
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import bcrypt
+
+from app.core.config import get_settings
+
+CALIBRATION_PASSWORD = b"calibration-password"
+
+
+@dataclass(frozen=True)
+class RoundsMeasurement:
+    rounds: int
+    p50_secs: float
+    p99_secs: float
+    checks_per_sec: float
+
+
+def _quantile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def measure_rounds(rounds: int, workers: int, samples: int) -> RoundsMeasurement:
+    hashed = bcrypt.hashpw(CALIBRATION_PASSWORD, bcrypt.gensalt(rounds))
+
+    def timed_check(_: int) -> float:
+        started_at = time.perf_counter()
+        bcrypt.checkpw(CALIBRATION_PASSWORD, hashed)
+        return time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        durations = sorted(executor.map(timed_check, range(samples)))
+    elapsed = time.perf_counter() - started_at
+
+    return RoundsMeasurement(
+        rounds=rounds,
+        p50_secs=_quantile(durations, 0.5),
+        p99_secs=_quantile(durations, 0.99),
+        checks_per_sec=samples / elapsed,
+    )
+
+
+def calibrate(
+    min_rounds: int, max_rounds: int, workers: int, samples: int, target_p99_secs: float
+) -> list[RoundsMeasurement]:
+    measurements = []
+    for rounds in range(min_rounds, max_rounds + 1):
+        measurement = measure_rounds(rounds, workers, samples)
+        measurements.append(measurement)
+        # every next round doubles the cost, no point measuring further
+        if measurement.p50_secs > target_p99_secs:
+            break
+    return measurements
+
+
+def recommend_rounds(
+    measurements: list[RoundsMeasurement], target_p99_secs: float
+) -> int | None:
+    fitting = [m.rounds for m in measurements if m.p99_secs <= target_p99_secs]
+    return max(fitting) if fitting else None
+
+
+def main(
+    min_rounds: int, max_rounds: int, workers: int, samples: int, target_p99_ms: float
+) -> None:
+    target_p99_secs = target_p99_ms / 1000
+    print(f"{workers} hashing threads, {samples} checks per rounds value")
+    print(f"{'rounds':>6} {'p50 ms':>9} {'p99 ms':>9} {'checks/s':>9}")
+
+    measurements = calibrate(min_rounds, max_rounds, workers, samples, target_p99_secs)
+    for m in measurements:
+        print(
+            f"{m.rounds:>6} {m.p50_secs * 1000:>9.1f} {m.p99_secs * 1000:>9.1f} "
+            f"{m.checks_per_sec:>9.1f}"
+        )
+
+    current = get_settings().security.password_bcrypt_rounds
+    recommended = recommend_rounds(measurements, target_p99_secs)
+    if recommended is None:
+        print(f"no rounds >= {min_rounds} fits p99 {target_p99_ms:.0f} ms, add cores")
+    else:
+        print(
+            f"recommended SECURITY__PASSWORD_BCRYPT_ROUNDS={recommended} "
+            f"for p99 {target_p99_ms:.0f} ms (current {current})"
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    security = get_settings().security
+    parser = argparse.ArgumentParser(
+        description="Measure bcrypt latency and recommend password_bcrypt_rounds"
+    )
+    parser.add_argument("--target-p99-ms", type=float, default=250.0)
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=security.password_hash_workers)
+    parser.add_argument("--samples", type=int, default=32)
+    args = parser.parse_args()
+    main(
+        args.min_rounds,
+        args.max_rounds,
+        args.workers,
+        args.samples,
+        args.target_p99_ms,
+    )
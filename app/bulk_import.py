@@ -0,0 +1,444 @@
+# Bulk import of clients, cars and applications from legacy CRM
+#
+# Input is streamed NDJSON (one json object per line) or CSV (header line first),
+# every row is validated with the same request schema as the single row endpoint
+# (ClientRegisterRequest, CarRegisterRequest, AppRegisterRequest).
+#
+# Valid rows are loaded in batches with asyncpg binary COPY into a temporary
+# staging table (dropped on commit), then within the same transaction:
+# 1. rows that would break constraints are deleted from staging and reported
+# 2. remaining rows are loaded into target table with one INSERT ... SELECT,
+#    clients are upserted by client_id, cars and applications are inserted
+#
+# Usage as CLI:
+#
+# python -m app.bulk_import clients clients.ndjson
+# python -m app.bulk_import cars cars.csv --format csv
+
+
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Insert,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import ReturningDelete
+
+from app.core import database_session
+from app.core.plates import PLATE_TRANSLATE_FROM, PLATE_TRANSLATE_TO
+from app.models import Application, Car, Client, Priority, Status
+from app.schemas.requests import (
+    AppRegisterRequest,
+    CarRegisterRequest,
+    ClientRegisterRequest,
+)
+
+COPY_BATCH_SIZE = 5000
+MAX_REPORTED_REJECTS = 1000
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class ImportKind(str, Enum):
+    clients = "clients"
+    cars = "cars"
+    apps = "apps"
+
+
+class ImportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class RejectedRow(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    kind: ImportKind
+    received: int = 0
+    imported: int = 0
+    rejected_total: int = 0
+    rejected: list[RejectedRow] = []
+
+    def reject(self, line: int, error: str) -> None:
+        self.rejected_total += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTS:
+            self.rejected.append(RejectedRow(line=line, error=error))
+
+
+# staging tables live in their own metadata, they are never part of migrations
+staging_metadata = MetaData()
+
+
+def _staging_table(name: str, *columns: Column[Any]) -> Table:
+    return Table(
+        name,
+        staging_metadata,
+        Column("line", BigInteger, nullable=False),
+        *columns,
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+client_staging = _staging_table(
+    "import_client_account",
+    Column("client_id", BigInteger),
+    Column("user_name", String(256)),
+    Column("phone", String(128)),
+)
+car_staging = _staging_table(
+    "import_car",
+    Column("client_id", BigInteger),
+    Column("brand", String(256)),
+    Column("model", String(256)),
+    Column("number", String(256)),
+    Column("year", Integer),
+)
+app_staging = _staging_table(
+    "import_application",
+    Column("client_id", BigInteger),
+    Column("car_id", BigInteger),
+    Column("problem", String),
+    Column("conn", Integer),
+)
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    schema: type[BaseModel]
+    staging: Table
+    # (DELETE ... RETURNING line, error message) run in order before load
+    checks: Callable[[], list[tuple[ReturningDelete[tuple[int]], str]]]
+    load: Callable[[], Insert]
+
+
+def _client_checks() -> list[tuple[ReturningDelete[tuple[int]], str]]:
+    s, later = client_staging, client_staging.alias("later")
+    earlier = client_staging.alias("earlier")
+    return [
+        (
+            delete(s)
+            .where(s.c.client_id == later.c.client_id, s.c.line < later.c.line)
+            .returning(s.c.line),
+            "client_id repeated later in file",
+        ),
+        (
+            delete(s)
+            .where(
+                s.c.phone == earlier.c.phone,
+                s.c.client_id != earlier.c.client_id,
+                s.c.line > earlier.c.line,
+            )
+            .returning(s.c.line),
+            "phone used by another client in file",
+        ),
+        (
+            delete(s)
+            .where(Client.phone == s.c.phone, Client.client_id != s.c.client_id)
+            .returning(s.c.line),
+            "phone used by another client",
+        ),
+    ]
+
+
+def _client_load() -> Insert:
+    s = client_staging
+    stmt = insert(Client).from_select(
+        ["client_id", "user_name", "phone"],
+        select(s.c.client_id, s.c.user_name, s.c.phone),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[Client.client_id],
+        set_={"user_name": stmt.excluded.user_name, "phone": stmt.excluded.phone},
+    )
+
+
+def _car_checks() -> list[tuple[ReturningDelete[tuple[int]], str]]:
+    s, earlier = car_staging, car_staging.alias("earlier")
+    s_number = func.translate(s.c.number, PLATE_TRANSLATE_FROM, PLATE_TRANSLATE_TO)
+    earlier_number = func.translate(
+        earlier.c.number, PLATE_TRANSLATE_FROM, PLATE_TRANSLATE_TO
+    )
+    return [
+        (
+            delete(s)
+            .where(~exists().where(Client.client_id == s.c.client_id))
+            .returning(s.c.line),
+            "client not found",
+        ),
+        (
+            delete(s)
+            .where(
+                s.c.client_id == earlier.c.client_id,
+                s_number == earlier_number,
+                s.c.line > earlier.c.line,
+            )
+            .returning(s.c.line),
+            "car repeated in file",
+        ),
+        (
+            delete(s)
+            .where(
+                Car.client_id == s.c.client_id,
+                Car.number_normalized == s_number,
+                Car.is_deleted.is_(False),
+            )
+            .returning(s.c.line),
+            "car already exists",
+        ),
+    ]
+
+
+def _car_load() -> Insert:
+    s = car_staging
+    return insert(Car).from_select(
+        ["client_id", "brand", "model", "number", "year", "is_deleted"],
+        select(
+            s.c.client_id, s.c.brand, s.c.model, s.c.number, s.c.year, literal(False)
+        ).order_by(s.c.line),
+    )
+
+
+def _app_checks() -> list[tuple[ReturningDelete[tuple[int]], str]]:
+    s = app_staging
+    return [
+        (
+            delete(s)
+            .where(
+                ~exists().where(
+                    and_(
+                        Car.id == s.c.car_id,
+                        Car.client_id == s.c.client_id,
+                        Car.is_deleted.is_(False),
+                    )
+                )
+            )
+            .returning(s.c.line),
+            "car not found for client",
+        ),
+    ]
+
+
+def _app_load() -> Insert:
+    s = app_staging
+    return insert(Application).from_select(
+        ["client_id", "car_id", "problem", "conn", "status", "priority", "created_at"],
+        select(
+            s.c.client_id,
+            s.c.car_id,
+            s.c.problem,
+            s.c.conn,
+            literal(Status.WAITING, Application.status.type),
+            literal(Priority.LOW, Application.priority.type),
+            func.now(),
+        ).order_by(s.c.line),
+    )
+
+
+IMPORT_SPECS: dict[ImportKind, ImportSpec] = {
+    ImportKind.clients: ImportSpec(
+        ClientRegisterRequest, client_staging, _client_checks, _client_load
+    ),
+    ImportKind.cars: ImportSpec(
+        CarRegisterRequest, car_staging, _car_checks, _car_load
+    ),
+    ImportKind.apps: ImportSpec(
+        AppRegisterRequest, app_staging, _app_checks, _app_load
+    ),
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def _ndjson_records(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"invalid json: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, "invalid json: object expected"
+            continue
+        yield line_no, record
+
+
+def _pop_lines(lines: deque[str]) -> Iterator[str]:
+    # csv.reader asks for lines of one record only after all of them are queued
+    while True:
+        yield lines.popleft()
+
+
+async def _csv_records(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    # quoted fields may span lines (problem text), one reader parses the whole
+    # stream and is fed a record once every quote opened in it is closed
+    queued: deque[str] = deque()
+    reader = csv.reader(_pop_lines(queued))
+    header: list[str] | None = None
+    line_no = record_line = record_quotes = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not queued:
+            if not line.strip():
+                continue
+            record_line = line_no
+        queued.append(line + "\n")
+        record_quotes += line.count('"')
+        if record_quotes % 2:
+            continue
+        record_quotes = 0
+        values = next(reader)
+        if header is None:
+            header = values
+            continue
+        if len(values) != len(header):
+            yield record_line, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield record_line, {k: v if v != "" else None for k, v in zip(header, values)}
+    if queued:
+        yield record_line, "unterminated quoted field"
+
+
+def iter_records(
+    chunks: AsyncIterator[bytes], fmt: ImportFormat
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    # yields (line number, raw record) or (line number, parse error message),
+    # line number of multiline csv record is its first line
+    if fmt == ImportFormat.ndjson:
+        return _ndjson_records(chunks)
+    return _csv_records(chunks)
+
+
+async def run_import(
+    session: AsyncSession,
+    kind: ImportKind,
+    fmt: ImportFormat,
+    chunks: AsyncIterator[bytes],
+) -> ImportReport:
+    spec = IMPORT_SPECS[kind]
+    report = ImportReport(kind=kind)
+    columns = [c.name for c in spec.staging.columns]
+    fields = columns[1:]
+
+    connection = await session.connection()
+    await connection.run_sync(lambda conn: spec.staging.create(conn))
+    raw_connection = await connection.get_raw_connection()
+    asyncpg_connection = raw_connection.driver_connection
+    assert asyncpg_connection is not None
+
+    batch: list[tuple[Any, ...]] = []
+
+    async def flush() -> None:
+        await asyncpg_connection.copy_records_to_table(
+            spec.staging.name, records=batch, columns=columns
+        )
+        batch.clear()
+
+    async for line_no, record in iter_records(chunks, fmt):
+        report.received += 1
+        if isinstance(record, str):
+            report.reject(line_no, record)
+            continue
+        try:
+            row = spec.schema.model_validate(record)
+        except ValidationError as e:
+            report.reject(
+                line_no,
+                "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                    for err in e.errors()
+                ),
+            )
+            continue
+        batch.append((line_no, *(getattr(row, field) for field in fields)))
+        if len(batch) >= COPY_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    for check, error in spec.checks():
+        for line_no in await session.scalars(check):
+            report.reject(line_no, error)
+
+    result = await session.execute(spec.load())
+    report.imported = result.rowcount
+    report.rejected.sort(key=lambda r: r.line)
+    return report
+
+
+async def _read_file(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def main(kind: ImportKind, path: Path, fmt: ImportFormat) -> ImportReport:
+    async with database_session.get_async_session() as session:
+        report = await run_import(session, kind, fmt, _read_file(path))
+        await session.commit()
+    await database_session.dispose_async_engine()
+    return report
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Bulk import from NDJSON or CSV file")
+    parser.add_argument("kind", type=ImportKind, choices=list(ImportKind))
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format",
+        dest="fmt",
+        type=ImportFormat,
+        choices=list(ImportFormat),
+        default=None,
+    )
+    args = parser.parse_args()
+    fmt = args.fmt or (
+        ImportFormat.csv if args.path.suffix == ".csv" else ImportFormat.ndjson
+    )
+
+    print(asyncio.run(main(args.kind, args.path, fmt)).model_dump_json(indent=2))
@@ -0,0 +1,177 @@
+# Live application board, pushes application changes to staff screens
+#
+# Write statements of applications return app_event_notify() column, which
+# sends one NOTIFY on APP_BOARD_CHANNEL per changed row from within the same
+# statement. It is delivered to every worker after commit (see
+# app/core/pg_listener.py), so all writes are seen no matter which worker
+# served them and rolled back ones are never seen.
+#
+# Payload is json with current status and assignees of application. Every
+# worker parses it once into AppBoardEvent, formats server sent events frame
+# and fans it out to bounded queues of its subscribers whose viewer sees it:
+#
+# ADMIN, SUPERADMIN    every application
+# DIAGNOSTIC           applications with diag_id of the viewer
+# MECHANIC             applications with mechanic_id of the viewer
+#
+# Subscriber that does not keep up (queue full) and all subscribers after
+# listener reconnect lost events, they get "resync" event instead and should
+# reload the list with admin.get_all_apps or get_app endpoints.
+# Stream holds no database connection, only its queue. It is authorized once
+# from token claims and ends when role claim gets too old for deps.require_roles.
+
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from sqlalchemy import ColumnElement, Text, cast, func, literal_column
+
+from app.core import pg_listener
+from app.core.config import get_settings
+from app.models import Application, Priority, Role, Status
+from app.schemas.responses import AppBoardEvent
+
+APP_BOARD_CHANNEL = "application_changed"
+
+RESYNC_FRAME = "event: resync\ndata: {}\n\n"
+KEEPALIVE_FRAME = ": keepalive\n\n"
+
+
+def app_event_notify(event: Literal["created", "updated"]) -> ColumnElement[Any]:
+    # pg_notify of one application row, added to RETURNING of write statement
+    # (or selected from application), no extra round trip.
+    # Keys and event are sql literals, json_build_object cannot type bind params
+    fields: dict[str, Any] = {
+        "event": literal_column(f"'{event}'"),
+        "app_id": Application.id,
+        "status": Application.status,
+        "priority": Application.priority,
+        "diag_id": Application.diag_id,
+        "mechanic_id": Application.mechanic_id,
+    }
+    args: list[ColumnElement[Any]] = []
+    for key, value in fields.items():
+        args += [literal_column(f"'{key}'"), value]
+    return func.pg_notify(
+        APP_BOARD_CHANNEL,
+        cast(func.json_build_object(*args), Text),
+    ).label("app_board_notify")
+
+
+def parse_app_event(payload: str) -> AppBoardEvent:
+    # enums are in json as stored in database, status by member name,
+    # priority by value
+    raw = json.loads(payload)
+    return AppBoardEvent(
+        event=raw["event"],
+        app_id=raw["app_id"],
+        status=Status[raw["status"]],
+        priority=Priority(raw["priority"]),
+        diag_id=raw["diag_id"],
+        mechanic_id=raw["mechanic_id"],
+    )
+
+
+@dataclass(frozen=True)
+class BoardViewer:
+    user_id: int
+    role: Role
+
+    def sees(self, event: AppBoardEvent) -> bool:
+        if self.role in (Role.ADMIN, Role.SUPERADMIN):
+            return True
+        if self.role == Role.DIAGNOSTIC:
+            return event.diag_id == self.user_id
+        if self.role == Role.MECHANIC:
+            return event.mechanic_id == self.user_id
+        return False
+
+
+class AppBoard:
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscribers: dict[asyncio.Queue[str], BoardViewer] = {}
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, viewer: BoardViewer) -> asyncio.Queue[str]:
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[queue] = viewer
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[str]) -> None:
+        self._subscribers.pop(queue, None)
+
+    def publish(self, payload: str) -> None:
+        event = parse_app_event(payload)
+        frame = f"event: application\ndata: {event.model_dump_json()}\n\n"
+        for queue, viewer in self._subscribers.items():
+            if viewer.sees(event):
+                self._put(queue, frame)
+
+    def resync(self) -> None:
+        for queue in self._subscribers:
+            self._resync(queue)
+
+    def _put(self, queue: asyncio.Queue[str], frame: str) -> None:
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._resync(queue)
+
+    @staticmethod
+    def _resync(queue: asyncio.Queue[str]) -> None:
+        # buffered events are superseded by reload the client does on resync
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC_FRAME)
+
+    async def stream(
+        self, viewer: BoardViewer, keepalive_secs: float, until: float
+    ) -> AsyncGenerator[str]:
+        # ends at until (unix time), client reconnects with fresh token,
+        # so role change or token revocation applies to open streams too
+        queue = self.subscribe(viewer)
+        try:
+            while (remaining := until - time.time()) > 0:
+                try:
+                    yield await asyncio.wait_for(
+                        queue.get(), min(keepalive_secs, remaining)
+                    )
+                except TimeoutError:
+                    # keeps proxies from closing idle connection
+                    yield KEEPALIVE_FRAME
+        finally:
+            self.unsubscribe(queue)
+
+
+@dataclass
+class _AppBoardHolder:
+    board: AppBoard | None = None
+
+
+_APP_BOARD = _AppBoardHolder()
+
+
+def get_app_board() -> AppBoard:
+    if _APP_BOARD.board is None:
+        _APP_BOARD.board = AppBoard(get_settings().board.queue_size)
+    return _APP_BOARD.board
+
+
+def _publish(payload: str) -> None:
+    get_app_board().publish(payload)
+
+
+async def _resync_on_connect() -> None:
+    # events sent while listener was disconnected were missed
+    get_app_board().resync()
+
+
+pg_listener.on_notification(APP_BOARD_CHANNEL, _publish)
+pg_listener.on_connect(_resync_on_connect)
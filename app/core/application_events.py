@@ -0,0 +1,135 @@
+# Application status history
+#
+# Table application_event (models.ApplicationEvent) gets one row per status
+# change: from_status -> to_status of app_id at created_at. Creation of
+# application is row with from_status NULL at application created_at.
+# Rows are inserted by statement level triggers on application, within the
+# statement that changed status, one INSERT per statement however many rows it
+# changed, so bulk updates and imports are logged in batch and no write path
+# can skip it. Rows are never updated or deleted by the app.
+#
+# Allowed changes are models.STATUS_TRANSITIONS, they are checked by writes in
+# app/repositories/applications.py, log records whatever was written.
+#
+# Table is partitioned by month of created_at, turnaround analytics read only
+# partitions of their period and old months can be detached or dropped as a
+# whole. Partitions are created ahead by run_event_partition_maintenance() on
+# every worker, serialized by advisory lock. Rows outside of existing months
+# go to application_event_default partition, they are moved into their month
+# partition when it gets created.
+#
+# DDL is created with the tables by create_all (see models.py),
+# migrations keep frozen copy of it.
+
+
+import asyncio
+import logging
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session
+
+logger = logging.getLogger(__name__)
+
+EVENT_DEFAULT_PARTITION = "application_event_default"
+EVENT_DEFAULT_PARTITION_DDL = (
+    f"CREATE TABLE {EVENT_DEFAULT_PARTITION} PARTITION OF application_event DEFAULT"
+)
+# current month and this many next ones are kept created
+EVENT_PARTITION_MONTHS_AHEAD = 2
+EVENT_PARTITION_CHECK_INTERVAL_SECS = 6 * 3600
+# pg_advisory_xact_lock key of partition maintenance, any constant unique in this database
+EVENT_PARTITION_LOCK_ID = 0x61707065
+
+# trigger operation -> rows with status change, as (app_id, from_status, to_status, created_at)
+EVENT_TRIGGERS: dict[str, tuple[str, str]] = {
+    "INSERT": (
+        "NEW TABLE AS new_rows",
+        "SELECT id, NULL::status, status, created_at FROM new_rows",
+    ),
+    "UPDATE": (
+        "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        "SELECT new_rows.id, old_rows.status, new_rows.status, now() "
+        "FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id "
+        "WHERE new_rows.status <> old_rows.status",
+    ),
+}
+
+
+def event_trigger_ddl() -> list[str]:
+    statements = []
+    for operation, (referencing, changes) in EVENT_TRIGGERS.items():
+        name = f"application_event_{operation.lower()}"
+        statements += [
+            f"""CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO application_event (app_id, from_status, to_status, created_at)
+    {changes}
+    ORDER BY 1;
+    RETURN NULL;
+END
+$$""",
+            f"CREATE TRIGGER {name} AFTER {operation} ON application "
+            f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {name}()",
+        ]
+    return statements
+
+
+def month_start(moment: datetime, months_after: int = 0) -> datetime:
+    month_index = moment.year * 12 + moment.month - 1 + months_after
+    return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=UTC)
+
+
+def event_partition_name(start: datetime) -> str:
+    return f"application_event_y{start.year}m{start.month:02d}"
+
+
+async def ensure_event_partitions(
+    session: AsyncSession, now: datetime, months_ahead: int
+) -> list[str]:
+    await session.execute(select(func.pg_advisory_xact_lock(EVENT_PARTITION_LOCK_ID)))
+    existing = set(
+        await session.scalars(
+            text(
+                "SELECT inhrelid::regclass::text FROM pg_inherits "
+                "WHERE inhparent = 'application_event'::regclass"
+            )
+        )
+    )
+
+    created = []
+    for months_after in range(months_ahead + 1):
+        start = month_start(now.astimezone(UTC), months_after)
+        name = event_partition_name(start)
+        if name in existing:
+            continue
+        bounds = f"created_at >= '{start.isoformat()}' AND created_at < '{month_start(start, 1).isoformat()}'"
+        # rows of the month already in default partition would fail ATTACH
+        for statement in (
+            f"CREATE TABLE {name} (LIKE application_event INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+            f"WITH moved AS (DELETE FROM {EVENT_DEFAULT_PARTITION} WHERE {bounds} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            f"ALTER TABLE application_event ATTACH PARTITION {name} FOR VALUES "
+            f"FROM ('{start.isoformat()}') TO ('{month_start(start, 1).isoformat()}')",
+        ):
+            await session.execute(text(statement))
+        created.append(name)
+
+    await session.commit()
+    return created
+
+
+async def run_event_partition_maintenance() -> None:
+    while True:
+        try:
+            async with database_session.get_async_session() as session:
+                created = await ensure_event_partitions(
+                    session, datetime.now(UTC), EVENT_PARTITION_MONTHS_AHEAD
+                )
+            if created:
+                logger.info("created application event partitions %s", created)
+        except Exception:
+            logger.exception("application event partition maintenance failed")
+        await asyncio.sleep(EVENT_PARTITION_CHECK_INTERVAL_SECS)
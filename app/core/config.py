@@ -9,14 +9,17 @@
 # 3. Default values
 #
 # "sqlalchemy_database_uri" is computed field that will create valid database URL
+# "sqlalchemy_replica_database_uri" is the same for optional read replica, None if not set
 #
 # See https://pydantic-docs.helpmanual.io/usage/settings/
 # Note, complex types like lists are read as json-encoded strings.
 
 
 import logging.config
+from datetime import time
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic import AnyHttpUrl, BaseModel, Field, SecretStr, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -29,8 +32,36 @@ class Security(BaseModel):
     jwt_issuer: str = "my-app"
     jwt_secret_key: SecretStr = SecretStr("sk-change-me")
     jwt_access_token_expire_secs: int = 24 * 3600  # 1d
+    # recently verified access tokens memo per worker, see app/core/security/jwt.py
+    jwt_verified_cache_size: int = 4096
+    # role claim is trusted by deps.require_roles only this long after token was
+    # issued, so role change or removal takes effect within this window
+    jwt_role_claim_max_age_secs: int = 600
+    # HS256 signs with jwt_secret_key, EdDSA and RS256 with rotating keys
+    # published in /.well-known/jwks.json, see app/core/security/signing_keys.py
+    jwt_algorithm: Literal["HS256", "EdDSA", "RS256"] = "HS256"
+    jwt_key_rotation_secs: int = 30 * 24 * 3600  # 30d
+    # new key is published this long before it signs, keep jwks_max_age_secs below
+    jwt_key_publish_lead_secs: int = 3600
+    jwt_key_check_interval_secs: int = 600
+    jwks_max_age_secs: int = 900
     refresh_token_expire_secs: int = 28 * 24 * 3600  # 28d
+    refresh_token_purge_interval_secs: int = 3600
+    refresh_token_purge_batch_size: int = 5000
     password_bcrypt_rounds: int = 12
+    # bcrypt thread pool per worker, calls above workers + queue get 503
+    password_hash_workers: int = 2
+    password_hash_queue: int = 32
+    # login attempts token buckets, burst is bucket size, see app/core/security/rate_limit.py
+    login_rate_limit_backend: Literal["memory", "postgres"] = "memory"
+    login_rate_limit_max_keys: int = 100_000
+    login_user_burst: int = 5
+    login_user_refill_per_min: float = 5.0
+    login_ip_burst: int = 20
+    login_ip_refill_per_min: float = 30.0
+    # per worker cache of user rows for deps.get_current_user, ttl 0 disables it
+    user_cache_size: int = 10_000
+    user_cache_ttl_secs: float = 60.0
     allowed_hosts: list[str] = ["localhost", "127.0.0.1"]
     backend_cors_origins: list[AnyHttpUrl] = []
 
@@ -41,11 +72,63 @@ class Database(BaseModel):
     password: SecretStr = SecretStr("passwd-change-me")
     port: int = 5432
     db: str = "petdb"
+    # connection pool, per uvicorn worker, so total is workers * (pool_size + max_overflow)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout_secs: float = 30.0
+    pool_recycle_secs: int = 600
+    pool_pre_ping: bool = True
+    connect_timeout_secs: float = 10.0
+    command_timeout_secs: float | None = None
+    # set when connecting through PgBouncer in transaction mode, pooling is then
+    # left to PgBouncer and asyncpg prepared statement caches are disabled
+    pooler_mode: bool = False
+    # optional streaming replica for read only endpoints, same credentials and db name
+    replica_hostname: str | None = None
+    replica_port: int | None = None
+
+
+class Board(BaseModel):
+    # live application board stream, see app/core/app_board.py
+    # events buffered per subscriber, slower client gets "resync" event instead
+    queue_size: int = 256
+    keepalive_secs: float = 15.0
+
+
+class Schedule(BaseModel):
+    # arrival slots of applications, see app/core/schedule.py
+    # working hours are wall clock of timezone, days are ISO weekdays (1 is Monday)
+    timezone: str = "Europe/Moscow"
+    working_days: list[int] = [1, 2, 3, 4, 5, 6]
+    opens_at: time = time(9)
+    closes_at: time = time(18)
+    slot_minutes: int = 60
+    # cars served at the same time, every slot can be booked this many times
+    bays: int = 2
+
+
+class Notify(BaseModel):
+    # client notifications outbox, see app/core/notifications.py
+    # sendMessage url of messenger bot, nothing is sent while not set
+    url: SecretStr | None = None
+    batch_size: int = 100
+    # concurrent requests and pooled connections per worker
+    concurrency: int = 10
+    timeout_secs: float = 10.0
+    max_attempts: int = 8
+    retry_base_secs: float = 2.0
+    retry_max_secs: float = 900.0
+    # claimed batch is retried after this long if the worker dies, keep above timeout_secs
+    lease_secs: int = 120
+    poll_interval_secs: float = 5.0
 
 
 class Settings(BaseSettings):
     security: Security = Field(default_factory=Security)
     database: Database = Field(default_factory=Database)
+    board: Board = Field(default_factory=Board)
+    schedule: Schedule = Field(default_factory=Schedule)
+    notify: Notify = Field(default_factory=Notify)
     log_level: str = "INFO"
 
     @computed_field  # type: ignore[prop-decorator]
@@ -60,6 +143,16 @@ class Settings(BaseSettings):
             database=self.database.db,
         )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def sqlalchemy_replica_database_uri(self) -> URL | None:
+        if self.database.replica_hostname is None:
+            return None
+        return self.sqlalchemy_database_uri.set(
+            host=self.database.replica_hostname,
+            port=self.database.replica_port or self.database.port,
+        )
+
     model_config = SettingsConfigDict(
         env_file=f"{PROJECT_DIR}/.env",
         case_sensitive=False,
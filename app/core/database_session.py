@@ -4,8 +4,21 @@
 #
 # for pool size configuration:
 # https://docs.sqlalchemy.org/en/20/core/pooling.html#sqlalchemy.pool.Pool
+#
+# Engine is created lazily on first use, so every uvicorn worker process
+# builds its own pool after fork, with values from Settings.database.
+#
+# Optional read replica gets its own engine with the same pool settings,
+# when it is not configured, reads go to primary.
+#
+# pooler_mode is for PgBouncer in transaction mode, see
+# https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#prepared-statement-name-with-pgbouncer
 
 
+from dataclasses import dataclass
+from typing import Any
+from uuid import uuid4
+
 from sqlalchemy.engine.url import URL
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -13,24 +26,100 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import NullPool
+
+from app.core.config import Database, get_settings
+
 
-from app.core.config import get_settings
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(database: Database) -> dict[str, Any]:
+    connect_args: dict[str, Any] = {
+        "timeout": database.connect_timeout_secs,
+        "command_timeout": database.command_timeout_secs,
+    }
+
+    if database.pooler_mode:
+        # PgBouncer hands every transaction to possibly different server
+        # connection, so named prepared statements and their caches must not
+        # be reused, and connections are pooled by PgBouncer, not by us
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = _prepared_statement_name
+        return {
+            "poolclass": NullPool,
+            "pool_pre_ping": database.pool_pre_ping,
+            "connect_args": connect_args,
+        }
+
+    return {
+        "pool_pre_ping": database.pool_pre_ping,
+        "pool_size": database.pool_size,
+        "max_overflow": database.max_overflow,
+        "pool_timeout": database.pool_timeout_secs,
+        "pool_recycle": database.pool_recycle_secs,
+        "connect_args": connect_args,
+    }
 
 
 def new_async_engine(uri: URL) -> AsyncEngine:
-    return create_async_engine(
-        uri,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
-        pool_timeout=30.0,
-        pool_recycle=600,
-    )
+    return create_async_engine(uri, **engine_options(get_settings().database))
+
 
+@dataclass
+class _Engines:
+    # created lazily per worker process, reset by dispose_async_engine()
+    primary: AsyncEngine | None = None
+    primary_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+    replica: AsyncEngine | None = None
+    replica_sessionmaker: async_sessionmaker[AsyncSession] | None = None
 
-_ASYNC_ENGINE = new_async_engine(get_settings().sqlalchemy_database_uri)
-_ASYNC_SESSIONMAKER = async_sessionmaker(_ASYNC_ENGINE, expire_on_commit=False)
+
+_ENGINES = _Engines()
+
+
+def get_async_engine() -> AsyncEngine:
+    if _ENGINES.primary is None:
+        _ENGINES.primary = new_async_engine(get_settings().sqlalchemy_database_uri)
+    return _ENGINES.primary
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    if _ENGINES.primary_sessionmaker is None:
+        _ENGINES.primary_sessionmaker = async_sessionmaker(
+            get_async_engine(), expire_on_commit=False
+        )
+    return _ENGINES.primary_sessionmaker
+
+
+def get_async_replica_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    if _ENGINES.replica_sessionmaker is None:
+        replica_uri = get_settings().sqlalchemy_replica_database_uri
+        assert replica_uri is not None
+        _ENGINES.replica = new_async_engine(replica_uri)
+        _ENGINES.replica_sessionmaker = async_sessionmaker(
+            _ENGINES.replica, expire_on_commit=False
+        )
+    return _ENGINES.replica_sessionmaker
 
 
 def get_async_session() -> AsyncSession:  # pragma: no cover
-    return _ASYNC_SESSIONMAKER()
+    return get_async_sessionmaker()()
+
+
+def get_async_read_session() -> AsyncSession:
+    if get_settings().sqlalchemy_replica_database_uri is None:
+        return get_async_session()
+    return get_async_replica_sessionmaker()()
+
+
+async def dispose_async_engine() -> None:
+    for engine in (_ENGINES.primary, _ENGINES.replica):
+        if engine is not None:
+            await engine.dispose()
+    _ENGINES.primary = None
+    _ENGINES.primary_sessionmaker = None
+    _ENGINES.replica = None
+    _ENGINES.replica_sessionmaker = None
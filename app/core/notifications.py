@@ -0,0 +1,111 @@
+# Client notifications about status of their applications
+#
+# Status change of application inserts row into notification_outbox
+# (models.NotificationOutbox) by statement level trigger, in the same
+# transaction as the change, so notification is sent if and only if the change
+# was committed, and no request waits for the messaging provider.
+# Trigger also sends NOTIFY on NOTIFY_CHANNEL to wake up the dispatcher.
+#
+# Dispatcher (app/repositories/notification_outbox.py) runs on every worker,
+# claims due rows in batches with FOR UPDATE SKIP LOCKED and delivers them over
+# one pooled http client of the worker, notify.concurrency requests at a time.
+# Delivered rows are deleted. Failed ones are retried with exponential backoff
+# with jitter, up to notify.max_attempts, then kept with failed_at set.
+# Provider errors 429 and 5xx and network errors are retried, other 4xx are not.
+#
+# client_id is messenger user id, payload is {"chat_id": client_id, "text": ...}
+# as of Telegram bot sendMessage, set NOTIFY__URL to
+# https://api.telegram.org/bot<token>/sendMessage or to local stub
+# (app/notification_stub.py). Without NOTIFY__URL nothing is sent and rows stay
+# in outbox until it is set.
+#
+# DDL is created with application table by create_all (see models.py),
+# migrations keep frozen copy of it.
+
+
+import random
+from dataclasses import dataclass
+
+import httpx
+
+from app.core.config import get_settings
+
+NOTIFY_CHANNEL = "notification_outbox"
+
+OUTBOX_TRIGGER_DDL = [
+    f"""CREATE FUNCTION notification_outbox_update() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO notification_outbox (client_id, app_id, status)
+    SELECT new_rows.client_id, new_rows.id, new_rows.status
+    FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+    WHERE new_rows.status <> old_rows.status
+    ORDER BY new_rows.id;
+    IF FOUND THEN
+        PERFORM pg_notify('{NOTIFY_CHANNEL}', '');
+    END IF;
+    RETURN NULL;
+END
+$$""",
+    "CREATE TRIGGER notification_outbox_update AFTER UPDATE ON application "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notification_outbox_update()",
+]
+
+
+@dataclass(frozen=True)
+class DeliveryError:
+    error: str
+    retryable: bool
+
+
+def retry_delay_secs(attempts: int, base_secs: float, max_secs: float) -> float:
+    # full delay doubles with every attempt, jitter spreads retries of a batch
+    return min(max_secs, base_secs * 2.0**attempts) * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class _NotifyClientHolder:
+    client: httpx.AsyncClient | None = None
+
+
+_NOTIFY_CLIENT = _NotifyClientHolder()
+
+
+def set_notify_client(client: httpx.AsyncClient | None) -> None:
+    _NOTIFY_CLIENT.client = client
+
+
+def get_notify_client() -> httpx.AsyncClient:
+    if _NOTIFY_CLIENT.client is None:
+        notify = get_settings().notify
+        _NOTIFY_CLIENT.client = httpx.AsyncClient(
+            timeout=notify.timeout_secs,
+            limits=httpx.Limits(
+                max_connections=notify.concurrency,
+                max_keepalive_connections=notify.concurrency,
+            ),
+        )
+    return _NOTIFY_CLIENT.client
+
+
+async def close_notify_client() -> None:
+    if _NOTIFY_CLIENT.client is not None:
+        await _NOTIFY_CLIENT.client.aclose()
+        _NOTIFY_CLIENT.client = None
+
+
+async def deliver(
+    client: httpx.AsyncClient, url: str, payload: dict[str, object]
+) -> DeliveryError | None:
+    try:
+        response = await client.post(url, json=payload)
+    except httpx.HTTPError as exc:
+        return DeliveryError(f"{type(exc).__name__}: {exc}", retryable=True)
+    if response.is_success:
+        return None
+    code = response.status_code
+    return DeliveryError(
+        f"HTTP {code}: {response.text[:200]}",
+        retryable=code == httpx.codes.TOO_MANY_REQUESTS
+        or code >= httpx.codes.INTERNAL_SERVER_ERROR,
+    )
@@ -0,0 +1,37 @@
+# Keyset (cursor) pagination helpers
+#
+# Cursor is an opaque urlsafe base64 string that encodes the sort key
+# of the last row on the previous page: "(created_at, id)".
+# Next page is "WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC",
+# so with index on (created_at, id) every page costs the same no matter how deep it is.
+#
+# https://use-the-index-luke.com/no-offset
+
+
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+CURSOR_INVALID = "Cursor invalid"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=CURSOR_INVALID,
+        )
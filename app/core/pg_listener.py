@@ -0,0 +1,100 @@
+# One postgres LISTEN connection per worker shared by all in-process subscribers
+#
+# Modules register callbacks at import time:
+#
+# on_notification("channel", callback)   called with payload of every NOTIFY
+# on_connect(async_callback)             called after every (re)connect
+#
+# listen_notifications() runs in app lifespan. It keeps dedicated connection
+# LISTENing on all registered channels and reconnects when it is lost.
+# Notifications sent while disconnected are lost, so on_connect callbacks must
+# resync their state (reload from database or drop caches).
+# Lifespan waits for first connect attempt, state loaded in on_connect is
+# ready before first request is served.
+#
+# LISTEN needs session level connection, it does not work through PgBouncer
+# in transaction mode, point DATABASE__HOSTNAME of such setup directly to postgres
+# or accept that only on_connect resync happens.
+
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+
+from app.core import database_session
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECS = 1.0
+
+_NOTIFICATION_CALLBACKS: defaultdict[str, list[Callable[[str], None]]] = defaultdict(
+    list
+)
+_CONNECT_CALLBACKS: list[Callable[[], Awaitable[None]]] = []
+
+
+def on_notification(channel: str, callback: Callable[[str], None]) -> None:
+    _NOTIFICATION_CALLBACKS[channel].append(callback)
+
+
+def on_connect(callback: Callable[[], Awaitable[None]]) -> None:
+    _CONNECT_CALLBACKS.append(callback)
+
+
+def _dispatch(connection: Any, pid: int, channel: str, payload: str) -> None:
+    for callback in _NOTIFICATION_CALLBACKS[channel]:
+        try:
+            callback(payload)
+        except Exception:
+            logger.exception("notification callback failed on %s", channel)
+
+
+async def _listen_once(connected: asyncio.Event) -> None:
+    async with database_session.get_async_engine().connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        asyncpg_connection = raw_connection.driver_connection
+        assert asyncpg_connection is not None
+
+        lost = asyncio.Event()
+        asyncpg_connection.add_termination_listener(lambda _: lost.set())
+        for channel in _NOTIFICATION_CALLBACKS:
+            await asyncpg_connection.add_listener(channel, _dispatch)
+        # listeners first, resync second, nothing sent in between is missed
+        for callback in _CONNECT_CALLBACKS:
+            await callback()
+        connected.set()
+
+        try:
+            await lost.wait()
+        finally:
+            if not asyncpg_connection.is_closed():
+                for channel in _NOTIFICATION_CALLBACKS:
+                    await asyncpg_connection.remove_listener(channel, _dispatch)
+    logger.warning("notification listener connection lost, reconnecting")
+
+
+async def _listen_forever(connected: asyncio.Event) -> None:
+    while True:
+        try:
+            await _listen_once(connected)
+        except Exception:
+            logger.exception("notification listener failed")
+        # let lifespan continue even when database is down at startup
+        connected.set()
+        await asyncio.sleep(RECONNECT_DELAY_SECS)
+
+
+@asynccontextmanager
+async def listen_notifications() -> AsyncGenerator[None]:
+    connected = asyncio.Event()
+    listener = asyncio.create_task(_listen_forever(connected))
+    await connected.wait()
+    try:
+        yield
+    finally:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
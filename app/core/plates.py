@@ -0,0 +1,46 @@
+# Licence plate normalization
+#
+# Plates are typed by hand (front desk, Telegram bot) in any casing, with spaces
+# or dashes, and very often with Cyrillic letters swapped for identical looking
+# Latin ones ("А123ВС77" vs "A123BC77"). Russian plates only use 12 letters
+# that all have Latin twins, so we fold every plate to uppercase Latin + digits.
+#
+# The same mapping is used:
+# - in python, to normalize search input
+# - in SQL, as translate() expression of generated column "car.number_normalized"
+# translate() is IMMUTABLE and does not depend on database locale, unlike upper().
+#
+# Plate search is substring match on the normalized plate, so "123" finds
+# "A123BC77". It is served by trigram index PLATE_TRGM_INDEX where pg_trgm
+# extension is available (created by migration only, create_all does not need
+# it), otherwise it is a scan of car.
+
+
+CYRILLIC_LOOKALIKES = "АВЕКМНОРСТУХ"
+LATIN_LOOKALIKES = "ABEKMHOPCTYX"
+SEPARATORS = " -._"
+PLATE_TRGM_INDEX = "ix_car_number_normalized_trgm"
+
+PLATE_TRANSLATE_FROM = (
+    CYRILLIC_LOOKALIKES
+    + CYRILLIC_LOOKALIKES.lower()
+    + "abcdefghijklmnopqrstuvwxyz"
+    + SEPARATORS
+)
+PLATE_TRANSLATE_TO = LATIN_LOOKALIKES + LATIN_LOOKALIKES + "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# characters from PLATE_TRANSLATE_FROM without pair in PLATE_TRANSLATE_TO are removed,
+# same as in postgres translate()
+_PLATE_TABLE = str.maketrans(
+    PLATE_TRANSLATE_FROM[: len(PLATE_TRANSLATE_TO)],
+    PLATE_TRANSLATE_TO,
+    PLATE_TRANSLATE_FROM[len(PLATE_TRANSLATE_TO) :],
+)
+
+
+def normalize_plate(number: str) -> str:
+    return number.translate(_PLATE_TABLE)
+
+
+def plate_sql_expression(column: str) -> str:
+    return f"translate({column}, '{PLATE_TRANSLATE_FROM}', '{PLATE_TRANSLATE_TO}')"
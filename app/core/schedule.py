@@ -0,0 +1,40 @@
+# Arrival slots grid
+#
+# Working day from schedule.opens_at to schedule.closes_at (wall clock of
+# schedule.timezone) is split into slots of schedule.slot_minutes, last one
+# ends at or before closing. Every slot can hold schedule.bays arrivals.
+#
+# Bookings are rows of arrival_booking (models.ArrivalBooking), one per
+# application, unique by (slot_start, bay). So two bookings can never take the
+# same bay of a slot, the unique index settles concurrent bookings without
+# any lock of the slot, see app/repositories/arrival_slots.py.
+# Availability of a period is one index range scan of arrival_booking grouped
+# by slot_start, slots themselves are computed here, not stored.
+
+
+from datetime import UTC, date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.core.config import Schedule
+
+
+def day_slots(day: date, schedule: Schedule) -> list[datetime]:
+    # slot starts of the day in UTC, empty on days off
+    if day.isoweekday() not in schedule.working_days:
+        return []
+    tz = ZoneInfo(schedule.timezone)
+    step = timedelta(minutes=schedule.slot_minutes)
+    start = datetime.combine(day, schedule.opens_at, tzinfo=tz)
+    closes = datetime.combine(day, schedule.closes_at, tzinfo=tz)
+    slots = []
+    while start + step <= closes:
+        slots.append(start.astimezone(UTC))
+        start += step
+    return slots
+
+
+def is_slot(moment: datetime, schedule: Schedule) -> bool:
+    if moment.tzinfo is None:
+        return False
+    local_day = moment.astimezone(ZoneInfo(schedule.timezone)).date()
+    return moment in day_slots(local_day, schedule)
@@ -1,21 +1,38 @@
 import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
 
 import jwt
 from fastapi import HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, SecretStr
 
-from app.core.config import get_settings
+from app.core.config import Security, get_settings
+from app.core.security.revocation import get_revocation_list
+from app.core.security.signing_keys import get_key_ring
+from app.models import Role
 
+# symmetric algorithm, used when security.jwt_algorithm is HS256
 JWT_ALGORITHM = "HS256"
+TOKEN_REVOKED = "Token invalid: Token has been revoked"
+UNKNOWN_SIGNING_KEY = "Token invalid: Unknown signing key"
+MISSING_SIGNING_KEY_ID = "Token invalid: Missing signing key id"
+NO_SIGNING_KEY = "No access token signing key available, try again later"
 
 
 # Payload follows RFC 7519
 # https://www.rfc-editor.org/rfc/rfc7519#section-4.1
 class JWTTokenPayload(BaseModel):
+    # frozen, one instance is shared by all requests with the same token
+    model_config = ConfigDict(frozen=True)
+
     iss: str
     sub: str
     exp: int
-    iat: int
+    # with fraction, orders token after revocation of the same second
+    iat: float
+    # private claim, checked by deps.require_roles without database query
+    role: Role | None = None
 
 
 class JWTToken(BaseModel):
@@ -23,27 +40,123 @@ class JWTToken(BaseModel):
     access_token: str
 
 
-def create_jwt_token(user_id: str) -> JWTToken:
-    iat = int(time.time())
-    exp = iat + get_settings().security.jwt_access_token_expire_secs
+# Key, issuer and lifetime are read from settings once, not on every call.
+# Config is rebuilt when settings object or any of its jwt values is replaced,
+# verified tokens memo belongs to config, so changing key or issuer drops it.
+#
+# Memo maps raw token to its already verified payload. Hit is served only
+# while iat <= now < exp, the same window jwt.decode accepts, anything
+# outside goes through full jwt.decode to raise proper error.
+#
+# With EdDSA or RS256 key is not in config, tokens are signed by current key
+# of the signing key ring and verified by key named in their "kid" header.
+@dataclass
+class _JWTConfig:
+    security: Security
+    secret_key: SecretStr
+    issuer: str
+    expire_secs: int
+    algorithm: str
+    publish_lead_secs: int
+    key: str
+    verified_max_size: int
+    verified: OrderedDict[str, JWTTokenPayload] = field(default_factory=OrderedDict)
+
+    def is_current(self, security: Security) -> bool:
+        return (
+            security is self.security
+            and security.jwt_secret_key == self.secret_key
+            and security.jwt_issuer == self.issuer
+            and security.jwt_access_token_expire_secs == self.expire_secs
+            and security.jwt_algorithm == self.algorithm
+            and security.jwt_key_publish_lead_secs == self.publish_lead_secs
+        )
+
+
+@dataclass
+class _JWTConfigHolder:
+    config: _JWTConfig | None = None
+
+
+_JWT_CONFIG = _JWTConfigHolder()
+
+
+def _get_jwt_config() -> _JWTConfig:
+    security = get_settings().security
+    if _JWT_CONFIG.config is None or not _JWT_CONFIG.config.is_current(security):
+        _JWT_CONFIG.config = _JWTConfig(
+            security=security,
+            secret_key=security.jwt_secret_key,
+            issuer=security.jwt_issuer,
+            expire_secs=security.jwt_access_token_expire_secs,
+            algorithm=security.jwt_algorithm,
+            publish_lead_secs=security.jwt_key_publish_lead_secs,
+            key=security.jwt_secret_key.get_secret_value(),
+            verified_max_size=security.jwt_verified_cache_size,
+        )
+    return _JWT_CONFIG.config
+
+
+def create_jwt_token(user_id: str, role: Role | None = None) -> JWTToken:
+    config = _get_jwt_config()
+    iat = time.time()
+    exp = int(iat) + config.expire_secs
 
     token_payload = JWTTokenPayload(
-        iss=get_settings().security.jwt_issuer,
+        iss=config.issuer,
         sub=user_id,
         exp=exp,
         iat=iat,
+        role=role,
     )
 
-    access_token = jwt.encode(
-        token_payload.model_dump(),
-        key=get_settings().security.jwt_secret_key.get_secret_value(),
-        algorithm=JWT_ALGORITHM,
-    )
+    claims = token_payload.model_dump(mode="json", exclude_none=True)
+    if config.algorithm == JWT_ALGORITHM:
+        access_token = jwt.encode(claims, key=config.key, algorithm=JWT_ALGORITHM)
+    else:
+        signing_key = get_key_ring().signing_key(iat, config.publish_lead_secs)
+        if signing_key is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=NO_SIGNING_KEY,
+            )
+        access_token = jwt.encode(
+            claims,
+            key=signing_key.private_key,
+            algorithm=config.algorithm,
+            headers={"kid": signing_key.kid},
+        )
 
     return JWTToken(payload=token_payload, access_token=access_token)
 
 
 def verify_jwt_token(token: str) -> JWTTokenPayload:
+    config = _get_jwt_config()
+
+    token_payload = config.verified.get(token)
+    if (
+        token_payload is not None
+        and token_payload.iat <= time.time() < token_payload.exp
+    ):
+        config.verified.move_to_end(token)
+    else:
+        config.verified.pop(token, None)
+        token_payload = _decode_jwt_token(token, config)
+        if config.verified_max_size > 0:
+            config.verified[token] = token_payload
+            if len(config.verified) > config.verified_max_size:
+                config.verified.popitem(last=False)
+
+    # checked on memo hits too, revocation must apply to already verified tokens
+    if get_revocation_list().is_revoked(token_payload.sub, token_payload.iat):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=TOKEN_REVOKED,
+        )
+    return token_payload
+
+
+def _decode_jwt_token(token: str, config: _JWTConfig) -> JWTTokenPayload:
     # Pay attention to verify_signature passed explicite, even if it is the default.
     # Verification is based on expected payload fields like "exp", "iat" etc.
     # so if you rename for example "exp" to "my_custom_exp", this is gonna break,
@@ -52,13 +165,30 @@ def verify_jwt_token(token: str) -> JWTTokenPayload:
     # If unsure, jump into jwt.decode code, make sure tests are passing
     # https://pyjwt.readthedocs.io/en/stable/usage.html#encoding-decoding-tokens-with-hs256
 
+    key: Any
     try:
+        if config.algorithm == JWT_ALGORITHM:
+            key = config.key
+        else:
+            kid = jwt.get_unverified_header(token).get("kid")
+            if not isinstance(kid, str):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail=MISSING_SIGNING_KEY_ID,
+                )
+            signing_key = get_key_ring().get(kid)
+            if signing_key is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail=UNKNOWN_SIGNING_KEY,
+                )
+            key = signing_key.public_key
         raw_payload = jwt.decode(
             token,
-            get_settings().security.jwt_secret_key.get_secret_value(),
-            algorithms=[JWT_ALGORITHM],
+            key,
+            algorithms=[config.algorithm],
             options={"verify_signature": True},
-            issuer=get_settings().security.jwt_issuer,
+            issuer=config.issuer,
         )
     except jwt.InvalidTokenError as e:
         raise HTTPException(
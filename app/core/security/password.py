@@ -1,7 +1,35 @@
+# bcrypt is slow on purpose, about 250 ms per call at 12 rounds, and it
+# releases the GIL, so async handlers run it on dedicated thread pool
+# through hash_password / check_password instead of blocking event loop.
+#
+# Pool is bounded: at most password_hash_workers calls run at once and at most
+# password_hash_queue more wait for a free thread. Anything above is rejected
+# with 503 right away, burst of logins cannot pile up unbounded work and
+# memory in one worker. Counters are available via get_password_hasher().stats()
+#
+# Cost (rounds) is part of every hash, changing password_bcrypt_rounds applies
+# to new hashes and to existing ones on next successful login, see
+# password_needs_rehash(). Pick the value with python -m app.bcrypt_calibration
+
+
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import ParamSpec, TypeVar
+
 import bcrypt
+from fastapi import HTTPException, status
 
 from app.core.config import get_settings
 
+P = ParamSpec("P")
+T = TypeVar("T")
+
+PASSWORD_HASHING_BUSY = "Too many password checks in progress, try again later"
+PASSWORD_HASHING_RETRY_AFTER_SECS = 1
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
@@ -16,4 +44,133 @@ def get_password_hash(password: str) -> str:
     ).decode()
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # modular crypt format "$2b$12$<salt and hash>", 12 is cost
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return False
+    return rounds != get_settings().security.password_bcrypt_rounds
+
+
 DUMMY_PASSWORD = get_password_hash("")
+
+
+@dataclass(frozen=True)
+class PasswordHasherStats:
+    max_workers: int
+    max_queue: int
+    running: int
+    queued: int
+    completed: int
+    rejected: int
+    wait_secs_total: float
+    run_secs_total: float
+
+
+class PasswordHasher:
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_secs_total = 0.0
+        self._run_secs_total = 0.0
+
+    def stats(self) -> PasswordHasherStats:
+        return PasswordHasherStats(
+            max_workers=self.max_workers,
+            max_queue=self.max_queue,
+            running=self._running,
+            queued=self._in_flight - self._running,
+            completed=self._completed,
+            rejected=self._rejected,
+            wait_secs_total=self._wait_secs_total,
+            run_secs_total=self._run_secs_total,
+        )
+
+    async def run(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=PASSWORD_HASHING_BUSY,
+                headers={"Retry-After": str(PASSWORD_HASHING_RETRY_AFTER_SECS)},
+            )
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+
+        def timed() -> T:
+            started_at = time.perf_counter()
+            loop.call_soon_threadsafe(self._started, started_at - submitted_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                loop.call_soon_threadsafe(
+                    self._finished, time.perf_counter() - started_at
+                )
+
+        # slot is released when thread is done, not when caller stops waiting,
+        # cancelled request still keeps its bcrypt call running to the end
+        self._in_flight += 1
+        future: Future[T] = self._executor.submit(timed)
+        future.add_done_callback(
+            lambda f: f.cancelled() and loop.call_soon_threadsafe(self._dropped)
+        )
+        return await asyncio.wrap_future(future)
+
+    def _started(self, wait_secs: float) -> None:
+        self._running += 1
+        self._wait_secs_total += wait_secs
+
+    def _finished(self, run_secs: float) -> None:
+        self._running -= 1
+        self._in_flight -= 1
+        self._completed += 1
+        self._run_secs_total += run_secs
+
+    def _dropped(self) -> None:
+        # cancelled by shutdown before it started
+        self._in_flight -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass
+class _PasswordHasherHolder:
+    hasher: PasswordHasher | None = None
+
+
+_PASSWORD_HASHER = _PasswordHasherHolder()
+
+
+def get_password_hasher() -> PasswordHasher:
+    if _PASSWORD_HASHER.hasher is None:
+        security = get_settings().security
+        _PASSWORD_HASHER.hasher = PasswordHasher(
+            security.password_hash_workers, security.password_hash_queue
+        )
+    return _PASSWORD_HASHER.hasher
+
+
+def shutdown_password_hasher() -> None:
+    if _PASSWORD_HASHER.hasher is not None:
+        _PASSWORD_HASHER.hasher.shutdown()
+    _PASSWORD_HASHER.hasher = None
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    return await get_password_hasher().run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def hash_password(password: str) -> str:
+    return await get_password_hasher().run(get_password_hash, password)
@@ -0,0 +1,172 @@
+# Token bucket rate limiter for login attempts
+#
+# Every key (e.g. "user:<username>", "ip:<address>", see bucket_key()) has
+# bucket of `capacity` tokens refilled continuously at `refill_per_sec`.
+# Each attempt takes one token, empty bucket means the attempt is rejected and
+# caller gets number of seconds until next token is available (for Retry-After
+# header).
+#
+# Buckets are stored by TokenBucketStore backend:
+# - MemoryTokenBucketStore (default), per worker, bounded LRU of keys,
+#   effective limit is then multiplied by number of workers and nodes
+# - PostgresTokenBucketStore, shared by all workers, one UNLOGGED table row per
+#   key updated with single atomic INSERT ... ON CONFLICT DO UPDATE
+#
+# Select backend with SECURITY__LOGIN_RATE_LIMIT_BACKEND=memory|postgres,
+# any other object implementing TokenBucketStore can be set with set_login_rate_limiter()
+
+
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core import database_session
+from app.core.config import get_settings
+from app.models import RateLimitBucket
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    capacity: int
+    refill_per_sec: float
+
+
+class TokenBucketStore(Protocol):
+    async def take(self, key: str, limit: BucketLimit) -> float:
+        # 0 when token was taken, otherwise seconds until next token
+        ...
+
+
+def _refilled(tokens: float, elapsed_secs: float, limit: BucketLimit) -> float:
+    return min(float(limit.capacity), tokens + elapsed_secs * limit.refill_per_sec)
+
+
+class MemoryTokenBucketStore:
+    def __init__(
+        self,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, limit: BucketLimit) -> float:
+        now = self.clock()
+        tokens, updated_at = self._buckets.get(key, (float(limit.capacity), now))
+        tokens = _refilled(tokens, now - updated_at, limit)
+
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            return (1 - tokens) / limit.refill_per_sec
+
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        # evicted key starts again with full bucket, keep max_keys well above
+        # number of distinct attackers expected within one refill period
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+
+class PostgresTokenBucketStore:
+    async def take(self, key: str, limit: BucketLimit) -> float:
+        table = RateLimitBucket.__table__
+        now = func.clock_timestamp()
+        elapsed_secs = func.extract("epoch", now - table.c.updated_at)
+        refilled = func.least(
+            limit.capacity, table.c.tokens + elapsed_secs * limit.refill_per_sec
+        )
+
+        stmt = (
+            insert(RateLimitBucket)
+            .values(key=key, tokens=limit.capacity - 1, updated_at=now)
+            .on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tokens": refilled - 1, "updated_at": now},
+                where=refilled >= 1,
+            )
+            .returning(literal(True))
+        )
+
+        async with database_session.get_async_session() as session:
+            taken = await session.scalar(stmt)
+            if taken:
+                await session.commit()
+                return 0.0
+            tokens = await session.scalar(select(refilled).where(table.c.key == key))
+            await session.commit()
+        return (1 - (tokens or 0.0)) / limit.refill_per_sec
+
+
+# length of rate_limit_bucket.key
+MAX_BUCKET_KEY_LENGTH = 256
+
+
+def bucket_key(kind: str, value: str) -> str:
+    # username comes from the login form as is, overlong one is replaced by
+    # its digest so key still fits the table and stays distinct
+    key = f"{kind}:{value}"
+    if len(key) > MAX_BUCKET_KEY_LENGTH:
+        key = f"{kind}:sha256:{hashlib.sha256(value.encode()).hexdigest()}"
+    return key
+
+
+@dataclass(frozen=True)
+class LoginRateLimiter:
+    store: TokenBucketStore
+    per_user: BucketLimit
+    per_ip: BucketLimit
+
+    async def check(self, username: str, client_ip: str | None) -> float:
+        # ip bucket first, flood of random usernames from one address
+        # is stopped without filling store with their keys
+        retry_after = 0.0
+        if client_ip is not None:
+            retry_after = await self.store.take(
+                bucket_key("ip", client_ip), self.per_ip
+            )
+        if not retry_after:
+            retry_after = await self.store.take(
+                bucket_key("user", username), self.per_user
+            )
+        return retry_after
+
+
+@dataclass
+class _LoginRateLimiterHolder:
+    limiter: LoginRateLimiter | None = None
+
+
+_LOGIN_RATE_LIMITER = _LoginRateLimiterHolder()
+
+
+def set_login_rate_limiter(limiter: LoginRateLimiter | None) -> None:
+    _LOGIN_RATE_LIMITER.limiter = limiter
+
+
+def get_login_rate_limiter() -> LoginRateLimiter:
+    if _LOGIN_RATE_LIMITER.limiter is None:
+        security = get_settings().security
+        store: TokenBucketStore
+        if security.login_rate_limit_backend == "postgres":
+            store = PostgresTokenBucketStore()
+        else:
+            store = MemoryTokenBucketStore(security.login_rate_limit_max_keys)
+        _LOGIN_RATE_LIMITER.limiter = LoginRateLimiter(
+            store=store,
+            per_user=BucketLimit(
+                security.login_user_burst, security.login_user_refill_per_min / 60
+            ),
+            per_ip=BucketLimit(
+                security.login_ip_burst, security.login_ip_refill_per_min / 60
+            ),
+        )
+    return _LOGIN_RATE_LIMITER.limiter
@@ -0,0 +1,115 @@
+# Access token revocation list
+#
+# Every worker keeps in memory map of JWT "sub" -> revoked_at (unix secs with
+# fraction), token is revoked when its iat <= revoked_at. Tokens carry iat with
+# fraction too (see create_jwt_token), so all tokens issued until revocation
+# stop working and new login works right away, even within the same second.
+# verify_jwt_token checks it on every call, no query.
+#
+# revoke_user_tokens() is called inside transaction of the write that requires it
+# (user deleted, password changed). It upserts token_revocation row, deletes
+# user's refresh tokens and sends NOTIFY on REVOCATION_CHANNEL, delivered to
+# all workers after commit (see app/core/pg_listener.py).
+# Whole list is (re)loaded from token_revocation on listener (re)connect,
+# so worker started later or reconnected does not miss any revocation.
+#
+# Rows older than access token lifetime cannot match any valid token,
+# they are deleted on load.
+
+
+import logging
+import time
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session, pg_listener
+from app.core.config import get_settings
+from app.models import RefreshToken, TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "token_revoked"
+
+
+class RevocationList:
+    def __init__(self) -> None:
+        self._revoked_at: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._revoked_at)
+
+    def revoke(self, sub: str, revoked_at: float) -> None:
+        self._revoked_at[sub] = max(revoked_at, self._revoked_at.get(sub, revoked_at))
+
+    def is_revoked(self, sub: str, iat: float) -> bool:
+        revoked_at = self._revoked_at.get(sub)
+        return revoked_at is not None and iat <= revoked_at
+
+    def reload(self, revoked_at: dict[str, float], oldest: int) -> None:
+        # keeps entries received by notification while database was read
+        for sub, at in self._revoked_at.items():
+            if at >= oldest:
+                revoked_at[sub] = max(at, revoked_at.get(sub, at))
+        self._revoked_at = revoked_at
+
+    def clear(self) -> None:
+        self._revoked_at = {}
+
+
+_REVOCATION_LIST = RevocationList()
+
+
+def get_revocation_list() -> RevocationList:
+    return _REVOCATION_LIST
+
+
+async def revoke_user_tokens(session: AsyncSession, user_id: int | str) -> None:
+    sub, revoked_at = str(user_id), time.time()
+
+    stmt = insert(TokenRevocation).values(sub=sub, revoked_at=revoked_at)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[TokenRevocation.sub],
+            set_={
+                "revoked_at": func.greatest(
+                    TokenRevocation.revoked_at, stmt.excluded.revoked_at
+                )
+            },
+        )
+    )
+    await session.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.user_id == int(user_id))
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(
+        select(func.pg_notify(REVOCATION_CHANNEL, f"{sub}:{revoked_at}"))
+    )
+    # this worker at once, not after notification round trip, rolled back
+    # transaction then only forces user to log in again
+    _REVOCATION_LIST.revoke(sub, revoked_at)
+
+
+async def load_revocations() -> None:
+    oldest = int(time.time()) - get_settings().security.jwt_access_token_expire_secs
+    async with database_session.get_async_session() as session:
+        await session.execute(
+            delete(TokenRevocation).where(TokenRevocation.revoked_at < oldest)
+        )
+        rows = await session.execute(
+            select(TokenRevocation.sub, TokenRevocation.revoked_at)
+        )
+        _REVOCATION_LIST.reload({row.sub: row.revoked_at for row in rows}, oldest)
+        await session.commit()
+    logger.info("loaded %s token revocations", len(_REVOCATION_LIST))
+
+
+def _on_notification(payload: str) -> None:
+    sub, revoked_at = payload.rsplit(":", 1)
+    _REVOCATION_LIST.revoke(sub, float(revoked_at))
+
+
+pg_listener.on_notification(REVOCATION_CHANNEL, _on_notification)
+pg_listener.on_connect(load_revocations)
@@ -0,0 +1,223 @@
+# Asymmetric access token signing keys (EdDSA or RS256) with rotation
+#
+# Used when security.jwt_algorithm is not HS256. Keys are generated by the app
+# itself and stored in jwt_signing_key table, private key as PKCS8 PEM
+# encrypted with security.jwt_secret_key, public key as JWK. Every worker keeps
+# all of them in memory (KeyRing), tokens carry "kid" header of signing key.
+#
+# Timeline of one key, lead = jwt_key_publish_lead_secs:
+#
+# created_at            published in /.well-known/jwks.json, not signing yet
+# created_at + lead     signs new tokens (newest key past its lead time),
+#                       downstream JWKS caches (max-age < lead) already know it
+# next key signs        no longer signs, still verifies tokens it signed
+# + token lifetime      deleted, no valid token can reference it
+#
+# rotate_signing_keys() creates new key when the signing one is older than
+# jwt_key_rotation_secs - lead and deletes dead keys. It runs on every worker
+# periodically and on listener (re)connect, serialized by advisory lock,
+# then sends NOTIFY on SIGNING_KEYS_CHANNEL, so all workers reload their KeyRing.
+
+
+import asyncio
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session, pg_listener
+from app.core.config import get_settings
+from app.models import JWTSigningKey
+
+logger = logging.getLogger(__name__)
+
+SIGNING_KEYS_CHANNEL = "jwt_signing_keys_changed"
+# pg_advisory_xact_lock key of rotation, any constant unique in this database
+ROTATION_LOCK_ID = 0x6A77746B
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    private_key: Any
+    public_key: Any
+    public_jwk: dict[str, Any]
+    created_at: int
+
+
+class KeyRing:
+    def __init__(self) -> None:
+        self._keys: list[SigningKey] = []
+        self._by_kid: dict[str, SigningKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def keys(self) -> list[SigningKey]:
+        # oldest first
+        return self._keys
+
+    def replace(self, keys: list[SigningKey]) -> None:
+        self._keys = sorted(keys, key=lambda k: k.created_at)
+        self._by_kid = {key.kid: key for key in self._keys}
+
+    def get(self, kid: str) -> SigningKey | None:
+        return self._by_kid.get(kid)
+
+    def signing_key(self, now: float, lead_secs: int) -> SigningKey | None:
+        # newest key past its lead time, the very first key signs right away
+        active = [key for key in self._keys if key.created_at + lead_secs <= now]
+        if active:
+            return active[-1]
+        return self._keys[0] if self._keys else None
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        return {"keys": [key.public_jwk for key in self._keys]}
+
+
+_KEY_RING = KeyRing()
+
+
+def get_key_ring() -> KeyRing:
+    return _KEY_RING
+
+
+def _generate_key(algorithm: str) -> tuple[Any, dict[str, Any]]:
+    private_key: Any
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        public_jwk = OKPAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        public_jwk = RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    return private_key, public_jwk
+
+
+def new_signing_key_row(algorithm: str, created_at: int) -> JWTSigningKey:
+    password = get_settings().security.jwt_secret_key.get_secret_value().encode()
+    private_key, public_jwk = _generate_key(algorithm)
+    kid = secrets.token_urlsafe(12)
+    return JWTSigningKey(
+        kid=kid,
+        algorithm=algorithm,
+        private_key=private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.BestAvailableEncryption(password),
+        ).decode(),
+        public_jwk={**public_jwk, "kid": kid, "alg": algorithm, "use": "sig"},
+        created_at=created_at,
+    )
+
+
+def _load_key(row: JWTSigningKey, password: bytes) -> SigningKey:
+    private_key = serialization.load_pem_private_key(
+        row.private_key.encode(), password=password
+    )
+    return SigningKey(
+        kid=row.kid,
+        algorithm=row.algorithm,
+        private_key=private_key,
+        public_key=private_key.public_key(),
+        public_jwk=row.public_jwk,
+        created_at=row.created_at,
+    )
+
+
+async def load_signing_keys(session: AsyncSession) -> None:
+    algorithm = get_settings().security.jwt_algorithm
+    password = get_settings().security.jwt_secret_key.get_secret_value().encode()
+    keys = []
+    for row in await session.scalars(
+        select(JWTSigningKey).where(JWTSigningKey.algorithm == algorithm)
+    ):
+        try:
+            keys.append(_load_key(row, password))
+        except ValueError:
+            # encrypted with previous jwt_secret_key, rotation replaces it
+            logger.warning("cannot decrypt jwt signing key %s", row.kid)
+    _KEY_RING.replace(keys)
+
+
+async def rotate_signing_keys(session: AsyncSession) -> bool:
+    # returns True when keys were changed, caller must commit
+    security = get_settings().security
+    if security.jwt_algorithm == "HS256":
+        return False
+    now = int(time.time())
+    lead = security.jwt_key_publish_lead_secs
+
+    await session.execute(select(func.pg_advisory_xact_lock(ROTATION_LOCK_ID)))
+    await load_signing_keys(session)
+
+    changed = False
+    keys = _KEY_RING.keys
+    # successor is published lead secs before it takes over, so signing key
+    # is replaced every jwt_key_rotation_secs
+    if not keys or keys[-1].created_at + security.jwt_key_rotation_secs - lead <= now:
+        session.add(new_signing_key_row(security.jwt_algorithm, now))
+        changed = True
+
+    # key stops signing when its successor becomes active and is needed
+    # to verify tokens for one more token lifetime after that
+    dead = [
+        key.kid
+        for key, successor in zip(keys, keys[1:])
+        if successor.created_at + lead + security.jwt_access_token_expire_secs < now
+    ]
+    if dead:
+        await session.execute(delete(JWTSigningKey).where(JWTSigningKey.kid.in_(dead)))
+        changed = True
+
+    if changed:
+        await session.execute(select(func.pg_notify(SIGNING_KEYS_CHANNEL, "")))
+        await session.flush()
+        await load_signing_keys(session)
+    return changed
+
+
+async def sync_signing_keys() -> None:
+    async with database_session.get_async_session() as session:
+        await rotate_signing_keys(session)
+        await session.commit()
+
+
+async def run_signing_key_rotation() -> None:
+    while True:
+        await asyncio.sleep(get_settings().security.jwt_key_check_interval_secs)
+        try:
+            await sync_signing_keys()
+        except Exception:
+            logger.exception("jwt signing key rotation failed")
+
+
+async def _reload_signing_keys() -> None:
+    async with database_session.get_async_session() as session:
+        await load_signing_keys(session)
+
+
+_RELOAD_TASKS: set[asyncio.Task[None]] = set()
+
+
+def _on_notification(payload: str) -> None:
+    task = asyncio.get_running_loop().create_task(_reload_signing_keys())
+    _RELOAD_TASKS.add(task)
+    task.add_done_callback(_RELOAD_TASKS.discard)
+
+
+async def _sync_on_connect() -> None:
+    if get_settings().security.jwt_algorithm != "HS256":
+        await sync_signing_keys()
+
+
+pg_listener.on_notification(SIGNING_KEYS_CHANNEL, _on_notification)
+pg_listener.on_connect(_sync_on_connect)
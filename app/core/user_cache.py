@@ -0,0 +1,128 @@
+# Per worker cache of user rows used by deps.get_current_user
+#
+# Bounded LRU with TTL keyed by JWT "sub". It keeps plain column values,
+# not ORM instances, so one cached row is never shared between sessions.
+# On hit a fresh User is attached to request session as if it was loaded,
+# so endpoints can still modify and commit it.
+#
+# Writes that change or remove user call invalidate_user() inside their
+# transaction. It drops the entry in this worker and sends NOTIFY on
+# USER_CACHE_CHANNEL, which postgres delivers only after commit.
+# Every worker listens on the channel (see app/core/pg_listener.py) and drops
+# the entry too, whole cache is dropped when listener reconnects.
+# TTL bounds staleness when notification is lost anyway, e.g. LISTEN going
+# through PgBouncer in transaction mode, which does not support it.
+
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core import pg_listener
+from app.core.config import get_settings
+from app.models import User
+
+USER_CACHE_CHANNEL = "user_cache_invalidate"
+
+
+class UserCache:
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_secs: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_secs = ttl_secs
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_secs > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, values: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (self.clock() + self.ttl_secs, values)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def reset(self) -> None:
+        # entries and hit counters, e.g. between tests
+        self.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_USER_CACHE = UserCache(
+    get_settings().security.user_cache_size,
+    get_settings().security.user_cache_ttl_secs,
+)
+
+
+def get_user_cache() -> UserCache:
+    return _USER_CACHE
+
+
+def user_to_values(user: User) -> dict[str, Any]:
+    return {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+
+
+async def get_cached_user(session: AsyncSession, key: str) -> User | None:
+    values = get_user_cache().get(key)
+    if values is None:
+        return None
+    user = User(**values)
+    # mark as loaded from db, add() then makes it persistent without SELECT
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
+def cache_user(key: str, user: User) -> None:
+    get_user_cache().set(key, user_to_values(user))
+
+
+async def invalidate_user(session: AsyncSession, user_id: int | str) -> None:
+    get_user_cache().invalidate(str(user_id))
+    await session.execute(select(func.pg_notify(USER_CACHE_CHANNEL, str(user_id))))
+
+
+async def _clear_on_connect() -> None:
+    # invalidations sent while listener was disconnected were missed
+    get_user_cache().clear()
+
+
+pg_listener.on_notification(
+    USER_CACHE_CHANNEL, lambda key: get_user_cache().invalidate(key)
+)
+pg_listener.on_connect(_clear_on_connect)
@@ -0,0 +1,105 @@
+# Staff workload, number of applications per assignee and status
+#
+# Table application_workload (models.ApplicationWorkload) holds one row per
+# (user_id, status) with number of applications where the user is diag_id and
+# where they are mechanic_id. It is kept current by statement level triggers on
+# application, in the same transaction as the write, whichever code path
+# (endpoints, bulk update, claim queues, import) made it.
+#
+# Trigger sums old rows (-1) and new rows (+1) of the statement per key and
+# upserts only keys whose count changed, in key order. So comment edits do not
+# touch it, bulk statements write every key once and concurrent writers lock
+# counter rows in the same order. Unassigned applications are not counted,
+# their queue is served by ix_application_diag_queue / ix_application_repair_queue.
+#
+# TRUNCATE of application bypasses the triggers, rebuild the table afterwards
+# with rebuild_workload() or as CLI:
+#
+# python -m app.core.workload rebuild
+#
+# DDL is created with application table by create_all (see models.py),
+# migrations keep frozen copy of it.
+
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session
+
+# transition tables of trigger statement and sign they are counted with
+WORKLOAD_TRIGGERS: dict[str, dict[str, int]] = {
+    "INSERT": {"new_rows": 1},
+    "UPDATE": {"old_rows": -1, "new_rows": 1},
+    "DELETE": {"old_rows": -1},
+}
+
+
+def workload_delta_sql(sources: dict[str, int]) -> str:
+    # user_id, status, diag_count, mechanic_count of given tables, summed per key
+    parts = [
+        f"SELECT {column}, status, {sign if role == 'diag' else 0}, "
+        f"{sign if role == 'mechanic' else 0} FROM {table} WHERE {column} IS NOT NULL"
+        for table, sign in sources.items()
+        for role, column in (("diag", "diag_id"), ("mechanic", "mechanic_id"))
+    ]
+    union = "\n        UNION ALL\n        ".join(parts)
+    return f"""SELECT user_id, status, sum(diag_count), sum(mechanic_count)
+    FROM (
+        {union}
+    ) AS delta (user_id, status, diag_count, mechanic_count)
+    GROUP BY user_id, status"""
+
+
+def workload_ddl() -> list[str]:
+    statements = []
+    for operation, sources in WORKLOAD_TRIGGERS.items():
+        name = f"application_workload_{operation.lower()}"
+        referencing = " ".join(
+            f"{table.split('_')[0].upper()} TABLE AS {table}" for table in sources
+        )
+        statements += [
+            f"""CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO application_workload AS w (user_id, status, diag_count, mechanic_count)
+    {workload_delta_sql(sources)}
+    HAVING sum(diag_count) <> 0 OR sum(mechanic_count) <> 0
+    ORDER BY user_id, status
+    ON CONFLICT (user_id, status) DO UPDATE SET
+        diag_count = w.diag_count + excluded.diag_count,
+        mechanic_count = w.mechanic_count + excluded.mechanic_count;
+    RETURN NULL;
+END
+$$""",
+            f"CREATE TRIGGER {name} AFTER {operation} ON application "
+            f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {name}()",
+        ]
+    return statements
+
+
+async def rebuild_workload(session: AsyncSession) -> None:
+    # recount from application, writes wait until the transaction ends
+    await session.execute(text("LOCK TABLE application IN SHARE MODE"))
+    await session.execute(text("DELETE FROM application_workload"))
+    await session.execute(
+        text(
+            "INSERT INTO application_workload (user_id, status, diag_count, mechanic_count) "
+            + workload_delta_sql({"application": 1})
+        )
+    )
+
+
+async def main() -> None:
+    async with database_session.get_async_session() as session:
+        await rebuild_workload(session)
+        await session.commit()
+    await database_session.dispose_async_engine()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Staff workload maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    asyncio.run(main())
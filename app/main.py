@@ -1,9 +1,44 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
-from app.api.api_router import api_router, auth_router
+from app.api.api_router import api_router, auth_router, well_known_router
+from app.api.errors import add_domain_error_handlers
+from app.core import database_session
+from app.core.application_events import run_event_partition_maintenance
 from app.core.config import get_settings
+from app.core.notifications import close_notify_client
+from app.core.pg_listener import listen_notifications
+from app.core.security.password import shutdown_password_hasher
+from app.core.security.signing_keys import run_signing_key_rotation
+from app.repositories.notification_outbox import run_notification_dispatcher
+from app.repositories.refresh_tokens import run_refresh_token_purge
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None]:
+    background_tasks = [
+        asyncio.create_task(run_refresh_token_purge()),
+        asyncio.create_task(run_signing_key_rotation()),
+        asyncio.create_task(run_event_partition_maintenance()),
+        asyncio.create_task(run_notification_dispatcher()),
+    ]
+    async with listen_notifications():
+        yield
+
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    await close_notify_client()
+    shutdown_password_hasher()
+    await database_session.dispose_async_engine()
+
 
 app = FastAPI(
     title="minimal fastapi postgres template",
@@ -11,10 +46,13 @@ app = FastAPI(
     description="https://github.com/rafsaf/minimal-fastapi-postgres-template",
     openapi_url="/openapi.json",
     docs_url="/",
+    lifespan=lifespan,
 )
 
 app.include_router(auth_router)
 app.include_router(api_router)
+app.include_router(well_known_router)
+add_domain_error_handlers(app)
 
 # Sets all CORS enabled origins
 app.add_middleware(
@@ -1,10 +1,18 @@
 from datetime import datetime
-from sqlalchemy import Enum as SQLEnum, BigInteger
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, func, Float, Integer
+from typing import Any
+from sqlalchemy import Enum as SQLEnum, BigInteger, FromClause
+from sqlalchemy import Boolean, CheckConstraint, Computed, DDL, DateTime, ForeignKey, Index, LargeBinary, SmallInteger, String, Text, UniqueConstraint, event, func, Float, Integer, text
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from enum import Enum
 
+from app.core.plates import plate_sql_expression
+from app.core.application_events import EVENT_DEFAULT_PARTITION_DDL, event_trigger_ddl
+from app.core.notifications import OUTBOX_TRIGGER_DDL
+from app.core.workload import workload_ddl
+
 class Status(str, Enum):
     WAITING = "Ожидает подтверждения"
     CARWAITING = "Ожидание машины"
@@ -22,6 +30,17 @@ ACTIVE_STATUSES = [
     Status.READY
 ]
 
+# allowed status changes, staying in the same status is always allowed
+STATUS_TRANSITIONS: dict[Status, tuple[Status, ...]] = {
+    Status.WAITING: (Status.CARWAITING, Status.REJECTED),
+    Status.CARWAITING: (Status.DIAGNOSTIC, Status.REJECTED),
+    Status.DIAGNOSTIC: (Status.REPAIR, Status.REJECTED),
+    Status.REPAIR: (Status.READY, Status.REJECTED),
+    Status.READY: (Status.COMPLETED, Status.REJECTED),
+    Status.REJECTED: (),
+    Status.COMPLETED: (),
+}
+
 class Role(str, Enum):
     DIAGNOSTIC = "диагностик"
     ADMIN = "админ"
@@ -39,6 +58,22 @@ class Method(str, Enum):
     cash = "наличка"
     unknown = "не выбран"
 
+class IntValueEnum(TypeDecorator[Any]):
+    # int based Enum stored by its value, unlike SQLEnum which stores member name,
+    # so the column sorts and is indexed by value
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: type[Enum]) -> None:
+        super().__init__()
+        self.enum_class = enum_class
+
+    def process_bind_param(self, value: Any, dialect: Any) -> int | None:
+        return None if value is None else int(self.enum_class(value).value)
+
+    def process_result_value(self, value: Any, dialect: Any) -> Enum | None:
+        return None if value is None else self.enum_class(value)
+
 class Base(DeclarativeBase):
     pass
 
@@ -55,6 +90,11 @@ class User(Base):
     diag_app = relationship("Application", back_populates="diagnostic", foreign_keys="[Application.diag_id]")
     mechanic_app = relationship("Application", back_populates="mechanic", foreign_keys="[Application.mechanic_id]")
 
+    __table_args__ = (
+        # staff lists by role, e.g. admin.get_diagnostics, served by index only scan
+        Index("ix_user_account_role", "role", postgresql_include=["user_name"]),
+    )
+
 class Client(Base):
     __tablename__ = "client_account"
 
@@ -69,13 +109,47 @@ class RefreshToken(Base):
     __tablename__ = "refresh_token"
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
-    refresh_token: Mapped[str] = mapped_column(String(512), nullable=False, unique=True, index=True)
+    # sha256 of token, see app/repositories/refresh_tokens.py
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False, unique=True, index=True)
     used: Mapped[bool] = mapped_column(nullable=False, default=False)
-    exp: Mapped[int] = mapped_column(nullable=False)
-    user_id: Mapped[int] = mapped_column(ForeignKey("user_account.user_id", ondelete="CASCADE"),)
+    exp: Mapped[int] = mapped_column(nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user_account.user_id", ondelete="CASCADE"), index=True)
 
     user: Mapped["User"] = relationship(back_populates="refresh_tokens")
 
+    __table_args__ = (
+        # purge finds used tokens with BitmapOr of this and ix_refresh_token_exp
+        Index("ix_refresh_token_used", "id", postgresql_where=text("used")),
+    )
+
+class JWTSigningKey(Base):
+    # asymmetric access token signing keys, see app/core/security/signing_keys.py
+    __tablename__ = "jwt_signing_key"
+
+    kid: Mapped[str] = mapped_column(String(64), primary_key=True)
+    algorithm: Mapped[str] = mapped_column(String(16), nullable=False)
+    # PKCS8 PEM encrypted with security.jwt_secret_key
+    private_key: Mapped[str] = mapped_column(Text, nullable=False)
+    public_jwk: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[int] = mapped_column(nullable=False, index=True)
+
+class TokenRevocation(Base):
+    # access tokens of "sub" issued until revoked_at are invalid, see app/core/security/revocation.py
+    __tablename__ = "token_revocation"
+
+    sub: Mapped[str] = mapped_column(String(256), primary_key=True)
+    revoked_at: Mapped[float] = mapped_column(Float, nullable=False, index=True)
+
+class RateLimitBucket(Base):
+    # shared login rate limiter state, see app/core/security/rate_limit.py
+    __tablename__ = "rate_limit_bucket"
+
+    key: Mapped[str] = mapped_column(String(256), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
 class Car(Base):
     __tablename__ = "car"
 
@@ -84,12 +158,24 @@ class Car(Base):
     brand: Mapped[str] = mapped_column(String(256), nullable=False)
     model: Mapped[str] = mapped_column(String(256), nullable=False)
     number: Mapped[str] = mapped_column(String(256), nullable=False)
+    # btree index serves exact lookups (bulk import), substring search is served
+    # by trigram index of migrations, see app/core/plates.py
+    number_normalized: Mapped[str] = mapped_column(
+        String(256, collation="C"),
+        Computed(plate_sql_expression("number"), persisted=True),
+        index=True,
+    )
     year: Mapped[int] = mapped_column(nullable=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
 
     owner = relationship("Client", back_populates="cars")
     applications = relationship("Application", back_populates="car")
 
+    __table_args__ = (
+        # client.my_car lists only not deleted cars
+        Index("ix_car_client_id_not_deleted", "client_id", postgresql_where=text("NOT is_deleted")),
+    )
+
 class Application(Base):
     __tablename__ = "application"
 
@@ -102,7 +188,8 @@ class Application(Base):
     diag_comment: Mapped[str] = mapped_column(nullable=True)
     mechanic_comment: Mapped[str] = mapped_column(nullable=True)
     status: Mapped[Status] = mapped_column(SQLEnum(Status, name="status", create_type=False), nullable=False, default=Status.WAITING)
-    priority: Mapped[Priority] = mapped_column(SQLEnum(Priority), nullable=False, default=Priority.LOW)
+    # smallint Priority value, 1 is the most urgent
+    priority: Mapped[Priority] = mapped_column(IntValueEnum(Priority), nullable=False, default=Priority.LOW)
     diag_id: Mapped[int] = mapped_column(ForeignKey("user_account.user_id"), nullable=True)
     mechanic_id: Mapped[int] = mapped_column(ForeignKey("user_account.user_id"), nullable=True)
     arrival_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -119,6 +206,112 @@ class Application(Base):
     mechanic = relationship("User", back_populates="mechanic_app", foreign_keys=[mechanic_id])
     payment = relationship("Payment", back_populates="application", uselist=False)
 
+    __table_args__ = (
+        # keyset pagination of admin feed, see app/core/pagination.py
+        Index("ix_application_created_at_id", "created_at", "id"),
+        # client history and admin feed filtered by client, newest first
+        Index("ix_application_client_id_created_at", "client_id", "created_at", "id"),
+        # plate search join and "has car active application" check
+        Index("ix_application_car_id_status", "car_id", "status"),
+        # status views ordered by urgency and arrival
+        Index("ix_application_status_priority_arrival_time", "status", "priority", "arrival_time"),
+        CheckConstraint(
+            f"priority IN ({', '.join(str(p.value) for p in Priority)})",
+            name="ck_application_priority",
+        ),
+    )
+
+# staff work queues, unassigned applications in claim order, see
+# repositories/applications.claim_next_app
+Index(
+    "ix_application_diag_queue",
+    Application.priority,
+    Application.arrival_time,
+    Application.created_at,
+    Application.id,
+    postgresql_where=text("status = 'DIAGNOSTIC' AND diag_id IS NULL"),
+)
+Index(
+    "ix_application_repair_queue",
+    Application.priority,
+    Application.arrival_time,
+    Application.created_at,
+    Application.id,
+    postgresql_where=text("status = 'REPAIR' AND mechanic_id IS NULL"),
+)
+
+# open work of staff, kept by triggers on application, see app/core/workload.py
+class ApplicationWorkload(Base):
+    __tablename__ = "application_workload"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    status: Mapped[Status] = mapped_column(SQLEnum(Status, name="status", create_type=False), primary_key=True)
+    diag_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    mechanic_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+def execute_after_create(table: FromClause, statement: str) -> None:
+    # trigger and function DDL kept outside of table metadata, run by create_all
+    ddl = DDL(statement)  # type: ignore[no-untyped-call]
+    event.listen(table, "after_create", ddl)
+
+for statement in workload_ddl() + event_trigger_ddl() + OUTBOX_TRIGGER_DDL:
+    execute_after_create(Application.__table__, statement)
+
+# status history, append only, written by triggers on application,
+# partitioned by month, see app/core/application_events.py
+class ApplicationEvent(Base):
+    __tablename__ = "application_event"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    app_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # None for creation of application
+    from_status: Mapped[Status] = mapped_column(SQLEnum(Status, name="status", create_type=False), nullable=True)
+    to_status: Mapped[Status] = mapped_column(SQLEnum(Status, name="status", create_type=False), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+    __table_args__ = (
+        # history of one application
+        Index("ix_application_event_app_id_created_at", "app_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+execute_after_create(ApplicationEvent.__table__, EVENT_DEFAULT_PARTITION_DDL)
+
+# arrival slot taken by application, see app/core/schedule.py
+class ArrivalBooking(Base):
+    __tablename__ = "arrival_booking"
+
+    app_id: Mapped[int] = mapped_column(ForeignKey("application.id", ondelete="CASCADE"), primary_key=True)
+    slot_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    bay: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+
+    __table_args__ = (
+        # one booking per bay of slot, also range scan of availability
+        UniqueConstraint("slot_start", "bay", name="uq_arrival_booking_slot_start_bay"),
+        CheckConstraint("bay >= 1", name="ck_arrival_booking_bay"),
+    )
+
+# client notifications about status changes, written by trigger on application,
+# see app/core/notifications.py
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    client_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    app_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    status: Mapped[Status] = mapped_column(SQLEnum(Status, name="status", create_type=False), nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    # set when delivery was given up
+    failed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # due rows claimed by dispatcher
+        Index("ix_notification_outbox_due", "next_attempt_at", postgresql_where=text("failed_at IS NULL")),
+    )
+
 class Payment(Base):
     __tablename__ = "payment"
 
@@ -0,0 +1,41 @@
+# Local stand in for messenger sendMessage endpoint, for development and tests
+#
+# Records every message, GET /messages returns them. Messages to chat ids
+# listed in failures are answered with the given status code instead, to try
+# retries of app/core/notifications.py without the provider.
+#
+# Usage:
+#
+# uvicorn app.notification_stub:stub --port 8081
+# NOTIFY__URL=http://localhost:8081/sendMessage uvicorn app.main:app
+
+
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class StubMessage(BaseModel):
+    chat_id: int
+    text: str
+
+
+stub = FastAPI(title="notification stub")
+# chat_id -> status code to answer with
+stub.state.failures = {}
+stub.state.messages = []
+
+
+@stub.post("/sendMessage")
+async def send_message(message: StubMessage) -> JSONResponse:
+    failure = stub.state.failures.get(message.chat_id)
+    if failure is not None:
+        return JSONResponse({"ok": False}, status_code=failure)
+    stub.state.messages.append(message)
+    return JSONResponse({"ok": True}, status_code=status.HTTP_200_OK)
+
+
+@stub.get("/messages")
+async def get_messages() -> list[StubMessage]:
+    messages: list[StubMessage] = stub.state.messages
+    return messages
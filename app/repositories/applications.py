@@ -0,0 +1,278 @@
+# Application queries shared by admin, diagnostic and mechanic routers
+#
+# Detail view is a single joined, column projected SELECT over
+# application, car and client, instead of loading three ORM objects.
+#
+# Workflow writes are single "UPDATE application ... WHERE id = :id RETURNING ..."
+# statements, no SELECT before and no refresh after, identity map is not touched.
+#
+# Bulk writes are one set based UPDATE joined to unnest() of per column arrays:
+#
+# UPDATE application SET status = CASE WHEN v.set_status THEN v.status ELSE status END, ...
+# FROM unnest(:app_ids, :set_status, :status, ...) AS v(app_id, set_status, status, ...)
+# WHERE application.id = v.app_id RETURNING ...
+#
+# Number of bind parameters does not depend on batch size, so statement is
+# prepared once and reused for any batch. arrival_time is not among bulk
+# columns, it is set only by booking a slot (app/repositories/arrival_slots.py).
+#
+# Staff work queues are claimed with claim_next_app(), one UPDATE of row picked
+# by "SELECT ... ORDER BY ... LIMIT 1 FOR UPDATE SKIP LOCKED" subquery, rows
+# locked by concurrent claims are skipped, not waited for, so each claim takes
+# a different application. Queue ordering is served by partial indexes
+# ix_application_*_queue which hold only unassigned rows of the queue.
+#
+# RETURNING of all of them also sends NOTIFY of every updated row to live
+# application board (app_event_notify), still within the one statement.
+#
+# Status changes follow models.STATUS_TRANSITIONS, checked in WHERE of the same
+# UPDATE, so concurrent writes cannot skip a step. Application not updated
+# because of it raises InvalidStatusTransitionError, found by extra SELECT only
+# on this error path. Every change is logged to application_event by triggers,
+# see app/core/application_events.py.
+
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import (
+    BigInteger,
+    BindParameter,
+    Boolean,
+    ColumnClause,
+    RowMapping,
+    SmallInteger,
+    SQLColumnExpression,
+    Text,
+    bindparam,
+    case,
+    cast,
+    column,
+    exists,
+    func,
+    not_,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import TypeEngine
+
+from app.core.app_board import app_event_notify
+from app.models import STATUS_TRANSITIONS, Application, Car, Client, Status, User
+from app.repositories.errors import (
+    ApplicationNotFoundError,
+    InvalidStatusTransitionError,
+)
+
+APPLICATION_DETAIL_COLUMNS = (
+    Application.id.label("app_id"),
+    Application.client_id,
+    Application.car_id,
+    Application.problem,
+    Application.conn,
+    Application.status,
+    Application.priority,
+    Application.admin_comment,
+    Application.diag_comment,
+    Application.mechanic_comment,
+    Application.diag_id,
+    Application.mechanic_id,
+    Application.arrival_time,
+    Application.created_at,
+    Client.user_name,
+    Client.phone,
+    Car.brand,
+    Car.model,
+    Car.number,
+    Car.year,
+)
+
+
+async def find_app_detail(app_id: int, session: AsyncSession) -> RowMapping | None:
+    result = await session.execute(
+        select(*APPLICATION_DETAIL_COLUMNS)
+        .join(Car, Car.id == Application.car_id)
+        .join(Client, Client.client_id == Application.client_id)
+        .where(Application.id == app_id)
+    )
+    return result.mappings().one_or_none()
+
+
+# status -> statuses it can be set from, itself included
+STATUS_PREDECESSORS: dict[Status, list[Status]] = {
+    target: [s for s in Status if s == target or target in STATUS_TRANSITIONS[s]]
+    for target in Status
+}
+# the same as (from, to) member names, as stored in database
+STATUS_TRANSITION_NAMES = [
+    (source.name, target.name)
+    for target, sources in STATUS_PREDECESSORS.items()
+    for source in sources
+]
+
+
+async def existing_app_ids(session: AsyncSession, app_ids: Sequence[int]) -> set[int]:
+    result = await session.scalars(
+        select(Application.id).where(Application.id.in_(app_ids))
+    )
+    return set(result)
+
+
+async def update_app(
+    app_id: int,
+    session: AsyncSession,
+    values: dict[str, Any],
+    returning: Sequence[SQLColumnExpression[Any]],
+) -> RowMapping:
+    query = update(Application).where(Application.id == app_id)
+    if "status" in values:
+        query = query.where(
+            Application.status.in_(STATUS_PREDECESSORS[values["status"]])
+        )
+    result = await session.execute(
+        query.values(**values)
+        .returning(*returning, app_event_notify("updated"))
+        .execution_options(synchronize_session=False)
+    )
+    app_row: RowMapping | None = result.mappings().one_or_none()
+    if app_row is None:
+        if "status" in values and await existing_app_ids(session, [app_id]):
+            raise InvalidStatusTransitionError(app_id)
+        raise ApplicationNotFoundError(app_id)
+    return app_row
+
+
+# column name -> element type of its unnest() array,
+# SQLEnum columns are passed by member name as text and cast back to their
+# postgres type, Priority is stored by its int value
+BULK_UPDATE_COLUMNS: dict[str, TypeEngine[Any]] = {
+    "admin_comment": Text(),
+    "status": Text(),
+    "priority": SmallInteger(),
+    "diag_id": BigInteger(),
+}
+BULK_RETURNING_COLUMNS = tuple(
+    getattr(Application, name) for name in BULK_UPDATE_COLUMNS
+)
+
+
+def _bulk_param(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return int(value) if isinstance(value, int) else value.name
+    return value
+
+
+async def bulk_update_apps(
+    session: AsyncSession,
+    changes: Sequence[tuple[int, dict[str, Any]]],
+) -> dict[int, RowMapping]:
+    params: dict[str, list[Any]] = {"app_ids": [app_id for app_id, _ in changes]}
+    unnest_args: list[BindParameter[Any]] = [
+        bindparam("app_ids", type_=ARRAY(BigInteger()))
+    ]
+    derived_columns: list[ColumnClause[Any]] = [column("app_id", BigInteger())]
+
+    for name, element_type in BULK_UPDATE_COLUMNS.items():
+        params[f"set_{name}"] = [name in values for _, values in changes]
+        params[name] = [_bulk_param(values.get(name)) for _, values in changes]
+        unnest_args.append(bindparam(f"set_{name}", type_=ARRAY(Boolean())))
+        unnest_args.append(bindparam(name, type_=ARRAY(element_type)))
+        derived_columns.append(column(f"set_{name}", Boolean()))
+        derived_columns.append(column(name, element_type))
+
+    rows = (
+        func.unnest(*unnest_args)
+        .table_valued(*derived_columns)
+        .render_derived(name="v")
+    )
+
+    set_values = {}
+    for name in BULK_UPDATE_COLUMNS:
+        target = getattr(Application, name)
+        set_values[name] = case(
+            (rows.c[f"set_{name}"], cast(rows.c[name], target.type)),
+            else_=target,
+        )
+
+    result = await session.execute(
+        update(Application)
+        .where(
+            Application.id == rows.c.app_id,
+            or_(
+                not_(rows.c.set_status),
+                tuple_(cast(Application.status, Text), rows.c.status).in_(
+                    STATUS_TRANSITION_NAMES
+                ),
+            ),
+            # unknown assignee skips the row instead of failing foreign key of all
+            or_(
+                not_(rows.c.set_diag_id),
+                rows.c.diag_id.is_(None),
+                exists().where(User.user_id == rows.c.diag_id),
+            ),
+        )
+        .values(set_values)
+        .returning(
+            Application.id.label("app_id"),
+            *BULK_RETURNING_COLUMNS,
+            app_event_notify("updated"),
+        )
+        .execution_options(synchronize_session=False),
+        params,
+    )
+    return {app_row["app_id"]: app_row for app_row in result.mappings()}
+
+
+@dataclass(frozen=True)
+class WorkQueue:
+    status: Status
+    assignee: Any  # Application.diag_id or Application.mechanic_id
+
+
+DIAGNOSTIC_QUEUE = WorkQueue(Status.DIAGNOSTIC, Application.diag_id)
+REPAIR_QUEUE = WorkQueue(Status.REPAIR, Application.mechanic_id)
+
+# most urgent first, must match ix_application_*_queue
+QUEUE_ORDER = (
+    Application.priority,
+    Application.arrival_time,
+    Application.created_at,
+    Application.id,
+)
+CLAIM_RETURNING_COLUMNS = (
+    Application.id.label("app_id"),
+    Application.client_id,
+    Application.car_id,
+    Application.problem,
+    Application.status,
+    Application.priority,
+    Application.arrival_time,
+    Application.created_at,
+)
+
+
+async def claim_next_app(
+    session: AsyncSession, queue: WorkQueue, user_id: int
+) -> RowMapping | None:
+    next_app_id = (
+        select(Application.id)
+        .where(Application.status == queue.status, queue.assignee.is_(None))
+        .order_by(*QUEUE_ORDER)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(Application)
+        .where(Application.id == next_app_id, queue.assignee.is_(None))
+        .values({queue.assignee.key: user_id})
+        .returning(*CLAIM_RETURNING_COLUMNS, app_event_notify("updated"))
+        .execution_options(synchronize_session=False)
+    )
+    app_row: RowMapping | None = result.mappings().one_or_none()
+    return app_row
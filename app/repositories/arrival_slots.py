@@ -0,0 +1,125 @@
+# Free arrival slots and their booking, see app/core/schedule.py
+#
+# Booking takes the lowest free bay of the slot with
+#
+# INSERT INTO arrival_booking (app_id, slot_start, bay)
+# SELECT :app_id, :slot_start, bay FROM generate_series(1, :bays) AS bay
+# WHERE bay NOT IN (bays booked in the slot) ORDER BY bay LIMIT 1
+# ON CONFLICT (slot_start, bay) DO NOTHING RETURNING bay
+#
+# Concurrent booking of the same bay waits on the unique index until the first
+# one commits and then inserts nothing, it is retried with fresh snapshot and
+# takes next bay or finds the slot full. No lock of the slot is needed and
+# bookings of different slots never wait for each other.
+#
+# Bookings of rejected applications do not count, they are removed when their
+# bay is needed.
+
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import RowMapping, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.schedule import day_slots, is_slot
+from app.models import Application, ArrivalBooking, Status
+from app.repositories.applications import update_app
+from app.repositories.errors import (
+    ApplicationNotFoundError,
+    ArrivalSlotFullError,
+    ArrivalTimeNotSlotError,
+)
+
+
+async def free_slots(
+    session: AsyncSession, first_day: date, days: int, now: datetime
+) -> list[tuple[datetime, int]]:
+    # (slot_start, free bays) of not yet started slots with a free bay
+    schedule = get_settings().schedule
+    slots = [
+        slot
+        for offset in range(days)
+        for slot in day_slots(first_day + timedelta(days=offset), schedule)
+        if slot > now
+    ]
+    if not slots:
+        return []
+
+    rows = await session.execute(
+        select(ArrivalBooking.slot_start, func.count())
+        .join(Application, Application.id == ArrivalBooking.app_id)
+        .where(
+            ArrivalBooking.slot_start >= slots[0],
+            ArrivalBooking.slot_start <= slots[-1],
+            Application.status != Status.REJECTED,
+        )
+        .group_by(ArrivalBooking.slot_start)
+    )
+    booked = dict(rows.tuples().all())
+    return [
+        (slot, schedule.bays - booked.get(slot, 0))
+        for slot in slots
+        if booked.get(slot, 0) < schedule.bays
+    ]
+
+
+async def book_arrival_slot(
+    session: AsyncSession, app_id: int, slot_start: datetime, now: datetime
+) -> RowMapping:
+    schedule = get_settings().schedule
+    if not is_slot(slot_start, schedule) or slot_start <= now:
+        raise ArrivalTimeNotSlotError(slot_start)
+
+    # application row lock serializes rebooking of the same application
+    locked = await session.scalar(
+        select(Application.id).where(Application.id == app_id).with_for_update()
+    )
+    if locked is None:
+        raise ApplicationNotFoundError(app_id)
+    await session.execute(
+        delete(ArrivalBooking)
+        .where(ArrivalBooking.app_id == app_id)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(
+        delete(ArrivalBooking)
+        .where(
+            ArrivalBooking.slot_start == slot_start,
+            ArrivalBooking.app_id == Application.id,
+            Application.status == Status.REJECTED,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    bays = func.generate_series(1, schedule.bays).table_valued("bay").render_derived()
+    booked_bays = select(ArrivalBooking.bay).where(
+        ArrivalBooking.slot_start == slot_start
+    )
+    book = (
+        insert(ArrivalBooking)
+        .from_select(
+            ["app_id", "slot_start", "bay"],
+            select(
+                literal(app_id),
+                literal(slot_start, ArrivalBooking.slot_start.type),
+                bays.c.bay,
+            )
+            .where(bays.c.bay.not_in(booked_bays))
+            .order_by(bays.c.bay)
+            .limit(1),
+        )
+        .on_conflict_do_nothing(index_elements=["slot_start", "bay"])
+        .returning(ArrivalBooking.bay)
+    )
+    # every attempt either books or lost a bay to concurrent booking or found none
+    for _ in range(schedule.bays):
+        if await session.scalar(book) is not None:
+            return await update_app(
+                app_id,
+                session,
+                values={"arrival_time": slot_start},
+                returning=(Application.arrival_time,),
+            )
+    raise ArrivalSlotFullError(slot_start)
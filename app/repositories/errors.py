@@ -0,0 +1,20 @@
+# Domain errors of repositories
+#
+# Repositories do not know about HTTP, endpoints let these propagate and
+# app/api/errors.py turns them into responses with api_messages details.
+
+
+class ApplicationNotFoundError(Exception):
+    pass
+
+
+class InvalidStatusTransitionError(Exception):
+    pass
+
+
+class ArrivalTimeNotSlotError(Exception):
+    pass
+
+
+class ArrivalSlotFullError(Exception):
+    pass
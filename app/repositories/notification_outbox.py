@@ -0,0 +1,216 @@
+# Dispatcher of client notifications outbox, see app/core/notifications.py
+#
+# Batch is claimed in one short transaction:
+#
+# UPDATE notification_outbox SET next_attempt_at = now() + lease
+# WHERE id IN (due rows LIMIT :batch_size FOR UPDATE SKIP LOCKED) RETURNING ...
+#
+# so workers never claim the same rows and batch of dead worker is picked up
+# again after notify.lease_secs. Deliveries are made outside of any
+# transaction, results of the whole batch are written back with one DELETE of
+# delivered rows and one UPDATE joined to unnest() of failed ones.
+# Notification may be sent twice when worker dies after delivery and before
+# the write back, never lost.
+
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Text,
+    bindparam,
+    case,
+    column,
+    delete,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session, pg_listener
+from app.core.config import get_settings
+from app.core.notifications import (
+    NOTIFY_CHANNEL,
+    DeliveryError,
+    deliver,
+    get_notify_client,
+    retry_delay_secs,
+)
+from app.models import NotificationOutbox, Status
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Notification:
+    id: int
+    client_id: int
+    app_id: int
+    status: Status
+    attempts: int
+
+
+def notification_text(notification: Notification) -> str:
+    return f"Заявка №{notification.app_id}: {notification.status.value}"
+
+
+async def claim_notifications(
+    session: AsyncSession, batch_size: int
+) -> list[Notification]:
+    notify = get_settings().notify
+    due = (
+        select(NotificationOutbox.id)
+        .where(
+            NotificationOutbox.failed_at.is_(None),
+            NotificationOutbox.next_attempt_at <= func.now(),
+        )
+        .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(due.scalar_subquery()))
+        .values(next_attempt_at=func.now() + timedelta(seconds=notify.lease_secs))
+        .returning(
+            NotificationOutbox.id,
+            NotificationOutbox.client_id,
+            NotificationOutbox.app_id,
+            NotificationOutbox.status,
+            NotificationOutbox.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    claimed = [Notification(**row) for row in result.mappings()]
+    await session.commit()
+    return claimed
+
+
+async def _record_failures(
+    session: AsyncSession, failures: list[tuple[Notification, DeliveryError]]
+) -> None:
+    notify = get_settings().notify
+    now = datetime.now(UTC)
+    give_up = [
+        not error.retryable or notification.attempts + 1 >= notify.max_attempts
+        for notification, error in failures
+    ]
+    params = {
+        "ids": [notification.id for notification, _ in failures],
+        "errors": [error.error for _, error in failures],
+        "give_up": give_up,
+        "retry_at": [
+            now
+            + timedelta(
+                seconds=retry_delay_secs(
+                    notification.attempts, notify.retry_base_secs, notify.retry_max_secs
+                )
+            )
+            for notification, _ in failures
+        ],
+    }
+    rows = (
+        func.unnest(
+            bindparam("ids", type_=ARRAY(BigInteger())),
+            bindparam("errors", type_=ARRAY(Text())),
+            bindparam("give_up", type_=ARRAY(Boolean())),
+            bindparam("retry_at", type_=ARRAY(DateTime(timezone=True))),
+        )
+        .table_valued(
+            column("id", BigInteger()),
+            column("error", Text()),
+            column("give_up", Boolean()),
+            column("retry_at", DateTime(timezone=True)),
+        )
+        .render_derived(name="v")
+    )
+    await session.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id == rows.c.id)
+        .values(
+            attempts=NotificationOutbox.attempts + 1,
+            last_error=rows.c.error,
+            next_attempt_at=rows.c.retry_at,
+            failed_at=case((rows.c.give_up, func.now()), else_=None),
+        )
+        .execution_options(synchronize_session=False),
+        params,
+    )
+
+
+async def dispatch_notifications(session: AsyncSession, url: str) -> int:
+    # delivers one batch to provider url, returns number of claimed notifications
+    notify = get_settings().notify
+    claimed = await claim_notifications(session, notify.batch_size)
+    if not claimed:
+        return 0
+
+    client = get_notify_client()
+    semaphore = asyncio.Semaphore(notify.concurrency)
+
+    async def deliver_one(notification: Notification) -> DeliveryError | None:
+        async with semaphore:
+            return await deliver(
+                client,
+                url,
+                {
+                    "chat_id": notification.client_id,
+                    "text": notification_text(notification),
+                },
+            )
+
+    errors = await asyncio.gather(*(deliver_one(n) for n in claimed))
+    delivered = [n.id for n, error in zip(claimed, errors) if error is None]
+    failures = [(n, error) for n, error in zip(claimed, errors) if error is not None]
+
+    if delivered:
+        await session.execute(
+            delete(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(delivered))
+            .execution_options(synchronize_session=False)
+        )
+    if failures:
+        await _record_failures(session, failures)
+        logger.warning(
+            "%s of %s notifications not delivered, last error: %s",
+            len(failures),
+            len(claimed),
+            failures[-1][1].error,
+        )
+    await session.commit()
+    return len(claimed)
+
+
+_WAKE_UP = asyncio.Event()
+
+
+async def run_notification_dispatcher() -> None:
+    notify = get_settings().notify
+    if notify.url is None:
+        logger.info("NOTIFY__URL is not set, client notifications are not sent")
+        return
+    url = notify.url.get_secret_value()
+    while True:
+        _WAKE_UP.clear()
+        try:
+            async with database_session.get_async_session() as session:
+                # drain the backlog, then wait for new rows
+                while await dispatch_notifications(session, url) == notify.batch_size:
+                    pass
+        except Exception:
+            logger.exception("notification dispatch failed")
+        # new rows NOTIFY, the poll picks up retries that became due
+        try:
+            await asyncio.wait_for(_WAKE_UP.wait(), timeout=notify.poll_interval_secs)
+        except TimeoutError:
+            pass
+
+
+pg_listener.on_notification(NOTIFY_CHANNEL, lambda _: _WAKE_UP.set())
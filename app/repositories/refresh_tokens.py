@@ -0,0 +1,131 @@
+# Refresh token storage, rotation and purge
+#
+# Only sha256 of token is stored (32 bytes, fixed size btree key), raw token
+# is returned to client once and never persisted. Tokens are 256 bit random,
+# so plain hash without salt is enough.
+#
+# Rotation is single conditional statement:
+#
+# UPDATE refresh_token SET used = true FROM user_account
+# WHERE token_hash = :hash AND NOT used AND exp > :now
+# AND user_account.user_id = refresh_token.user_id
+# RETURNING user_id, user_account.role
+#
+# so two concurrent refreshes with the same token cannot both succeed and
+# nothing is locked between SELECT and UPDATE. Only when it matches no row
+# token is read again to tell client why (not found, expired, already used).
+#
+# Used and expired tokens are deleted in batches by purge_refresh_tokens,
+# started periodically from app lifespan (run_refresh_token_purge).
+# Batches lock with SKIP LOCKED, so every worker may run it at once.
+
+
+import asyncio
+import hashlib
+import logging
+import secrets
+import time
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import api_messages
+from app.core import database_session
+from app.core.config import get_settings
+from app.models import RefreshToken, Role, User
+
+logger = logging.getLogger(__name__)
+
+
+def hash_refresh_token(refresh_token: str) -> bytes:
+    return hashlib.sha256(refresh_token.encode()).digest()
+
+
+def create_refresh_token(session: AsyncSession, user_id: int) -> tuple[str, int]:
+    refresh_token = secrets.token_urlsafe(32)
+    exp = int(time.time() + get_settings().security.refresh_token_expire_secs)
+    session.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(refresh_token),
+            exp=exp,
+        )
+    )
+    return refresh_token, exp
+
+
+async def use_refresh_token(
+    session: AsyncSession, refresh_token: str
+) -> tuple[int, Role]:
+    # current role is read in the same statement for the new access token
+    token_hash = hash_refresh_token(refresh_token)
+    row = (
+        await session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.used.is_(False),
+                RefreshToken.exp > int(time.time()),
+                RefreshToken.user_id == User.user_id,
+            )
+            .values(used=True)
+            .returning(RefreshToken.user_id, User.role)
+            .execution_options(synchronize_session=False)
+        )
+    ).one_or_none()
+    if row is not None:
+        return row.user_id, row.role
+
+    used = await session.scalar(
+        select(RefreshToken.used).where(RefreshToken.token_hash == token_hash)
+    )
+    if used is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=api_messages.REFRESH_TOKEN_NOT_FOUND,
+        )
+    elif not used:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=api_messages.REFRESH_TOKEN_EXPIRED,
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=api_messages.REFRESH_TOKEN_ALREADY_USED,
+    )
+
+
+async def purge_refresh_tokens(session: AsyncSession, batch_size: int) -> int:
+    # one batch per transaction, short locks and bounded WAL per commit
+    purged = 0
+    while True:
+        dead = (
+            select(RefreshToken.id)
+            .where(or_(RefreshToken.used, RefreshToken.exp <= int(time.time())))
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(dead.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            return purged
+
+
+async def run_refresh_token_purge() -> None:
+    security = get_settings().security
+    while True:
+        try:
+            async with database_session.get_async_session() as session:
+                purged = await purge_refresh_tokens(
+                    session, security.refresh_token_purge_batch_size
+                )
+            logger.info("purged %s dead refresh tokens", purged)
+        except Exception:
+            logger.exception("refresh token purge failed")
+        await asyncio.sleep(security.refresh_token_purge_interval_secs)
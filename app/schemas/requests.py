@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr, constr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, constr, model_validator
 from app.models import Status, Role, Priority, Method
 
 class BaseRequest(BaseModel):
@@ -46,6 +46,31 @@ class ApplyAppAdminRequest(BaseRequest):
     priority: Priority
     diag_id: int
 
+class AppChanges(BaseRequest):
+    # arrival_time is booked per application with /adminapplytime, unknown fields
+    # are refused instead of silently dropped
+    model_config = ConfigDict(extra="forbid")
+
+    admin_comment: str | None = None
+    status: Status | None = None
+    priority: Priority | None = None
+    diag_id: int | None = None
+
+class BulkAppChanges(AppChanges):
+    app_id: int
+
+class BulkAppUpdateRequest(BaseRequest):
+    # fields set in "shared" apply to every app, fields set on an app override them
+    apps: list[BulkAppChanges] = Field(min_length=1, max_length=500)
+    shared: AppChanges = AppChanges()
+
+    @model_validator(mode="after")
+    def check_unique_app_ids(self) -> "BulkAppUpdateRequest":
+        app_ids = [app.app_id for app in self.apps]
+        if len(app_ids) != len(set(app_ids)):
+            raise ValueError("app_id must be unique")
+        return self
+
 class AddUserRequest(BaseRequest):
     user_id: int
     role: Role
@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict, EmailStr
-from typing import Optional
+from typing import Literal, Optional
 from app.models import Status, Role, Priority, Method
 
 class BaseResponse(BaseModel):
@@ -45,19 +45,19 @@ class CheckCarResponse(BaseResponse):
     model_config = ConfigDict(from_attributes=True)
 
 class DiagGetAppResponse(BaseResponse):
-    cleint_id: int
+    client_id: int
     car_id: int
-    arrival_time: datetime
-    priority: str
+    arrival_time: datetime | None = None
+    priority: Priority
     problem: Optional[str] = None
     admin_comment: Optional[str] = None
 
 class MechanicGetResponse(BaseResponse):
-    cleint_id: int
+    client_id: int
     car_id: int
-    problem: str
-    admin_comment: str
-    diag_commnt: str
+    problem: str | None = None
+    admin_comment: str | None = None
+    diag_comment: str | None = None
     priority: Priority
 
 class AdminGetFinishAppResponse(BaseResponse):
@@ -81,9 +81,9 @@ class AdminGetStartAppResponse(BaseResponse):
     app_id: int
     client_id: int
     car_id: int
-    problem: str
+    problem: str | None = None
     conn: int
-    phone: str
+    phone: str | None = None
     brand: str
     model: str
     number: str
@@ -101,6 +101,53 @@ class AppListItem(BaseResponse):
 
     model_config = ConfigDict(from_attributes=True)
 
+class AppListPage(BaseResponse):
+    items: list[AppListItem]
+    next_cursor: str | None = None
+
+class BulkAppResult(BaseResponse):
+    app_id: int
+    updated: bool
+    detail: str | None = None
+    admin_comment: str | None = None
+    status: Status | None = None
+    priority: Priority | None = None
+    diag_id: int | None = None
+
+class BulkAppUpdateResponse(BaseResponse):
+    results: list[BulkAppResult]
+
 class DiagNamesList(BaseResponse):
     user_id: int
-    user_name: str
\ No newline at end of file
+    user_name: str
+
+class StaffWorkloadResponse(BaseResponse):
+    user_id: int
+    user_name: str | None = None
+    role: Role
+    # assigned applications in active statuses, as diagnostic or mechanic by role
+    open_apps: int
+    by_status: dict[Status, int]
+
+class FreeSlotResponse(BaseResponse):
+    start: datetime
+    free_bays: int
+
+class AppBoardEvent(BaseResponse):
+    # data of "application" event of /board/events stream
+    event: Literal["created", "updated"]
+    app_id: int
+    status: Status
+    priority: Priority
+    diag_id: int | None = None
+    mechanic_id: int | None = None
+
+class ClaimedAppResponse(BaseResponse):
+    app_id: int
+    client_id: int
+    car_id: int
+    problem: str | None = None
+    status: Status
+    priority: Priority
+    arrival_time: datetime | None = None
+    created_at: datetime
@@ -1,6 +1,7 @@
 import logging
 import os
 from collections.abc import AsyncGenerator
+from datetime import UTC, datetime, timedelta
 
 import pytest
 import pytest_asyncio
@@ -13,16 +14,44 @@ from sqlalchemy.ext.asyncio import (
 
 from app.core import database_session
 from app.core.config import get_settings
+from app.core.notifications import set_notify_client
 from app.core.security.jwt import create_jwt_token
 from app.core.security.password import get_password_hash
+from app.core.security.rate_limit import set_login_rate_limiter
+from app.core.security.revocation import get_revocation_list
+from app.core.security.signing_keys import get_key_ring
+from app.core.user_cache import get_user_cache
 from app.main import app as fastapi_app
-from app.models import Base, User
+from app.models import Application, Base, Car, Client, Priority, Role, User
 
 default_user_id = "b75365d9-7bf9-4f54-add5-aeab333a087b"
 default_user_email = "geralt@wiedzmin.pl"
 default_user_password = "geralt"
 default_user_access_token = create_jwt_token(default_user_id).access_token
 
+superadmin_user_id = 700100000
+
+default_client_id = 500100200
+default_car_number = "А123ВС77"
+
+
+async def create_apps(session: AsyncSession, car: Car, count: int) -> list[Application]:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    apps = [
+        Application(
+            client_id=car.client_id,
+            car_id=car.id,
+            problem=f"problem {i}",
+            conn=1,
+            priority=Priority.HIGH if i % 2 else Priority.LOW,
+            created_at=start + timedelta(hours=i),
+        )
+        for i in range(count)
+    ]
+    session.add_all(apps)
+    await session.commit()
+    return apps
+
 
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def fixture_setup_new_test_database() -> None:
@@ -30,7 +59,7 @@ async def fixture_setup_new_test_database() -> None:
     test_db_name = f"test_db_{worker_name}"
 
     # create new test db using connection to current database
-    conn = await database_session._ASYNC_ENGINE.connect()
+    conn = await database_session.get_async_engine().connect()
     await conn.execution_options(isolation_level="AUTOCOMMIT")
     await conn.execute(sqlalchemy.text(f"DROP DATABASE IF EXISTS {test_db_name}"))
     await conn.execute(sqlalchemy.text(f"CREATE DATABASE {test_db_name}"))
@@ -47,13 +76,13 @@ async def fixture_setup_new_test_database() -> None:
     engine = database_session.new_async_engine(get_settings().sqlalchemy_database_uri)
 
     session_mpatch.setattr(
-        database_session,
-        "_ASYNC_ENGINE",
+        database_session._ENGINES,
+        "primary",
         engine,
     )
     session_mpatch.setattr(
-        database_session,
-        "_ASYNC_SESSIONMAKER",
+        database_session._ENGINES,
+        "primary_sessionmaker",
         async_sessionmaker(engine, expire_on_commit=False),
     )
 
@@ -69,6 +98,18 @@ async def fixture_clean_get_settings_between_tests() -> AsyncGenerator[None]:
     get_settings.cache_clear()
 
 
+@pytest_asyncio.fixture(scope="function", autouse=True)
+async def fixture_clean_worker_state_between_tests() -> AsyncGenerator[None]:
+    # per worker caches and limiters would outlive rolled back test transaction
+    yield
+
+    get_user_cache().reset()
+    set_login_rate_limiter(None)
+    get_revocation_list().clear()
+    get_key_ring().replace([])
+    set_notify_client(None)
+
+
 @pytest_asyncio.fixture(name="default_hashed_password", scope="session")
 async def fixture_default_hashed_password() -> str:
     return get_password_hash(default_user_password)
@@ -81,7 +122,7 @@ async def fixture_session_with_rollback(
     # we want to monkeypatch get_async_session with one bound to session
     # that we will always rollback on function scope
 
-    connection = await database_session._ASYNC_ENGINE.connect()
+    connection = await database_session.get_async_engine().connect()
     transaction = await connection.begin()
 
     session = AsyncSession(bind=connection, expire_on_commit=False)
@@ -108,6 +149,14 @@ async def fixture_client(session: AsyncSession) -> AsyncGenerator[AsyncClient]:
         yield aclient
 
 
+@pytest_asyncio.fixture(name="staff_client", scope="function")
+async def fixture_staff_client(client: AsyncClient) -> AsyncClient:
+    # role gated routers, SUPERADMIN passes every deps.require_roles check
+    token = create_jwt_token(str(superadmin_user_id), role=Role.SUPERADMIN)
+    client.headers.update({"Authorization": f"Bearer {token.access_token}"})
+    return client
+
+
 @pytest_asyncio.fixture(name="default_user", scope="function")
 async def fixture_default_user(
     session: AsyncSession, default_hashed_password: str
@@ -128,3 +177,71 @@ async def fixture_default_user(
 @pytest_asyncio.fixture(name="default_user_headers", scope="function")
 async def fixture_default_user_headers(default_user: User) -> dict[str, str]:
     return {"Authorization": f"Bearer {default_user_access_token}"}
+
+
+@pytest_asyncio.fixture(name="default_client", scope="function")
+async def fixture_default_client(session: AsyncSession) -> AsyncGenerator[Client]:
+    default_client = Client(
+        client_id=default_client_id,
+        user_name="Geralt",
+        phone="+79990000000",
+    )
+    session.add(default_client)
+
+    await session.commit()
+
+    yield default_client
+
+
+@pytest_asyncio.fixture(name="default_car", scope="function")
+async def fixture_default_car(
+    session: AsyncSession, default_client: Client
+) -> AsyncGenerator[Car]:
+    default_car = Car(
+        client_id=default_client.client_id,
+        brand="Lada",
+        model="Vesta",
+        number=default_car_number,
+        year=2020,
+    )
+    session.add(default_car)
+
+    await session.commit()
+
+    yield default_car
+
+
+@pytest_asyncio.fixture(name="default_app", scope="function")
+async def fixture_default_app(
+    session: AsyncSession, default_car: Car
+) -> AsyncGenerator[Application]:
+    default_app = Application(
+        client_id=default_car.client_id,
+        car_id=default_car.id,
+        problem="knocking",
+        conn=1,
+        created_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+    session.add(default_app)
+
+    await session.commit()
+
+    yield default_app
+
+
+@pytest_asyncio.fixture(name="diag_user", scope="function")
+async def fixture_diag_user(
+    session: AsyncSession, default_hashed_password: str
+) -> AsyncGenerator[User]:
+    diag_user = User(
+        user_id=700100200,
+        role=Role.DIAGNOSTIC,
+        user_name="Vesemir",
+        hashed_password=default_hashed_password,
+        phone="+79990000001",
+    )
+    session.add(diag_user)
+
+    await session.commit()
+
+    yield diag_user
@@ -0,0 +1,188 @@
+import asyncio
+from datetime import UTC, date, datetime
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import api_messages
+from app.core import database_session
+from app.core.config import get_settings
+from app.core.schedule import day_slots
+from app.main import app
+from app.models import Application, ArrivalBooking, Car, Client, Status
+from app.repositories.arrival_slots import book_arrival_slot
+from app.repositories.errors import ArrivalSlotFullError
+from app.tests.conftest import create_apps
+
+monday = date(2031, 3, 17)
+
+
+def monday_slots() -> list[datetime]:
+    return day_slots(monday, get_settings().schedule)
+
+
+async def book(
+    staff_client: AsyncClient, app_id: int, slot: datetime
+) -> tuple[int, dict[str, Any]]:
+    response = await staff_client.post(
+        app.url_path_for("adminapply_time"),
+        params={"app_id": app_id, "arrival_time": slot.isoformat()},
+    )
+    return response.status_code, response.json()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_adminapply_time_books_bays_until_slot_is_full(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    get_settings().schedule.bays = 2
+    apps = await create_apps(session, default_car, 3)
+    slot = monday_slots()[1]
+
+    status_code, body = await book(staff_client, apps[0].id, slot)
+    assert status_code == status.HTTP_200_OK
+    assert datetime.fromisoformat(body["arrival_time"]) == slot
+    assert (await book(staff_client, apps[1].id, slot))[0] == status.HTTP_200_OK
+    assert await book(staff_client, apps[2].id, slot) == (
+        status.HTTP_409_CONFLICT,
+        {"detail": api_messages.ARRIVAL_SLOT_FULL},
+    )
+
+    bookings = await session.execute(
+        select(ArrivalBooking.app_id, ArrivalBooking.bay).order_by(ArrivalBooking.bay)
+    )
+    assert [tuple(row) for row in bookings] == [(apps[0].id, 1), (apps[1].id, 2)]
+    db_app = await session.get(Application, apps[0].id, populate_existing=True)
+    assert db_app is not None
+    assert db_app.arrival_time == slot
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_adminapply_time_rebooking_and_rejection_free_the_bay(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    get_settings().schedule.bays = 1
+    apps = await create_apps(session, default_car, 3)
+    first, second = monday_slots()[:2]
+
+    assert (await book(staff_client, apps[0].id, first))[0] == status.HTTP_200_OK
+    assert (await book(staff_client, apps[0].id, second))[0] == status.HTTP_200_OK
+    assert (await book(staff_client, apps[1].id, first))[0] == status.HTTP_200_OK
+
+    await session.execute(
+        update(Application)
+        .where(Application.id == apps[1].id)
+        .values(status=Status.REJECTED)
+    )
+    await session.commit()
+
+    assert (await book(staff_client, apps[2].id, first))[0] == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "arrival_time",
+    [
+        "2025-01-02T10:00:00+00:00",  # past
+        "2031-03-17T06:30:00+00:00",  # not slot start
+        "2031-03-16T06:00:00+00:00",  # sunday
+        "2031-03-17T06:00:00",  # no timezone
+    ],
+)
+async def test_adminapply_time_refuses_time_that_is_not_future_slot(
+    staff_client: AsyncClient,
+    default_app: Application,
+    arrival_time: str,
+) -> None:
+    response = await staff_client.post(
+        app.url_path_for("adminapply_time"),
+        params={"app_id": default_app.id, "arrival_time": arrival_time},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json() == {"detail": api_messages.ARRIVAL_TIME_NOT_SLOT}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_free_slots_counts_bookings_per_slot(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    get_settings().schedule.bays = 2
+    apps = await create_apps(session, default_car, 3)
+    slots = monday_slots()
+    for app_row, slot in zip(apps, [slots[0], slots[0], slots[1]]):
+        assert (await book(staff_client, app_row.id, slot))[0] == status.HTTP_200_OK
+
+    response = await staff_client.get(
+        app.url_path_for("get_free_slots"), params={"day": "2031-03-16", "days": 2}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    free = [
+        (datetime.fromisoformat(s["start"]), s["free_bays"]) for s in response.json()
+    ]
+    assert free == [(slots[1], 1)] + [(slot, 2) for slot in slots[2:]]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_booking_of_last_bay_books_it_once(
+    session: AsyncSession,
+) -> None:
+    # committed rows and two real transactions, test session is rolled back
+    get_settings().schedule.bays = 1
+    slot = monday_slots()[0]
+    engine = database_session.get_async_engine()
+    first_connection = await engine.connect()
+    second_connection = await engine.connect()
+    first = AsyncSession(bind=first_connection, expire_on_commit=False)
+    second = AsyncSession(bind=second_connection, expire_on_commit=False)
+    client_id = 700101100
+    now = datetime.now(UTC)
+    try:
+        first.add(Client(client_id=client_id, phone="+79990001100"))
+        await first.flush()
+        car = Car(
+            client_id=client_id, brand="Lada", model="Vesta", number="C110CC", year=2020
+        )
+        first.add(car)
+        await first.flush()
+        apps = await create_apps(first, car, 2)
+
+        await book_arrival_slot(first, apps[0].id, slot, now)
+        # second booking waits for the bay taken by uncommitted first one
+        second_booking = asyncio.create_task(
+            book_arrival_slot(second, apps[1].id, slot, now)
+        )
+        await asyncio.sleep(0.2)
+        assert not second_booking.done()
+        await first.commit()
+
+        with pytest.raises(ArrivalSlotFullError):
+            await asyncio.wait_for(second_booking, timeout=2)
+        await second.rollback()
+    finally:
+        await first.rollback()
+        await second.rollback()
+        for model, where in (
+            (Application, Application.client_id == client_id),
+            (Car, Car.client_id == client_id),
+            (Client, Client.client_id == client_id),
+        ):
+            await first.execute(delete(model).where(where))
+        await first.commit()
+        for db_session, connection in (
+            (first, first_connection),
+            (second, second_connection),
+        ):
+            await db_session.close()
+            await connection.close()
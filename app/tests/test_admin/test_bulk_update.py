@@ -0,0 +1,204 @@
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import api_messages
+from app.core import database_session
+from app.main import app
+from app.models import Application, Car, Priority, Status, User
+from app.tests.conftest import create_apps
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_bulk_update_applies_shared_and_per_item_changes_in_one_statement(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+    diag_user: User,
+) -> None:
+    apps = await create_apps(session, default_car, 3)
+    statements: list[str] = []
+
+    def capture(*args: Any) -> None:
+        statements.append(args[2])
+
+    sync_engine = database_session.get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await staff_client.post(
+            app.url_path_for("adminbulk_update_apps"),
+            json={
+                "shared": {
+                    "status": Status.CARWAITING.value,
+                    "diag_id": diag_user.user_id,
+                },
+                "apps": [
+                    {"app_id": apps[0].id},
+                    {"app_id": apps[1].id, "priority": Priority.HIGH.value},
+                    {
+                        "app_id": apps[2].id,
+                        "status": Status.REJECTED.value,
+                        "admin_comment": "duplicate",
+                    },
+                ],
+            },
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(statements) == 1
+    results = response.json()["results"]
+    assert [r["app_id"] for r in results] == [a.id for a in apps]
+    assert all(r["updated"] for r in results)
+
+    db_apps = {
+        a.id: a
+        for a in await session.scalars(
+            select(Application).where(Application.id.in_([a.id for a in apps]))
+        )
+    }
+    assert db_apps[apps[0].id].status == Status.CARWAITING
+    assert db_apps[apps[0].id].diag_id == diag_user.user_id
+    assert db_apps[apps[0].id].priority == Priority.LOW
+    assert db_apps[apps[1].id].priority == Priority.HIGH
+    assert db_apps[apps[2].id].status == Status.REJECTED
+    assert db_apps[apps[2].id].admin_comment == "duplicate"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_bulk_update_reports_missing_apps(
+    staff_client: AsyncClient,
+    default_app: Application,
+) -> None:
+    response = await staff_client.post(
+        app.url_path_for("adminbulk_update_apps"),
+        json={
+            "shared": {"status": Status.REJECTED.value},
+            "apps": [{"app_id": default_app.id}, {"app_id": -1}],
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"][0]["status"] == Status.REJECTED.value
+    assert response.json()["results"][1] == {
+        "app_id": -1,
+        "updated": False,
+        "detail": api_messages.APPLICATION_NOT_FOUND,
+        "admin_comment": None,
+        "status": None,
+        "priority": None,
+        "diag_id": None,
+    }
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_bulk_update_skips_apps_outside_of_status_graph(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    apps = await create_apps(session, default_car, 2)
+    apps[1].status = Status.COMPLETED
+    await session.commit()
+
+    response = await staff_client.post(
+        app.url_path_for("adminbulk_update_apps"),
+        json={
+            "shared": {"status": Status.CARWAITING.value, "admin_comment": "called"},
+            "apps": [{"app_id": apps[0].id}, {"app_id": apps[1].id}, {"app_id": -1}],
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [(r["updated"], r.get("detail")) for r in results] == [
+        (True, None),
+        (False, api_messages.INVALID_STATUS_TRANSITION),
+        (False, api_messages.APPLICATION_NOT_FOUND),
+    ]
+    db_app = await session.get(Application, apps[1].id, populate_existing=True)
+    assert db_app is not None
+    assert db_app.status == Status.COMPLETED
+    assert db_app.admin_comment is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_bulk_update_skips_apps_with_unknown_assignee(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+    diag_user: User,
+) -> None:
+    apps = await create_apps(session, default_car, 2)
+
+    response = await staff_client.post(
+        app.url_path_for("adminbulk_update_apps"),
+        json={
+            "apps": [
+                {"app_id": apps[0].id, "diag_id": -1, "admin_comment": "lost"},
+                {"app_id": apps[1].id, "diag_id": diag_user.user_id},
+            ],
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [(r["updated"], r.get("detail")) for r in results] == [
+        (False, api_messages.ASSIGNEE_NOT_FOUND),
+        (True, None),
+    ]
+    db_apps = list(
+        await session.scalars(
+            select(Application)
+            .where(Application.id.in_([a.id for a in apps]))
+            .order_by(Application.id)
+            .execution_options(populate_existing=True)
+        )
+    )
+    assert [a.diag_id for a in db_apps] == [None, diag_user.user_id]
+    # the whole item is skipped, its admin_comment too
+    assert db_apps[0].admin_comment is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_bulk_update_rejects_duplicate_app_ids(
+    staff_client: AsyncClient,
+) -> None:
+    response = await staff_client.post(
+        app.url_path_for("adminbulk_update_apps"),
+        json={"apps": [{"app_id": 1}, {"app_id": 1}]},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("where", ["shared", "apps"])
+async def test_bulk_update_refuses_arrival_time(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_app: Application,
+    where: str,
+) -> None:
+    # arrival is booked into slots one by one, never written in bulk
+    change = {"arrival_time": "2030-01-01T10:00:00+00:00"}
+    response = await staff_client.post(
+        app.url_path_for("adminbulk_update_apps"),
+        json={
+            "shared": change if where == "shared" else {},
+            "apps": [{"app_id": default_app.id, **(change if where == "apps" else {})}],
+        },
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert (
+        await session.scalar(
+            select(Application.arrival_time).where(Application.id == default_app.id)
+        )
+        is None
+    )
@@ -0,0 +1,145 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import CURSOR_INVALID
+from app.main import app
+from app.models import Car, Priority, Status
+from app.tests.conftest import create_apps
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_all_apps_returns_newest_first_with_nested_car_and_client(
+    staff_client: AsyncClient,
+    default_car: Car,
+    session: AsyncSession,
+) -> None:
+    apps = await create_apps(session, default_car, 3)
+
+    response = await staff_client.get(app.url_path_for("get_all_apps"))
+
+    assert response.status_code == status.HTTP_200_OK
+    page = response.json()
+    assert [item["id"] for item in page["items"]] == [a.id for a in reversed(apps)]
+    assert page["items"][0]["car"]["number"] == default_car.number
+    assert page["items"][0]["client"]["client_id"] == default_car.client_id
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_all_apps_cursor_walks_all_pages_without_duplicates(
+    staff_client: AsyncClient,
+    default_car: Car,
+    session: AsyncSession,
+) -> None:
+    apps = await create_apps(session, default_car, 5)
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params: dict[str, str | int] = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await staff_client.get(
+            app.url_path_for("get_all_apps"), params=params
+        )
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [a.id for a in reversed(apps)]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_all_apps_filters_by_priority_and_created_range(
+    staff_client: AsyncClient,
+    default_car: Car,
+    session: AsyncSession,
+) -> None:
+    apps = await create_apps(session, default_car, 6)
+
+    response = await staff_client.get(
+        app.url_path_for("get_all_apps"),
+        params={
+            "priority": Priority.HIGH.value,
+            "created_from": apps[2].created_at.isoformat(),
+            "created_to": apps[5].created_at.isoformat(),
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["items"]] == [apps[3].id]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_all_apps_filters_by_status(
+    staff_client: AsyncClient,
+    default_car: Car,
+    session: AsyncSession,
+) -> None:
+    apps = await create_apps(session, default_car, 2)
+    apps[0].status = Status.REPAIR
+    await session.commit()
+
+    response = await staff_client.get(
+        app.url_path_for("get_all_apps"),
+        params={"status": Status.REPAIR.value},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["items"]] == [apps[0].id]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_all_apps_rejects_limit_above_max(
+    staff_client: AsyncClient,
+) -> None:
+    response = await staff_client.get(
+        app.url_path_for("get_all_apps"), params={"limit": 100_000}
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_all_apps_rejects_malformed_cursor(
+    staff_client: AsyncClient,
+) -> None:
+    response = await staff_client.get(
+        app.url_path_for("get_all_apps"), params={"cursor": "garbage!"}
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": CURSOR_INVALID}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("plate", ["a 12", "23 вс", "C77"])
+async def test_get_all_apps_plate_search_matches_lookalike_letters(
+    staff_client: AsyncClient,
+    default_car: Car,
+    session: AsyncSession,
+    plate: str,
+) -> None:
+    other_car = Car(
+        client_id=default_car.client_id,
+        brand="Lada",
+        model="Niva",
+        number="В777ОР99",
+        year=2015,
+    )
+    session.add(other_car)
+    await session.commit()
+    apps = await create_apps(session, default_car, 1)
+    await create_apps(session, other_car, 1)
+
+    response = await staff_client.get(
+        app.url_path_for("get_all_apps"), params={"plate": plate}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["items"]] == [apps[0].id]
@@ -0,0 +1,165 @@
+from collections import Counter
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.workload import rebuild_workload
+from app.main import app
+from app.models import Application, ApplicationWorkload, Car, Role, Status, User
+from app.repositories.applications import (
+    DIAGNOSTIC_QUEUE,
+    bulk_update_apps,
+    claim_next_app,
+    update_app,
+)
+from app.tests.conftest import create_apps
+
+mechanic_id = 700101000
+
+
+async def add_staff(
+    session: AsyncSession, user_id: int, role: Role, phone: str
+) -> User:
+    user = User(
+        user_id=user_id,
+        role=role,
+        user_name=f"{role.name} {user_id}",
+        hashed_password="x",
+        phone=phone,
+    )
+    session.add(user)
+    await session.commit()
+    return user
+
+
+async def workload(session: AsyncSession) -> dict[tuple[int, Status], tuple[int, int]]:
+    rows = await session.execute(select(ApplicationWorkload))
+    return {
+        (row.user_id, row.status): (row.diag_count, row.mechanic_count)
+        for row in rows.scalars()
+        if row.diag_count or row.mechanic_count
+    }
+
+
+async def recount(session: AsyncSession) -> dict[tuple[int, Status], tuple[int, int]]:
+    counts: Counter[tuple[int, Status, str]] = Counter()
+    for diag, mechanic, app_status in await session.execute(
+        select(Application.diag_id, Application.mechanic_id, Application.status)
+    ):
+        if diag is not None:
+            counts[diag, app_status, "diag"] += 1
+        if mechanic is not None:
+            counts[mechanic, app_status, "mechanic"] += 1
+    return {
+        (user_id, app_status): (
+            counts[user_id, app_status, "diag"],
+            counts[user_id, app_status, "mechanic"],
+        )
+        for user_id, app_status, _ in counts
+    }
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_workload_follows_application_writes(
+    session: AsyncSession,
+    default_car: Car,
+    diag_user: User,
+) -> None:
+    await add_staff(session, mechanic_id, Role.MECHANIC, "+79990001000")
+    apps = await create_apps(session, default_car, 4)
+    await session.execute(update(Application).values(status=Status.CARWAITING))
+    assert await workload(session) == {}
+
+    returning = (Application.id,)
+    await update_app(
+        apps[0].id,
+        session,
+        {"status": Status.DIAGNOSTIC, "diag_id": diag_user.user_id},
+        returning,
+    )
+    await bulk_update_apps(
+        session,
+        [
+            (app.id, {"status": Status.DIAGNOSTIC, "diag_id": diag_user.user_id})
+            for app in apps[1:3]
+        ],
+    )
+    assert await workload(session) == {(diag_user.user_id, Status.DIAGNOSTIC): (3, 0)}
+
+    await update_app(
+        apps[2].id,
+        session,
+        {"status": Status.REPAIR, "mechanic_id": mechanic_id},
+        returning,
+    )
+    await update_app(
+        apps[2].id, session, {"mechanic_comment": "no change of counts"}, returning
+    )
+    await session.execute(
+        update(Application)
+        .where(Application.id == apps[3].id)
+        .values(status=Status.DIAGNOSTIC)
+    )
+    await claim_next_app(session, DIAGNOSTIC_QUEUE, diag_user.user_id)
+    await session.execute(delete(Application).where(Application.id == apps[0].id))
+
+    assert await workload(session) == {
+        (diag_user.user_id, Status.DIAGNOSTIC): (2, 0),
+        (diag_user.user_id, Status.REPAIR): (1, 0),
+        (mechanic_id, Status.REPAIR): (0, 1),
+    }
+    assert await workload(session) == await recount(session)
+
+    await session.execute(delete(ApplicationWorkload))
+    await rebuild_workload(session)
+    assert await workload(session) == await recount(session)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_workload_lists_staff_least_loaded_first(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+    diag_user: User,
+) -> None:
+    idle_diag = await add_staff(session, 700101001, Role.DIAGNOSTIC, "+79990001001")
+    await add_staff(session, mechanic_id, Role.MECHANIC, "+79990001000")
+    apps = await create_apps(session, default_car, 4)
+    for app_row, values in zip(
+        apps,
+        [
+            {"status": Status.DIAGNOSTIC, "diag_id": diag_user.user_id},
+            {"status": Status.DIAGNOSTIC, "diag_id": diag_user.user_id},
+            {
+                "status": Status.REPAIR,
+                "diag_id": diag_user.user_id,
+                "mechanic_id": mechanic_id,
+            },
+            # finished work is not load
+            {"status": Status.COMPLETED, "mechanic_id": mechanic_id},
+        ],
+    ):
+        await session.execute(
+            update(Application).where(Application.id == app_row.id).values(**values)
+        )
+    await session.commit()
+
+    response = await staff_client.get(app.url_path_for("get_workload"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [
+        (s["user_id"], s["open_apps"], s["by_status"]) for s in response.json()
+    ] == [
+        (idle_diag.user_id, 0, {}),
+        (mechanic_id, 1, {Status.REPAIR.value: 1}),
+        (diag_user.user_id, 3, {Status.DIAGNOSTIC.value: 2, Status.REPAIR.value: 1}),
+    ]
+
+    response = await staff_client.get(
+        app.url_path_for("get_workload"), params={"role": Role.MECHANIC.value}
+    )
+
+    assert [s["user_id"] for s in response.json()] == [mechanic_id]
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from fastapi import HTTPException, status
+from freezegun import freeze_time
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from app.api import api_messages, deps
+from app.core import database_session
+from app.core.config import get_settings
+from app.core.security.jwt import create_jwt_token
+from app.main import app
+from app.models import Role
+
+
+def make_request(headers: dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_read_session_uses_replica_by_default(
+    monkeypatch: pytest.MonkeyPatch,
+    session: AsyncSession,
+) -> None:
+    monkeypatch.setenv("DATABASE__REPLICA_HOSTNAME", "replica.local")
+    get_settings.cache_clear()
+    monkeypatch.setattr(database_session._ENGINES, "replica", None)
+    monkeypatch.setattr(database_session._ENGINES, "replica_sessionmaker", None)
+
+    read_session_gen = deps.get_read_session(make_request({}))
+    read_session = await anext(read_session_gen)
+
+    assert read_session is not session
+    assert read_session.bind.url.host == "replica.local"  # type: ignore[union-attr]
+    await read_session_gen.aclose()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_read_session_uses_primary_with_read_your_writes_header(
+    monkeypatch: pytest.MonkeyPatch,
+    session: AsyncSession,
+) -> None:
+    monkeypatch.setenv("DATABASE__REPLICA_HOSTNAME", "replica.local")
+    get_settings.cache_clear()
+
+    read_session_gen = deps.get_read_session(
+        make_request({deps.READ_YOUR_WRITES_HEADER: "1"})
+    )
+
+    assert await anext(read_session_gen) is session
+    await read_session_gen.aclose()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "role,allowed",
+    [
+        (Role.MECHANIC, True),
+        (Role.SUPERADMIN, True),
+        (Role.ADMIN, False),
+        (None, False),
+    ],
+    ids=["mechanic", "superadmin", "admin", "no-role"],
+)
+async def test_require_roles_checks_role_claim(
+    role: Role | None, allowed: bool
+) -> None:
+    check_roles = deps.require_roles(Role.MECHANIC)
+    token = create_jwt_token("1", role=role).access_token
+
+    if allowed:
+        assert (await check_roles(token)).role == role
+    else:
+        with pytest.raises(HTTPException) as exc_info:
+            await check_roles(token)
+        assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
+        assert exc_info.value.detail == api_messages.ROLE_FORBIDDEN
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_require_roles_rejects_role_claim_past_revocation_window() -> None:
+    max_age_secs = get_settings().security.jwt_role_claim_max_age_secs
+    with freeze_time("2024-01-01 12:00:00"):
+        token = create_jwt_token("1", role=Role.ADMIN).access_token
+    with freeze_time(datetime(2024, 1, 1, 12) + timedelta(seconds=max_age_secs + 1)):
+        with pytest.raises(HTTPException) as exc_info:
+            await deps.require_roles(Role.ADMIN)(token)
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert exc_info.value.detail == api_messages.ROLE_CLAIM_TOO_OLD
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_role_gated_router_authorizes_without_database_query(
+    client: AsyncClient,
+) -> None:
+    statements: list[str] = []
+
+    def capture(*args: Any) -> None:
+        statements.append(args[2])
+
+    mechanic = create_jwt_token("1", role=Role.MECHANIC).access_token
+    sync_engine = database_session.get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await client.get(
+            app.url_path_for("get_diagnostics"),
+            headers={"Authorization": f"Bearer {mechanic}"},
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert statements == []
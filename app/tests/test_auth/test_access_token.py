@@ -12,6 +12,7 @@ from app.core.config import get_settings
 from app.core.security.jwt import verify_jwt_token
 from app.main import app
 from app.models import RefreshToken, User
+from app.repositories.refresh_tokens import hash_refresh_token
 from app.tests.conftest import default_user_password
 
 
@@ -137,7 +138,9 @@ async def test_login_access_token_refresh_token_exists_in_db(
     token = response.json()
 
     token_db_count = await session.scalar(
-        select(func.count()).where(RefreshToken.refresh_token == token["refresh_token"])
+        select(func.count()).where(
+            RefreshToken.token_hash == hash_refresh_token(token["refresh_token"])
+        )
     )
     assert token_db_count == 1
 
@@ -159,7 +162,9 @@ async def test_login_access_token_refresh_token_in_db_has_valid_fields(
 
     token = response.json()
     result = await session.scalars(
-        select(RefreshToken).where(RefreshToken.refresh_token == token["refresh_token"])
+        select(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token(token["refresh_token"])
+        )
     )
     refresh_token = result.one()
 
@@ -12,6 +12,7 @@ from app.core.config import get_settings
 from app.core.security.jwt import verify_jwt_token
 from app.main import app
 from app.models import RefreshToken, User
+from app.repositories.refresh_tokens import hash_refresh_token
 
 
 @pytest.mark.asyncio(loop_scope="session")
@@ -37,7 +38,7 @@ async def test_refresh_token_fails_with_message_when_token_is_expired(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) - 1,
     )
     session.add(test_refresh_token)
@@ -62,7 +63,7 @@ async def test_refresh_token_fails_with_message_when_token_is_used(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) + 1000,
         used=True,
     )
@@ -88,7 +89,7 @@ async def test_refresh_token_success_response_status_code(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) + 1000,
         used=False,
     )
@@ -113,7 +114,7 @@ async def test_refresh_token_success_old_token_is_used(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) + 1000,
         used=False,
     )
@@ -128,7 +129,9 @@ async def test_refresh_token_success_old_token_is_used(
     )
 
     used_test_refresh_token = await session.scalar(
-        select(RefreshToken).where(RefreshToken.refresh_token == "blaxx")
+        select(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token("blaxx")
+        )
     )
     assert used_test_refresh_token is not None
     assert used_test_refresh_token.used
@@ -142,7 +145,7 @@ async def test_refresh_token_success_jwt_has_valid_token_type(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) + 1000,
         used=False,
     )
@@ -169,7 +172,7 @@ async def test_refresh_token_success_jwt_has_valid_expire_time(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) + 1000,
         used=False,
     )
@@ -200,7 +203,7 @@ async def test_refresh_token_success_jwt_has_valid_access_token(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) + 1000,
         used=False,
     )
@@ -232,7 +235,7 @@ async def test_refresh_token_success_refresh_token_has_valid_expire_time(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) + 1000,
         used=False,
     )
@@ -262,7 +265,7 @@ async def test_refresh_token_success_new_refresh_token_is_in_db(
 ) -> None:
     test_refresh_token = RefreshToken(
         user_id=default_user.user_id,
-        refresh_token="blaxx",
+        token_hash=hash_refresh_token("blaxx"),
         exp=int(time.time()) + 1000,
         used=False,
     )
@@ -278,6 +281,8 @@ async def test_refresh_token_success_new_refresh_token_is_in_db(
 
     token = response.json()
     token_db_count = await session.scalar(
-        select(func.count()).where(RefreshToken.refresh_token == token["refresh_token"])
+        select(func.count()).where(
+            RefreshToken.token_hash == hash_refresh_token(token["refresh_token"])
+        )
     )
     assert token_db_count == 1
@@ -0,0 +1,38 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.api import api_messages
+from app.core.security.password import get_password_hasher
+from app.core.security.rate_limit import (
+    BucketLimit,
+    LoginRateLimiter,
+    MemoryTokenBucketStore,
+    set_login_rate_limiter,
+)
+from app.main import app
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_login_access_token_rejects_exhausted_username_before_bcrypt(
+    client: AsyncClient,
+) -> None:
+    limiter = LoginRateLimiter(
+        store=MemoryTokenBucketStore(max_keys=10),
+        per_user=BucketLimit(capacity=1, refill_per_sec=0.1),
+        per_ip=BucketLimit(capacity=100, refill_per_sec=100),
+    )
+    set_login_rate_limiter(limiter)
+    await limiter.check("123", None)
+    completed_before = get_password_hasher().stats().completed
+
+    response = await client.post(
+        app.url_path_for("login_access_token"),
+        data={"username": "123", "password": "wrong"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json() == {"detail": api_messages.LOGIN_RATE_LIMITED}
+    assert response.headers["Retry-After"] == "10"
+    assert get_password_hasher().stats().completed == completed_before
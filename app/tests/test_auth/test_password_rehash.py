@@ -0,0 +1,79 @@
+import bcrypt
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.security.password import verify_password
+from app.core.user_cache import cache_user, get_user_cache
+from app.main import app
+from app.models import Role, User
+
+rehash_user_id = 700100600
+
+
+async def add_user(session: AsyncSession, rounds: int) -> User:
+    user = User(
+        user_id=rehash_user_id,
+        role=Role.CLIENT,
+        hashed_password=bcrypt.hashpw(b"old_pass", bcrypt.gensalt(rounds)).decode(),
+        phone="+79990000006",
+    )
+    session.add(user)
+    await session.commit()
+    return user
+
+
+async def login(client: AsyncClient, password: str) -> int:
+    response = await client.post(
+        app.url_path_for("login_access_token"),
+        data={"username": str(rehash_user_id), "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    return response.status_code
+
+
+async def stored_hash(session: AsyncSession) -> str:
+    hashed = await session.scalar(
+        select(User.hashed_password)
+        .where(User.user_id == rehash_user_id)
+        .execution_options(populate_existing=True)
+    )
+    assert hashed is not None
+    return hashed
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_login_rehashes_password_with_configured_rounds(
+    client: AsyncClient,
+    session: AsyncSession,
+) -> None:
+    get_settings().security.password_bcrypt_rounds = 5
+    user = await add_user(session, rounds=4)
+    cache_user(str(user.user_id), user)
+
+    assert await login(client, "old_pass") == status.HTTP_200_OK
+
+    new_hash = await stored_hash(session)
+    assert new_hash.startswith("$2b$05$")
+    assert verify_password("old_pass", new_hash)
+    assert get_user_cache().get(str(rehash_user_id)) is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_login_keeps_hash_with_configured_rounds_or_wrong_password(
+    client: AsyncClient,
+    session: AsyncSession,
+) -> None:
+    get_settings().security.password_bcrypt_rounds = 5
+    user = await add_user(session, rounds=5)
+    hashed = user.hashed_password
+
+    assert await login(client, "old_pass") == status.HTTP_200_OK
+    assert await stored_hash(session) == hashed
+
+    get_settings().security.password_bcrypt_rounds = 6
+    assert await login(client, "wrong") == status.HTTP_400_BAD_REQUEST
+    assert await stored_hash(session) == hashed
@@ -0,0 +1,32 @@
+from app.bcrypt_calibration import (
+    RoundsMeasurement,
+    calibrate,
+    recommend_rounds,
+)
+
+
+def test_calibrate_measures_rounds_until_target_is_exceeded() -> None:
+    measurements = calibrate(
+        min_rounds=4, max_rounds=6, workers=2, samples=4, target_p99_secs=10.0
+    )
+
+    assert [m.rounds for m in measurements] == [4, 5, 6]
+    for m in measurements:
+        assert 0 < m.p50_secs <= m.p99_secs
+        assert m.checks_per_sec > 0
+
+    assert [m.rounds for m in calibrate(4, 6, 1, 2, target_p99_secs=0.0)] == [4]
+
+
+def test_recommend_rounds_picks_highest_rounds_within_target() -> None:
+    expected_rounds = 11
+    measurements = [
+        RoundsMeasurement(rounds=10, p50_secs=0.05, p99_secs=0.06, checks_per_sec=40),
+        RoundsMeasurement(
+            rounds=expected_rounds, p50_secs=0.1, p99_secs=0.12, checks_per_sec=20
+        ),
+        RoundsMeasurement(rounds=12, p50_secs=0.2, p99_secs=0.26, checks_per_sec=10),
+    ]
+
+    assert recommend_rounds(measurements, target_p99_secs=0.25) == expected_rounds
+    assert recommend_rounds(measurements, target_p99_secs=0.01) is None
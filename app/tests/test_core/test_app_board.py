@@ -0,0 +1,189 @@
+import asyncio
+import json
+import time
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session
+from app.core.app_board import (
+    KEEPALIVE_FRAME,
+    RESYNC_FRAME,
+    AppBoard,
+    BoardViewer,
+    get_app_board,
+)
+from app.core.pg_listener import listen_notifications
+from app.core.security.jwt import create_jwt_token
+from app.main import app
+from app.models import (
+    Application,
+    Car,
+    Client,
+    NotificationOutbox,
+    Priority,
+    Role,
+    Status,
+)
+from app.repositories.applications import update_app
+
+admin = BoardViewer(user_id=1, role=Role.ADMIN)
+diagnostic = BoardViewer(user_id=2, role=Role.DIAGNOSTIC)
+mechanic = BoardViewer(user_id=3, role=Role.MECHANIC)
+# committed by listener test, far from ids of fixtures
+LISTENER_CLIENT_ID = 700100800
+
+
+def event_payload(
+    app_id: int, diag_id: int | None = None, mechanic_id: int | None = None
+) -> str:
+    # as built by app_event_notify, status by name, priority by value
+    return json.dumps(
+        {
+            "event": "updated",
+            "app_id": app_id,
+            "status": Status.DIAGNOSTIC.name,
+            "priority": Priority.HIGH.value,
+            "diag_id": diag_id,
+            "mechanic_id": mechanic_id,
+        }
+    )
+
+
+def frame_data(frame: str) -> dict[str, object]:
+    event_line, data_line = frame.strip().split("\n")
+    assert event_line == "event: application"
+    data: dict[str, object] = json.loads(data_line.removeprefix("data: "))
+    return data
+
+
+def test_app_board_delivers_events_by_role_and_assignee() -> None:
+    board = AppBoard(queue_size=10)
+    queues = {
+        viewer: board.subscribe(viewer) for viewer in (admin, diagnostic, mechanic)
+    }
+
+    board.publish(event_payload(10, diag_id=2))
+    board.publish(event_payload(11, diag_id=5, mechanic_id=3))
+    board.publish(event_payload(12))
+
+    def app_ids(viewer: BoardViewer) -> list[object]:
+        queue = queues[viewer]
+        return [frame_data(queue.get_nowait())["app_id"] for _ in range(queue.qsize())]
+
+    assert app_ids(admin) == [10, 11, 12]
+    assert app_ids(diagnostic) == [10]
+    assert app_ids(mechanic) == [11]
+
+    board.unsubscribe(queues[admin])
+    board.publish(event_payload(13))
+    assert queues[admin].empty()
+    assert len(board) == len(queues) - 1
+
+
+def test_app_board_replaces_events_of_slow_subscriber_with_resync() -> None:
+    board = AppBoard(queue_size=2)
+    queue = board.subscribe(admin)
+
+    for app_id in range(3):
+        board.publish(event_payload(app_id))
+
+    assert queue.qsize() == 1
+    assert queue.get_nowait() == RESYNC_FRAME
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_app_board_stream_sends_keepalive_and_ends_with_role_claim() -> None:
+    board = AppBoard(queue_size=10)
+    stream = board.stream(admin, keepalive_secs=0.05, until=time.time() + 0.3)
+
+    first = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0.01)
+    board.publish(event_payload(1))
+    assert frame_data(await first)["app_id"] == 1
+    assert await anext(stream) == KEEPALIVE_FRAME
+
+    frames = [frame async for frame in stream]
+    assert set(frames) == {KEEPALIVE_FRAME}
+    assert len(board) == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_committed_app_updates_reach_subscribers_through_listener(
+    session: AsyncSession,
+) -> None:
+    queue = get_app_board().subscribe(admin)
+    # separate committed transaction, test session is always rolled back
+    connection = await database_session.get_async_engine().connect()
+    writer = AsyncSession(bind=connection, expire_on_commit=False)
+    try:
+        writer.add(Client(client_id=LISTENER_CLIENT_ID, phone="+79990000008"))
+        await writer.flush()
+        car = Car(
+            client_id=LISTENER_CLIENT_ID,
+            brand="Lada",
+            model="Vesta",
+            number="A800AA",
+            year=2020,
+        )
+        writer.add(car)
+        await writer.flush()
+        app_row = Application(
+            client_id=LISTENER_CLIENT_ID,
+            car_id=car.id,
+            conn=1,
+            created_at=datetime.now(UTC),
+        )
+        writer.add(app_row)
+        await writer.commit()
+
+        async with listen_notifications():
+            await update_app(
+                app_row.id,
+                writer,
+                values={"status": Status.CARWAITING, "priority": Priority.HIGH},
+                returning=(Application.status,),
+            )
+            await writer.commit()
+
+            # resync of listener connect comes first
+            assert await asyncio.wait_for(queue.get(), 1) == RESYNC_FRAME
+            frame = await asyncio.wait_for(queue.get(), 1)
+    finally:
+        get_app_board().unsubscribe(queue)
+        await writer.rollback()
+        for model, where in (
+            (NotificationOutbox, NotificationOutbox.client_id == LISTENER_CLIENT_ID),
+            (Application, Application.client_id == LISTENER_CLIENT_ID),
+            (Car, Car.client_id == LISTENER_CLIENT_ID),
+            (Client, Client.client_id == LISTENER_CLIENT_ID),
+        ):
+            await writer.execute(delete(model).where(where))
+        await writer.commit()
+        await writer.close()
+        await connection.close()
+
+    assert frame_data(frame) == {
+        "event": "updated",
+        "app_id": app_row.id,
+        "status": Status.CARWAITING.value,
+        "priority": Priority.HIGH.value,
+        "diag_id": None,
+        "mechanic_id": None,
+    }
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_board_events_rejects_client_role(client: AsyncClient) -> None:
+    token = create_jwt_token("700100700", role=Role.CLIENT).access_token
+
+    response = await client.get(
+        app.url_path_for("board_events"),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,110 @@
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session
+from app.core.application_events import (
+    ensure_event_partitions,
+    event_partition_name,
+    month_start,
+)
+from app.models import Application, ApplicationEvent, Car, Status
+from app.repositories.applications import bulk_update_apps, update_app
+from app.tests.conftest import create_apps
+
+
+async def app_events(
+    session: AsyncSession, app_ids: list[int]
+) -> list[tuple[int, Status | None, Status]]:
+    rows = await session.execute(
+        select(
+            ApplicationEvent.app_id,
+            ApplicationEvent.from_status,
+            ApplicationEvent.to_status,
+        )
+        .where(ApplicationEvent.app_id.in_(app_ids))
+        .order_by(ApplicationEvent.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def test_month_start() -> None:
+    moment = datetime(2026, 11, 30, 23, 59, tzinfo=UTC)
+
+    assert month_start(moment) == datetime(2026, 11, 1, tzinfo=UTC)
+    assert month_start(moment, 2) == datetime(2027, 1, 1, tzinfo=UTC)
+    assert event_partition_name(month_start(moment, 2)) == "application_event_y2027m01"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_status_changes_are_logged_by_the_writing_statement(
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    apps = await create_apps(session, default_car, 3)
+    app_ids = [a.id for a in apps]
+    assert await app_events(session, app_ids) == [
+        (a.id, None, Status.WAITING) for a in apps
+    ]
+
+    statements: list[str] = []
+
+    def capture(*args: Any) -> None:
+        statements.append(args[2])
+
+    sync_engine = database_session.get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await bulk_update_apps(
+            session,
+            [
+                (apps[0].id, {"status": Status.CARWAITING}),
+                (apps[1].id, {"status": Status.REJECTED}),
+                (apps[2].id, {"admin_comment": "no status change"}),
+            ],
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+    await update_app(
+        apps[0].id, session, {"status": Status.DIAGNOSTIC}, (Application.id,)
+    )
+
+    assert len(statements) == 1
+    assert (await app_events(session, app_ids))[3:] == [
+        (apps[0].id, Status.WAITING, Status.CARWAITING),
+        (apps[1].id, Status.WAITING, Status.REJECTED),
+        (apps[0].id, Status.CARWAITING, Status.DIAGNOSTIC),
+    ]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_ensure_event_partitions_moves_rows_out_of_default_partition(
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    now = datetime(2031, 3, 15, tzinfo=UTC)
+    [app_row] = await create_apps(session, default_car, 1)
+    await session.execute(
+        insert(ApplicationEvent).values(
+            app_id=app_row.id,
+            from_status=Status.WAITING,
+            to_status=Status.CARWAITING,
+            created_at=now,
+        )
+    )
+
+    created = await ensure_event_partitions(session, now, months_ahead=1)
+
+    assert created == ["application_event_y2031m03", "application_event_y2031m04"]
+    assert await ensure_event_partitions(session, now, months_ahead=1) == []
+    partitions = await session.scalars(
+        text(
+            "SELECT DISTINCT tableoid::regclass::text FROM application_event "
+            "WHERE app_id = :app_id AND created_at = :now"
+        ),
+        {"app_id": app_row.id, "now": now},
+    )
+    assert list(partitions) == ["application_event_y2031m03"]
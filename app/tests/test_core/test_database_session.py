@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import NullPool
+
+from app.core import database_session
+from app.core.config import Database, get_settings
+from app.core.database_session import engine_options
+
+
+def test_engine_options_use_pool_settings() -> None:
+    database = Database(
+        pool_size=20, max_overflow=0, pool_timeout_secs=5, pool_pre_ping=False
+    )
+    options = engine_options(database)
+
+    assert options["pool_size"] == database.pool_size
+    assert options["max_overflow"] == database.max_overflow
+    assert options["pool_timeout"] == database.pool_timeout_secs
+    assert options["pool_pre_ping"] is False
+    assert "poolclass" not in options
+
+
+def test_engine_options_pooler_mode_disables_statement_caches() -> None:
+    options = engine_options(Database(pooler_mode=True))
+    connect_args = options["connect_args"]
+
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert (
+        connect_args["prepared_statement_name_func"]()
+        != connect_args["prepared_statement_name_func"]()
+    )
+
+
+def test_read_session_falls_back_to_primary_without_replica(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    primary_session = AsyncSession()
+    monkeypatch.setattr(database_session, "get_async_session", lambda: primary_session)
+
+    assert database_session.get_async_read_session() is primary_session
+
+
+def test_read_session_uses_replica_engine_when_configured(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("DATABASE__REPLICA_HOSTNAME", "replica.local")
+    get_settings.cache_clear()
+    monkeypatch.setattr(database_session._ENGINES, "replica", None)
+    monkeypatch.setattr(database_session._ENGINES, "replica_sessionmaker", None)
+
+    session = database_session.get_async_read_session()
+
+    assert isinstance(session.bind, AsyncEngine)
+    assert session.bind.url.host == "replica.local"
+    assert session.bind.url.database == get_settings().database.db
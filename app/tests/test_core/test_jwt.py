@@ -82,3 +82,33 @@ def test_jwt_error_with_invalid_secret_key() -> None:
         jwt.verify_jwt_token(token=token.access_token)
 
     assert e.value.detail == "Token invalid: Signature verification failed"
+
+
+def test_jwt_verified_token_is_served_from_memo() -> None:
+    token = jwt.create_jwt_token("test_user_id")
+
+    first = jwt.verify_jwt_token(token=token.access_token)
+    second = jwt.verify_jwt_token(token=token.access_token)
+
+    assert second is first
+
+
+def test_jwt_memo_does_not_outlive_token_exp() -> None:
+    with freeze_time("2024-01-01"):
+        token = jwt.create_jwt_token("test_user_id")
+        jwt.verify_jwt_token(token=token.access_token)
+    with freeze_time("2024-02-01"):
+        with pytest.raises(HTTPException) as e:
+            jwt.verify_jwt_token(token=token.access_token)
+
+        assert e.value.detail == "Token invalid: Signature has expired"
+
+
+def test_jwt_memo_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings().security, "jwt_verified_cache_size", 2)
+    monkeypatch.setattr(jwt._JWT_CONFIG, "config", None)
+
+    for user_id in ("a", "b", "c"):
+        jwt.verify_jwt_token(token=jwt.create_jwt_token(user_id).access_token)
+
+    assert [p.sub for p in jwt._get_jwt_config().verified.values()] == ["b", "c"]
@@ -0,0 +1,158 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.notifications import retry_delay_secs, set_notify_client
+from app.models import Application, Car, NotificationOutbox, Status
+from app.notification_stub import StubMessage, stub
+from app.repositories.notification_outbox import (
+    claim_notifications,
+    dispatch_notifications,
+)
+from app.tests.conftest import create_apps
+
+stub_url = "http://stub/sendMessage"
+
+
+@pytest_asyncio.fixture(name="stub_client", scope="function")
+async def fixture_stub_client() -> AsyncGenerator[AsyncClient]:
+    stub.state.failures = {}
+    stub.state.messages = []
+    async with AsyncClient(
+        transport=ASGITransport(app=stub), base_url="http://stub"
+    ) as client:
+        set_notify_client(client)
+        yield client
+
+
+async def outbox(session: AsyncSession) -> list[NotificationOutbox]:
+    rows = await session.scalars(
+        select(NotificationOutbox)
+        .order_by(NotificationOutbox.id)
+        .execution_options(populate_existing=True)
+    )
+    return list(rows)
+
+
+async def set_status(
+    session: AsyncSession, apps: list[Application], new_status: Status
+) -> None:
+    await session.execute(
+        update(Application)
+        .where(Application.id.in_([app_row.id for app_row in apps]))
+        .values(status=new_status)
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_status_change_writes_outbox_row_in_the_same_statement(
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    apps = await create_apps(session, default_car, 2)
+
+    await session.execute(
+        update(Application)
+        .where(Application.id == apps[0].id)
+        .values(admin_comment="call back")
+    )
+    assert await outbox(session) == []
+
+    await set_status(session, apps, Status.CARWAITING)
+
+    rows = await outbox(session)
+    assert [(row.client_id, row.app_id, row.status, row.attempts) for row in rows] == [
+        (default_car.client_id, apps[0].id, Status.CARWAITING, 0),
+        (default_car.client_id, apps[1].id, Status.CARWAITING, 0),
+    ]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_dispatch_delivers_batch_and_deletes_delivered_rows(
+    session: AsyncSession,
+    default_car: Car,
+    stub_client: AsyncClient,
+) -> None:
+    apps = await create_apps(session, default_car, 3)
+    await set_status(session, apps, Status.CARWAITING)
+
+    assert await dispatch_notifications(session, stub_url) == len(apps)
+
+    assert await outbox(session) == []
+    assert sorted(stub.state.messages, key=lambda m: m.text) == [
+        StubMessage(
+            chat_id=default_car.client_id, text=f"Заявка №{app_row.id}: Ожидание машины"
+        )
+        for app_row in apps
+    ]
+    assert await dispatch_notifications(session, stub_url) == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_claimed_rows_are_not_claimed_again_until_lease_expires(
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    apps = await create_apps(session, default_car, 3)
+    await set_status(session, apps, Status.CARWAITING)
+
+    first = await claim_notifications(session, 2)
+
+    assert sorted(n.app_id for n in first) == [apps[0].id, apps[1].id]
+    assert [n.app_id for n in await claim_notifications(session, 2)] == [apps[2].id]
+    assert await claim_notifications(session, 2) == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_provider_error_is_retried_later(
+    session: AsyncSession,
+    default_car: Car,
+    stub_client: AsyncClient,
+) -> None:
+    stub.state.failures = {default_car.client_id: 503}
+    apps = await create_apps(session, default_car, 1)
+    await set_status(session, apps, Status.CARWAITING)
+
+    assert await dispatch_notifications(session, stub_url) == 1
+
+    (row,) = await outbox(session)
+    assert row.attempts == 1
+    assert row.failed_at is None
+    assert row.last_error.startswith("HTTP 503")
+    assert row.next_attempt_at > await session.scalar(select(func.now()))
+    assert await dispatch_notifications(session, stub_url) == 0
+    assert stub.state.messages == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(("code", "max_attempts"), [(400, 8), (503, 1)])
+async def test_delivery_is_given_up_on_client_error_or_last_attempt(
+    session: AsyncSession,
+    default_car: Car,
+    stub_client: AsyncClient,
+    code: int,
+    max_attempts: int,
+) -> None:
+    get_settings().notify.max_attempts = max_attempts
+    stub.state.failures = {default_car.client_id: code}
+    apps = await create_apps(session, default_car, 1)
+    await set_status(session, apps, Status.CARWAITING)
+
+    assert await dispatch_notifications(session, stub_url) == 1
+
+    (row,) = await outbox(session)
+    assert row.attempts == 1
+    assert row.failed_at is not None
+    assert row.last_error.startswith(f"HTTP {code}")
+
+
+def test_retry_delay_doubles_up_to_max() -> None:
+    for attempts, full_delay in [(0, 2), (3, 16), (20, 900)]:
+        delay = retry_delay_secs(attempts, 2, 900)
+        assert full_delay / 2 <= delay <= full_delay
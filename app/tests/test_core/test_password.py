@@ -1,4 +1,20 @@
-from app.core.security.password import get_password_hash, verify_password
+import asyncio
+import threading
+import time
+
+import bcrypt
+import pytest
+from fastapi import HTTPException, status
+
+from app.core.config import get_settings
+from app.core.security.password import (
+    PasswordHasher,
+    check_password,
+    get_password_hash,
+    hash_password,
+    password_needs_rehash,
+    verify_password,
+)
 
 
 def test_hashed_password_is_verified() -> None:
@@ -9,3 +25,67 @@ def test_hashed_password_is_verified() -> None:
 def test_invalid_password_is_not_verified() -> None:
     pwd_hash = get_password_hash("my_password")
     assert not verify_password("my_password_invalid", pwd_hash)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_async_hashed_password_is_checked() -> None:
+    pwd_hash = await hash_password("my_password")
+
+    assert await check_password("my_password", pwd_hash)
+    assert not await check_password("my_password_invalid", pwd_hash)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_password_hasher_does_not_block_event_loop() -> None:
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    blocking_secs, tick_secs = 0.2, 0.01
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(tick_secs)
+
+    ticker_task = asyncio.create_task(ticker())
+    await hasher.run(time.sleep, blocking_secs)
+    ticker_task.cancel()
+    hasher.shutdown()
+
+    # loop kept ticking for at least half of the blocking call
+    assert ticks >= blocking_secs / tick_secs / 2
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_password_hasher_rejects_calls_above_queue_limit() -> None:
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.create_task(hasher.run(release.wait))
+    queued = asyncio.create_task(hasher.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.run(release.wait)
+    assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert exc_info.value.headers == {"Retry-After": "1"}
+
+    stats = hasher.stats()
+    assert (stats.running, stats.queued, stats.rejected) == (1, 1, 1)
+
+    release.set()
+    await asyncio.gather(running, queued)
+    await asyncio.sleep(0.01)
+    stats = hasher.stats()
+    assert (stats.running, stats.queued, stats.completed) == (0, 0, 2)
+    assert stats.wait_secs_total > 0
+    hasher.shutdown()
+
+
+def test_password_needs_rehash_when_cost_differs_from_settings() -> None:
+    get_settings().security.password_bcrypt_rounds = 5
+    pwd_hash = bcrypt.hashpw(b"my_password", bcrypt.gensalt(4)).decode()
+
+    assert password_needs_rehash(pwd_hash)
+    assert not password_needs_rehash(get_password_hash("my_password"))
+    assert not password_needs_rehash("not a bcrypt hash")
@@ -0,0 +1,13 @@
+import pytest
+
+from app.core.plates import normalize_plate
+
+
+@pytest.mark.parametrize(
+    "number",
+    ["А123ВС77", "a123bc77", "а 123 вс 77", "A-123-BC-77", "а123Bс77"],
+)
+def test_normalize_plate_folds_case_separators_and_cyrillic_lookalikes(
+    number: str,
+) -> None:
+    assert normalize_plate(number) == "A123BC77"
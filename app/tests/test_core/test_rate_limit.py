@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security.rate_limit import (
+    MAX_BUCKET_KEY_LENGTH,
+    BucketLimit,
+    LoginRateLimiter,
+    MemoryTokenBucketStore,
+    PostgresTokenBucketStore,
+    bucket_key,
+)
+
+limit = BucketLimit(capacity=2, refill_per_sec=0.5)
+# wait for a single token of empty bucket
+one_token_secs = 1 / limit.refill_per_sec
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_memory_bucket_allows_burst_then_refills() -> None:
+    clock = FakeClock()
+    store = MemoryTokenBucketStore(max_keys=10, clock=clock)
+
+    assert await store.take("k", limit) == 0
+    assert await store.take("k", limit) == 0
+    assert await store.take("k", limit) == pytest.approx(2.0)
+
+    clock.now = 1.0
+    assert await store.take("k", limit) == pytest.approx(1.0)
+    clock.now = 2.0
+    assert await store.take("k", limit) == 0
+    assert await store.take("other", limit) == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_memory_bucket_store_is_bounded() -> None:
+    store = MemoryTokenBucketStore(max_keys=2)
+    for key in ("a", "b", "c"):
+        await store.take(key, limit)
+
+    assert list(store._buckets) == ["b", "c"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_postgres_bucket_is_shared_and_refills(session: AsyncSession) -> None:
+    first_worker = PostgresTokenBucketStore()
+    second_worker = PostgresTokenBucketStore()
+
+    assert await first_worker.take("k", limit) == 0
+    assert await second_worker.take("k", limit) == 0
+    retry_after = await first_worker.take("k", limit)
+
+    assert 0 < retry_after <= one_token_secs
+    assert await first_worker.take("k", BucketLimit(2, 1000.0)) == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_login_limiter_checks_ip_before_username() -> None:
+    store = MemoryTokenBucketStore(max_keys=10)
+    limiter = LoginRateLimiter(store=store, per_user=limit, per_ip=BucketLimit(1, 0.5))
+
+    assert await limiter.check("geralt", "10.0.0.1") == 0
+    assert await limiter.check("yennefer", "10.0.0.1") > 0
+    assert "user:yennefer" not in store._buckets
+    assert await limiter.check("geralt", "10.0.0.2") == 0
+    assert await limiter.check("geralt", "10.0.0.3") > 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_overlong_username_gets_bounded_bucket_key(session: AsyncSession) -> None:
+    limiter = LoginRateLimiter(
+        store=PostgresTokenBucketStore(), per_user=limit, per_ip=limit
+    )
+    username = "x" * 10_000
+
+    assert len(bucket_key("user", username)) <= MAX_BUCKET_KEY_LENGTH
+    assert bucket_key("user", username) != bucket_key("user", username + "y")
+    assert bucket_key("user", "geralt") == "user:geralt"
+    assert await limiter.check(username, None) == 0
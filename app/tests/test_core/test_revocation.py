@@ -0,0 +1,163 @@
+import asyncio
+import time
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import HTTPException, status
+from freezegun import freeze_time
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session
+from app.core.config import get_settings
+from app.core.pg_listener import listen_notifications
+from app.core.security.jwt import TOKEN_REVOKED, create_jwt_token, verify_jwt_token
+from app.core.security.revocation import (
+    REVOCATION_CHANNEL,
+    RevocationList,
+    get_revocation_list,
+    load_revocations,
+    revoke_user_tokens,
+)
+from app.core.user_cache import cache_user
+from app.main import app
+from app.models import RefreshToken, Role, TokenRevocation, User
+from app.repositories.refresh_tokens import create_refresh_token
+
+revoked_user_id = 700100500
+
+
+async def add_user(session: AsyncSession) -> User:
+    user = User(
+        user_id=revoked_user_id,
+        role=Role.CLIENT,
+        hashed_password="hash",
+        phone="+79990000005",
+    )
+    session.add(user)
+    await session.commit()
+    return user
+
+
+def test_revocation_list_revokes_tokens_issued_until_revocation_second() -> None:
+    revocations = RevocationList()
+    revocations.revoke("1", 100)
+    revocations.revoke("1", 90)
+
+    assert revocations.is_revoked("1", 100)
+    assert not revocations.is_revoked("1", 101)
+    assert not revocations.is_revoked("2", 1)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_revoke_user_tokens_rejects_older_tokens_even_from_memo(
+    session: AsyncSession,
+) -> None:
+    await add_user(session)
+    with freeze_time("2024-01-01 12:00:00"):
+        old_token = create_jwt_token(str(revoked_user_id)).access_token
+        verify_jwt_token(old_token)
+        create_refresh_token(session, revoked_user_id)
+        await session.commit()
+    with freeze_time("2024-01-01 12:00:05"):
+        await revoke_user_tokens(session, revoked_user_id)
+        await session.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            verify_jwt_token(old_token)
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert exc_info.value.detail == TOKEN_REVOKED
+    with freeze_time("2024-01-01 12:00:06"):
+        new_token = create_jwt_token(str(revoked_user_id)).access_token
+        assert verify_jwt_token(new_token).sub == str(revoked_user_id)
+
+    assert await session.scalar(select(func.count()).select_from(RefreshToken)) == 0
+    assert await session.scalar(
+        select(TokenRevocation.revoked_at).where(
+            TokenRevocation.sub == str(revoked_user_id)
+        )
+    ) == int(datetime(2024, 1, 1, 12, 0, 5, tzinfo=UTC).timestamp())
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_login_within_revocation_second_gets_valid_token(
+    session: AsyncSession,
+) -> None:
+    await add_user(session)
+    with freeze_time("2024-01-01 12:00:05.200"):
+        old_token = create_jwt_token(str(revoked_user_id)).access_token
+    with freeze_time("2024-01-01 12:00:05.500"):
+        await revoke_user_tokens(session, revoked_user_id)
+        await session.commit()
+    with freeze_time("2024-01-01 12:00:05.700"):
+        new_token = create_jwt_token(str(revoked_user_id)).access_token
+
+        assert verify_jwt_token(new_token).sub == str(revoked_user_id)
+        with pytest.raises(HTTPException) as exc_info:
+            verify_jwt_token(old_token)
+        assert exc_info.value.detail == TOKEN_REVOKED
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_load_revocations_reads_table_and_drops_stale_rows(
+    session: AsyncSession,
+) -> None:
+    now = int(time.time())
+    lifetime = get_settings().security.jwt_access_token_expire_secs
+    session.add_all(
+        [
+            TokenRevocation(sub="fresh", revoked_at=now),
+            TokenRevocation(sub="stale", revoked_at=now - lifetime - 1),
+        ]
+    )
+    await session.commit()
+
+    await load_revocations()
+
+    assert get_revocation_list().is_revoked("fresh", now)
+    assert not get_revocation_list().is_revoked("stale", 0)
+    assert list(await session.scalars(select(TokenRevocation.sub))) == ["fresh"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_listener_applies_revocation_from_other_worker(
+    session: AsyncSession,
+) -> None:
+    async with listen_notifications():
+        async with database_session.get_async_engine().connect() as connection:
+            await connection.execute(
+                select(func.pg_notify(REVOCATION_CHANNEL, "42:1000"))
+            )
+            await connection.commit()
+
+        for _ in range(50):
+            if get_revocation_list().is_revoked("42", 1000):
+                break
+            await asyncio.sleep(0.01)
+
+    assert get_revocation_list().is_revoked("42", 1000)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_delete_current_user_revokes_its_access_token(
+    client: AsyncClient,
+    session: AsyncSession,
+) -> None:
+    user = await add_user(session)
+    cache_user(str(user.user_id), user)
+    session.expunge(user)
+    token = create_jwt_token(str(user.user_id)).access_token
+
+    response = await client.delete(
+        app.url_path_for("delete_current_user"),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = await client.get(
+        app.url_path_for("read_current_user"),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json() == {"detail": TOKEN_REVOKED}
@@ -0,0 +1,35 @@
+from datetime import UTC, date, datetime, time
+
+from app.core.config import Schedule
+from app.core.schedule import day_slots, is_slot
+
+schedule = Schedule(
+    timezone="Europe/Moscow",
+    working_days=[1, 2, 3, 4, 5],
+    opens_at=time(9),
+    closes_at=time(12, 30),
+    slot_minutes=45,
+    bays=2,
+)
+
+
+def test_day_slots_split_working_hours_in_local_time() -> None:
+    # 09:00 Moscow is 06:00 UTC, 12:00 - 12:45 would end after closing
+    assert day_slots(date(2031, 3, 17), schedule) == [
+        datetime(2031, 3, 17, 6, 0, tzinfo=UTC),
+        datetime(2031, 3, 17, 6, 45, tzinfo=UTC),
+        datetime(2031, 3, 17, 7, 30, tzinfo=UTC),
+        datetime(2031, 3, 17, 8, 15, tzinfo=UTC),
+    ]
+
+
+def test_day_slots_are_empty_on_days_off() -> None:
+    assert day_slots(date(2031, 3, 16), schedule) == []
+
+
+def test_is_slot_accepts_only_slot_starts() -> None:
+    assert is_slot(datetime(2031, 3, 17, 6, 45, tzinfo=UTC), schedule)
+    assert is_slot(datetime.fromisoformat("2031-03-17T09:45:00+03:00"), schedule)
+    assert not is_slot(datetime(2031, 3, 17, 7, 0, tzinfo=UTC), schedule)
+    assert not is_slot(datetime(2031, 3, 17, 9, 0, tzinfo=UTC), schedule)
+    assert not is_slot(datetime(2031, 3, 17, 6, 45), schedule)
@@ -0,0 +1,192 @@
+import time
+from datetime import UTC, datetime
+
+import jwt
+import pytest
+from fastapi import HTTPException, status
+from freezegun import freeze_time
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.security.jwt import (
+    MISSING_SIGNING_KEY_ID,
+    UNKNOWN_SIGNING_KEY,
+    create_jwt_token,
+    verify_jwt_token,
+)
+from app.core.security.signing_keys import (
+    get_key_ring,
+    new_signing_key_row,
+    rotate_signing_keys,
+)
+from app.main import app
+from app.models import JWTSigningKey
+
+day = 24 * 3600
+
+
+def at(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp, UTC)
+
+
+def use_algorithm(algorithm: str) -> None:
+    security = get_settings().security
+    security.jwt_algorithm = algorithm  # type: ignore[assignment]
+    security.jwt_key_rotation_secs = 30 * day
+    security.jwt_key_publish_lead_secs = 3600
+    security.jwt_access_token_expire_secs = day
+
+
+async def kids(session: AsyncSession) -> list[str]:
+    return list(
+        await session.scalars(
+            select(JWTSigningKey.kid).order_by(JWTSigningKey.created_at)
+        )
+    )
+
+
+@pytest.mark.parametrize("algorithm", ["EdDSA", "RS256"])
+@pytest.mark.asyncio(loop_scope="session")
+async def test_first_key_is_created_and_signs_tokens_with_kid(
+    session: AsyncSession, algorithm: str
+) -> None:
+    use_algorithm(algorithm)
+
+    assert await rotate_signing_keys(session)
+    await session.commit()
+
+    [kid] = await kids(session)
+    token = create_jwt_token("1").access_token
+    assert jwt.get_unverified_header(token) == {
+        "alg": algorithm,
+        "kid": kid,
+        "typ": "JWT",
+    }
+    assert verify_jwt_token(token).sub == "1"
+
+    # verifiable by third party holding only published key
+    [public_jwk] = get_key_ring().jwks()["keys"]
+    assert "d" not in public_jwk
+    public_key = jwt.PyJWK(public_jwk).key
+    assert jwt.decode(token, public_key, algorithms=[algorithm])["sub"] == "1"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_rotate_signing_keys_does_nothing_with_hs256(
+    session: AsyncSession,
+) -> None:
+    assert not await rotate_signing_keys(session)
+    assert await kids(session) == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_rotation_publishes_successor_before_it_signs_and_drops_dead_keys(
+    session: AsyncSession,
+) -> None:
+    use_algorithm("EdDSA")
+    start = int(time.time()) - 100 * day
+    session.add(new_signing_key_row("EdDSA", start))
+    await session.commit()
+
+    with freeze_time(at(start + 29 * day)):
+        assert not await rotate_signing_keys(session)
+        [first] = await kids(session)
+
+    # rotation - lead: successor published, first key still signs
+    with freeze_time(at(start + 30 * day - 3600)):
+        assert await rotate_signing_keys(session)
+        await session.commit()
+        first_, second = await kids(session)
+        assert first_ == first
+        assert {key["kid"] for key in get_key_ring().jwks()["keys"]} == {first, second}
+        old_token = create_jwt_token("1").access_token
+        assert jwt.get_unverified_header(old_token)["kid"] == first
+
+    # successor signs, first one verifies tokens it signed
+    with freeze_time(at(start + 30 * day)):
+        assert not await rotate_signing_keys(session)
+        assert (
+            jwt.get_unverified_header(create_jwt_token("1").access_token)["kid"]
+            == second
+        )
+        assert verify_jwt_token(old_token).sub == "1"
+
+    # token lifetime after successor took over first key is gone
+    with freeze_time(at(start + 31 * day + 1)):
+        assert await rotate_signing_keys(session)
+        await session.commit()
+        assert await kids(session) == [second]
+        assert len(get_key_ring()) == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_token_with_unknown_kid_is_rejected(session: AsyncSession) -> None:
+    use_algorithm("EdDSA")
+    await rotate_signing_keys(session)
+    token = create_jwt_token("1").access_token
+    get_key_ring().replace([])
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(token)
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert exc_info.value.detail == UNKNOWN_SIGNING_KEY
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_token_without_kid_is_rejected(session: AsyncSession) -> None:
+    use_algorithm("EdDSA")
+    await rotate_signing_keys(session)
+    token = create_jwt_token("1").access_token
+    signing_key = get_key_ring().get(jwt.get_unverified_header(token)["kid"])
+    assert signing_key is not None
+    claims = jwt.decode(token, options={"verify_signature": False})
+    token_without_kid = jwt.encode(claims, signing_key.private_key, algorithm="EdDSA")
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(token_without_kid)
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert exc_info.value.detail == MISSING_SIGNING_KEY_ID
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_hs256_token_is_rejected_when_signing_with_eddsa(
+    session: AsyncSession,
+) -> None:
+    hs256_token = create_jwt_token("1").access_token
+    use_algorithm("EdDSA")
+    await rotate_signing_keys(session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(hs256_token)
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_jwks_endpoint_is_cacheable_and_supports_etag(
+    client: AsyncClient,
+    session: AsyncSession,
+) -> None:
+    use_algorithm("EdDSA")
+    get_settings().security.jwks_max_age_secs = 900
+    await rotate_signing_keys(session)
+
+    response = await client.get(app.url_path_for("jwks"))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == get_key_ring().jwks()
+    assert response.headers["cache-control"] == "public, max-age=900"
+    etag = response.headers["etag"]
+
+    response = await client.get(
+        app.url_path_for("jwks"), headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    get_key_ring().replace([])
+    response = await client.get(
+        app.url_path_for("jwks"), headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"keys": []}
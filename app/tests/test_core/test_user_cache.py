@@ -0,0 +1,161 @@
+import asyncio
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core import database_session
+from app.core.pg_listener import listen_notifications
+from app.core.security.jwt import create_jwt_token
+from app.core.user_cache import (
+    USER_CACHE_CHANNEL,
+    UserCache,
+    cache_user,
+    get_user_cache,
+)
+from app.main import app
+from app.models import Role, User
+
+cached_user_id = 700100300
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def add_user(session: AsyncSession) -> User:
+    user = User(
+        user_id=cached_user_id,
+        role=Role.ADMIN,
+        user_name="Yennefer",
+        hashed_password="hash",
+        phone="+79990000003",
+    )
+    session.add(user)
+    await session.commit()
+    return user
+
+
+def test_user_cache_expires_entries_after_ttl() -> None:
+    clock = FakeClock()
+    cache = UserCache(maxsize=10, ttl_secs=5, clock=clock)
+    cache.set("1", {"user_id": 1})
+
+    clock.now = 4.9
+    assert cache.get("1") == {"user_id": 1}
+    clock.now = 5.0
+    assert cache.get("1") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_user_cache_reset_drops_entries_and_counters() -> None:
+    cache = UserCache(maxsize=10, ttl_secs=60)
+    cache.set("1", {})
+    cache.get("1")
+
+    cache.reset()
+
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_user_cache_evicts_least_recently_used() -> None:
+    cache = UserCache(maxsize=2, ttl_secs=60)
+    cache.set("1", {})
+    cache.set("2", {})
+    cache.get("1")
+    cache.set("3", {})
+
+    assert cache.get("2") is None
+    assert cache.get("1") == {}
+    assert cache.get("3") == {}
+
+
+def test_user_cache_with_zero_ttl_stores_nothing() -> None:
+    cache = UserCache(maxsize=10, ttl_secs=0)
+    cache.set("1", {})
+
+    assert cache.get("1") is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_current_user_cache_hit_skips_select(
+    session: AsyncSession,
+) -> None:
+    user = await add_user(session)
+    cache_user(str(user.user_id), user)
+    session.expunge(user)
+    token = create_jwt_token(str(user.user_id)).access_token
+
+    statements: list[str] = []
+
+    def capture(*args: Any) -> None:
+        statements.append(args[2])
+
+    sync_engine = database_session.get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        current_user = await deps.get_current_user(token, session)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert statements == []
+    assert current_user is not user
+    assert current_user in session
+    assert current_user.user_name == "Yennefer"
+
+    current_user.user_name = "Yen"
+    await session.commit()
+    assert (
+        await session.scalar(
+            select(User.user_name).where(User.user_id == cached_user_id)
+        )
+        == "Yen"
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_delete_current_user_invalidates_cached_user(
+    client: AsyncClient,
+    session: AsyncSession,
+) -> None:
+    user = await add_user(session)
+    cache_user(str(user.user_id), user)
+    session.expunge(user)
+    token = create_jwt_token(str(user.user_id)).access_token
+
+    response = await client.delete(
+        app.url_path_for("delete_current_user"),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert get_user_cache().get(str(cached_user_id)) is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_listener_drops_entry_notified_by_other_worker(
+    session: AsyncSession,
+) -> None:
+    async with listen_notifications():
+        get_user_cache().set("42", {"user_id": 42})
+
+        async with database_session.get_async_engine().connect() as connection:
+            await connection.execute(select(func.pg_notify(USER_CACHE_CHANNEL, "42")))
+            await connection.commit()
+
+        for _ in range(50):
+            if get_user_cache().get("42") is None:
+                break
+            await asyncio.sleep(0.01)
+
+    assert get_user_cache().get("42") is None
@@ -0,0 +1,182 @@
+import json
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app
+from app.models import Application, Car, Client, Status
+
+# client row whose phone collides with default client, never imported
+PHONE_TAKEN_CLIENT_ID = 2
+
+
+def ndjson(*rows: object) -> bytes:
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows).encode()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_import_clients_upserts_and_reports_rejected_rows(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_client: Client,
+) -> None:
+    rows = (
+        {"client_id": 1, "user_name": "old name", "phone": "+1"},
+        "{not json",
+        {"client_id": "abc", "phone": "+2"},
+        {"client_id": 1, "user_name": "new name", "phone": "+1"},
+        {"client_id": PHONE_TAKEN_CLIENT_ID, "phone": default_client.phone},
+        {"client_id": default_client.client_id, "user_name": "Ciri", "phone": "+3"},
+    )
+    rejected_lines = [1, 2, 3, 5]
+
+    response = await staff_client.post(
+        app.url_path_for("bulk_import", kind="clients"),
+        content=ndjson(*rows),
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["received"] == len(rows)
+    assert report["imported"] == len(rows) - len(rejected_lines)
+    assert report["rejected_total"] == len(rejected_lines)
+    assert [r["line"] for r in report["rejected"]] == rejected_lines
+    assert report["rejected"][0]["error"] == "client_id repeated later in file"
+    assert report["rejected"][3]["error"] == "phone used by another client"
+
+    clients = {
+        c.client_id: c
+        for c in await session.scalars(
+            select(Client).execution_options(populate_existing=True)
+        )
+    }
+    assert clients[1].user_name == "new name"
+    assert clients[default_client.client_id].user_name == "Ciri"
+    assert clients[default_client.client_id].phone == "+3"
+    assert PHONE_TAKEN_CLIENT_ID not in clients
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_import_cars_from_csv_skips_existing_plates(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    csv_body = "\n".join(
+        [
+            "client_id,brand,model,number,year",
+            f"{default_car.client_id},Lada,Vesta,a123bc77,2020",
+            f"{default_car.client_id},Kia,Rio,В777ОР99,2018",
+            f"{default_car.client_id},Kia,Rio,b 777 op 99,2018",
+            "404,Kia,Rio,X001XX01,2018",
+        ]
+    ).encode()
+
+    response = await staff_client.post(
+        app.url_path_for("bulk_import", kind="cars"),
+        params={"format": "csv"},
+        content=csv_body,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["imported"] == 1
+    assert {r["line"]: r["error"] for r in report["rejected"]} == {
+        2: "car already exists",
+        4: "car repeated in file",
+        5: "client not found",
+    }
+    assert (
+        await session.scalar(
+            select(func.count()).where(Car.client_id == default_car.client_id)
+        )
+        == 1 + report["imported"]
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_import_apps_rejects_car_of_other_client(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    response = await staff_client.post(
+        app.url_path_for("bulk_import", kind="apps"),
+        content=ndjson(
+            {"client_id": default_car.client_id, "car_id": default_car.id, "conn": 1},
+            {"client_id": 404, "car_id": default_car.id, "conn": 1},
+        ),
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["imported"] == 1
+    assert response.json()["rejected"] == [
+        {"line": 2, "error": "car not found for client"}
+    ]
+    imported = await session.scalar(
+        select(Application).where(Application.car_id == default_car.id)
+    )
+    assert imported is not None
+    assert imported.status == Status.WAITING
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_import_apps_from_csv_keeps_multiline_problem(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    csv_body = "\n".join(
+        [
+            "client_id,car_id,problem,conn",
+            f'{default_car.client_id},{default_car.id},"knocks,\n\nwhen ""cold""",1',
+            "",
+            f"404,{default_car.id},brakes,1",
+            f'{default_car.client_id},{default_car.id},"never closed,1',
+        ]
+    ).encode()
+
+    response = await staff_client.post(
+        app.url_path_for("bulk_import", kind="apps"),
+        params={"format": "csv"},
+        content=csv_body,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["imported"] == 1
+    assert {r["line"]: r["error"] for r in report["rejected"]} == {
+        6: "car not found for client",
+        7: "unterminated quoted field",
+    }
+    imported = await session.scalar(
+        select(Application).where(Application.car_id == default_car.id)
+    )
+    assert imported is not None
+    assert imported.problem == 'knocks,\n\nwhen "cold"'
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_import_apps_rejects_deleted_car(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    default_car.is_deleted = True
+    await session.commit()
+
+    response = await staff_client.post(
+        app.url_path_for("bulk_import", kind="apps"),
+        content=ndjson(
+            {"client_id": default_car.client_id, "car_id": default_car.id, "conn": 1},
+        ),
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["imported"] == 0
+    assert response.json()["rejected"] == [
+        {"line": 1, "error": "car not found for client"}
+    ]
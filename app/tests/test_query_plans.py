@@ -0,0 +1,167 @@
+import json
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database_session
+from app.main import app
+from app.models import Application
+
+# Every case is (route name, builder of path params and query params, indexes
+# the plan must use). Test seeds SEED_ROWS rows per table, calls the endpoint,
+# captures every SELECT it sends to postgres and runs EXPLAIN on it with
+# enable_seqscan=off. Any Seq Scan means there is no usable index at all, and
+# missing expected index means the query went to a full scan of another one.
+# Plate search is a substring match, served by the trigram index only where
+# pg_trgm is installed (see app/core/plates.py), here only its join is checked.
+PlanCase = tuple[
+    str,
+    Callable[[Application], tuple[dict[str, Any], dict[str, Any]]],
+    set[str],
+]
+
+APP_DETAIL_INDEXES = {"application_pkey", "car_pkey", "client_account_pkey"}
+
+PLAN_CASES: list[PlanCase] = [
+    (
+        "check_client",
+        lambda a: ({}, {"client_id": a.client_id}),
+        {"client_account_pkey"},
+    ),
+    (
+        "my_car",
+        lambda a: ({"client_id": a.client_id}, {}),
+        {"ix_car_client_id_not_deleted"},
+    ),
+    (
+        "get_apps",
+        lambda a: ({}, {"client_id": a.client_id}),
+        {"ix_application_client_id_created_at"},
+    ),
+    (
+        "get_app_car",
+        lambda a: ({}, {"car_id": a.car_id}),
+        {"ix_application_car_id_status"},
+    ),
+    ("check_client_car", lambda a: ({}, {"car_id": a.car_id}), {"car_pkey"}),
+    ("start_app", lambda a: ({"app_id": a.id}, {}), APP_DETAIL_INDEXES),
+    ("get_app", lambda a: ({}, {"app_id": a.id}), APP_DETAIL_INDEXES),
+    ("mechanic_get_app", lambda a: ({}, {"app_id": a.id}), APP_DETAIL_INDEXES),
+    ("get_all_apps", lambda a: ({}, {}), {"ix_application_created_at_id"}),
+    (
+        "get_all_apps",
+        lambda a: ({}, {"client_id": a.client_id}),
+        {"ix_application_client_id_created_at"},
+    ),
+    (
+        "get_all_apps",
+        lambda a: ({}, {"plate": "A12"}),
+        {"ix_application_car_id_status"},
+    ),
+    (
+        "get_all_apps",
+        lambda a: ({}, {"status": a.status.value, "priority": a.priority.value}),
+        {"ix_application_created_at_id"},
+    ),
+    ("get_diagnostics", lambda a: ({}, {}), {"ix_user_account_role"}),
+    (
+        "get_free_slots",
+        lambda a: ({}, {"day": "2031-03-17", "days": 7}),
+        {"uq_arrival_booking_slot_start_bay"},
+    ),
+]
+
+
+# rows added around the default application, enough for the intended index
+# to be cheaper than full scan of any other index with a filter
+SEED_ROWS = 5000
+SEED_STATEMENTS = [
+    """INSERT INTO client_account (client_id, user_name, phone)
+    SELECT 800000000 + i, 'client ' || i, '+7800' || i
+    FROM generate_series(1, :rows) AS i""",
+    """INSERT INTO car (client_id, brand, model, number, year, is_deleted)
+    SELECT 800000000 + i, 'Kia', 'Rio', 'X' || i || 'XX', 2020, false
+    FROM generate_series(1, :rows) AS i""",
+    """INSERT INTO application (client_id, car_id, problem, conn, status, priority, created_at)
+    SELECT car.client_id, car.id, 'noise', 1,
+        (enum_range(NULL::status))[1 + car.id % 7], 1 + car.id % 3,
+        '2024-01-01'::timestamptz + car.id * interval '1 hour'
+    FROM car WHERE car.client_id > 800000000""",
+    """INSERT INTO user_account (user_id, role, user_name, hashed_password, phone)
+    SELECT 800000000 + i, CASE WHEN i % 50 = 0 THEN 'DIAGNOSTIC' ELSE 'CLIENT' END::role,
+        'user ' || i, 'hash', '+7801' || i
+    FROM generate_series(1, :rows) AS i""",
+]
+
+
+def plan_nodes(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    nodes = [plan]
+    for subplan in plan.get("Plans", []):
+        nodes += plan_nodes(subplan)
+    return nodes
+
+
+async def seed_rows(session: AsyncSession) -> None:
+    for statement in SEED_STATEMENTS:
+        await session.execute(text(statement), {"rows": SEED_ROWS})
+    await session.execute(
+        text("ANALYZE client_account, car, application, user_account, arrival_booking")
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "case",
+    PLAN_CASES,
+    ids=[f"{name}-{i}" for i, (name, _, _) in enumerate(PLAN_CASES)],
+)
+async def test_endpoint_queries_use_their_indexes(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_app: Application,
+    case: PlanCase,
+) -> None:
+    route_name, build_params, indexes = case
+    await seed_rows(session)
+    captured: list[tuple[str, Any]] = []
+
+    def capture(*args: Any) -> None:
+        # before_cursor_execute(conn, cursor, statement, parameters, ...)
+        statement, parameters = args[2], args[3]
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    sync_engine = database_session.get_async_engine().sync_engine
+    path_params, query_params = build_params(default_app)
+
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await staff_client.get(
+            app.url_path_for(route_name, **path_params), params=query_params
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert captured, "endpoint did not run any SELECT"
+
+    connection = await session.connection()
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    used_indexes: set[str] = set()
+    for statement, parameters in captured:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = plan_nodes(plan[0]["Plan"])
+        seq_scans = [n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"]
+        assert seq_scans == [], statement
+        used_indexes |= {n["Index Name"] for n in nodes if "Index Name" in n}
+    assert indexes <= used_indexes
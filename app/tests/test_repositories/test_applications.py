@@ -0,0 +1,125 @@
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import api_messages
+from app.core import database_session
+from app.main import app
+from app.models import Application, Car, Priority
+from app.repositories.applications import find_app_detail
+from app.tests.conftest import create_apps
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_find_app_detail_joins_car_and_client_in_one_statement(
+    session: AsyncSession,
+    default_app: Application,
+    default_car: Car,
+) -> None:
+    statements: list[str] = []
+
+    def capture(*args: Any) -> None:
+        statements.append(args[2])
+
+    sync_engine = database_session.get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        app_detail = await find_app_detail(default_app.id, session)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert len(statements) == 1
+    assert app_detail is not None
+    assert app_detail["app_id"] == default_app.id
+    assert app_detail["number"] == default_car.number
+    assert app_detail["phone"] == "+79990000000"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_find_app_detail_returns_none_for_missing_app(
+    session: AsyncSession,
+) -> None:
+    assert await find_app_detail(-1, session) is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "route_name,in_path,detail",
+    [
+        ("start_app", True, "Заявка не найдена"),
+        ("get_app", False, api_messages.APPLICATION_NOT_FOUND),
+        ("mechanic_get_app", False, api_messages.APPLICATION_NOT_FOUND),
+    ],
+)
+async def test_app_detail_endpoints_return_404_for_missing_app(
+    staff_client: AsyncClient,
+    route_name: str,
+    in_path: bool,
+    detail: str,
+) -> None:
+    if in_path:
+        response = await staff_client.get(app.url_path_for(route_name, app_id=-1))
+    else:
+        response = await staff_client.get(
+            app.url_path_for(route_name), params={"app_id": -1}
+        )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": detail}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "route_name,in_path",
+    [("start_app", True), ("get_app", False), ("mechanic_get_app", False)],
+)
+async def test_app_detail_endpoints_return_application(
+    staff_client: AsyncClient,
+    default_app: Application,
+    route_name: str,
+    in_path: bool,
+) -> None:
+    if in_path:
+        response = await staff_client.get(
+            app.url_path_for(route_name, app_id=default_app.id)
+        )
+    else:
+        response = await staff_client.get(
+            app.url_path_for(route_name), params={"app_id": default_app.id}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["client_id"] == default_app.client_id
+    assert response.json()["car_id"] == default_app.car_id
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_priority_is_stored_and_sorted_by_value(
+    session: AsyncSession,
+    default_car: Car,
+) -> None:
+    apps = await create_apps(session, default_car, 2)
+    await session.execute(
+        update(Application)
+        .where(Application.id == apps[0].id)
+        .values(priority=Priority.MEDIUM)
+    )
+
+    stored = await session.execute(
+        text(
+            "SELECT id, priority FROM application WHERE car_id = :car_id ORDER BY priority"
+        ),
+        {"car_id": default_car.id},
+    )
+    assert [tuple(row) for row in stored] == [(apps[1].id, 1), (apps[0].id, 2)]
+
+    by_priority = await session.scalars(
+        select(Application.priority)
+        .where(Application.car_id == default_car.id)
+        .order_by(Application.priority)
+    )
+    assert list(by_priority) == [Priority.HIGH, Priority.MEDIUM]
@@ -0,0 +1,112 @@
+import hashlib
+import time
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import api_messages
+from app.models import RefreshToken, Role, User
+from app.repositories.refresh_tokens import (
+    create_refresh_token,
+    hash_refresh_token,
+    purge_refresh_tokens,
+    use_refresh_token,
+)
+
+token_user_id = 700100400
+token_hash_length = hashlib.sha256().digest_size
+
+
+async def add_user(session: AsyncSession) -> User:
+    user = User(
+        user_id=token_user_id,
+        role=Role.CLIENT,
+        hashed_password="hash",
+        phone="+79990000004",
+    )
+    session.add(user)
+    await session.commit()
+    return user
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_refresh_token_is_stored_as_hash_and_used_once(
+    session: AsyncSession,
+) -> None:
+    await add_user(session)
+    refresh_token, exp = create_refresh_token(session, token_user_id)
+    await session.commit()
+
+    stored = await session.scalar(select(RefreshToken))
+    assert stored is not None
+    assert stored.token_hash == hash_refresh_token(refresh_token)
+    assert len(stored.token_hash) == token_hash_length
+    assert stored.exp == exp
+
+    assert await use_refresh_token(session, refresh_token) == (
+        token_user_id,
+        Role.CLIENT,
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        await use_refresh_token(session, refresh_token)
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    assert exc_info.value.detail == api_messages.REFRESH_TOKEN_ALREADY_USED
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_use_refresh_token_reports_expired_and_unknown_token(
+    session: AsyncSession,
+) -> None:
+    await add_user(session)
+    session.add(
+        RefreshToken(
+            user_id=token_user_id,
+            token_hash=hash_refresh_token("expired"),
+            exp=int(time.time()) - 1,
+        )
+    )
+    await session.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await use_refresh_token(session, "expired")
+    assert exc_info.value.detail == api_messages.REFRESH_TOKEN_EXPIRED
+
+    with pytest.raises(HTTPException) as exc_info:
+        await use_refresh_token(session, "unknown")
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_purge_refresh_tokens_deletes_used_and_expired_in_batches(
+    session: AsyncSession,
+) -> None:
+    await add_user(session)
+    now = int(time.time())
+    tokens = [
+        ("live", now + 1000, False),
+        ("used", now + 1000, True),
+        ("expired-1", now - 1, False),
+        ("expired-2", now - 1, False),
+        ("expired-used", now - 1, True),
+    ]
+    session.add_all(
+        [
+            RefreshToken(
+                user_id=token_user_id,
+                token_hash=hash_refresh_token(name),
+                exp=exp,
+                used=used,
+            )
+            for name, exp, used in tokens
+        ]
+    )
+    await session.commit()
+
+    # more purgeable tokens than batch size, so several batches are run
+    purgeable = [name for name, exp, used in tokens if used or exp < now]
+    assert await purge_refresh_tokens(session, batch_size=2) == len(purgeable)
+    assert list(await session.scalars(select(RefreshToken.token_hash))) == [
+        hash_refresh_token("live")
+    ]
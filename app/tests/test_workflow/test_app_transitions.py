@@ -0,0 +1,186 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import api_messages
+from app.core import database_session
+from app.main import app
+from app.models import Application, Priority, Status, User
+
+
+@dataclass(frozen=True)
+class Transition:
+    route_name: str
+    from_status: Status
+    body: dict[str, Any]
+    # fields of application after the transition
+    expected: dict[str, Any] = field(default_factory=dict)
+
+    def request_body(self, diag_user: User) -> dict[str, Any]:
+        # admin assigns diagnostic together with approval
+        if self.route_name == "adminapply_app":
+            return {**self.body, "diag_id": diag_user.user_id}
+        return self.body
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "transition",
+    [
+        Transition(
+            "adminapply_app",
+            Status.WAITING,
+            {
+                "admin_comment": "ok",
+                "status": Status.CARWAITING.value,
+                "priority": Priority.HIGH.value,
+            },
+            {
+                "admin_comment": "ok",
+                "status": Status.CARWAITING,
+                "priority": Priority.HIGH,
+            },
+        ),
+        Transition(
+            "adminreject_app",
+            Status.WAITING,
+            {"admin_comment": "no", "status": Status.REJECTED.value},
+            {"admin_comment": "no", "status": Status.REJECTED},
+        ),
+        Transition(
+            "diag_finish",
+            Status.DIAGNOSTIC,
+            {
+                "diag_comment": "spark plugs",
+                "status": Status.REPAIR.value,
+                "diag_price": 1500,
+            },
+            {
+                "diag_comment": "spark plugs",
+                "status": Status.REPAIR,
+                "diag_price": 1500,
+            },
+        ),
+        Transition(
+            "mechanic_finish_app",
+            Status.REPAIR,
+            {
+                "mechanic_comment": "replaced",
+                "status": Status.READY.value,
+                "mechanic_price": 4000,
+            },
+            {
+                "mechanic_comment": "replaced",
+                "status": Status.READY,
+                "mechanic_price": 4000,
+            },
+        ),
+    ],
+    ids=lambda transition: transition.route_name,
+)
+async def test_app_transition_is_single_update_returning(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_app: Application,
+    diag_user: User,
+    transition: Transition,
+) -> None:
+    default_app.status = transition.from_status
+    await session.commit()
+    statements: list[str] = []
+
+    def capture(*args: Any) -> None:
+        statements.append(args[2])
+
+    sync_engine = database_session.get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await staff_client.post(
+            app.url_path_for(transition.route_name),
+            params={"app_id": default_app.id},
+            json=transition.request_body(diag_user),
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE application")
+    assert "RETURNING" in statements[0]
+
+    updated_app = await session.get(Application, default_app.id)
+    assert updated_app is not None
+    for name, value in transition.expected.items():
+        assert getattr(updated_app, name) == value
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_app_transition_returns_404_for_missing_app(
+    staff_client: AsyncClient,
+) -> None:
+    response = await staff_client.post(
+        app.url_path_for("adminreject_app"),
+        params={"app_id": -1},
+        json={"status": Status.REJECTED.value},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": api_messages.APPLICATION_NOT_FOUND}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "transition",
+    [
+        Transition(
+            "adminapply_app",
+            Status.COMPLETED,
+            {"status": Status.WAITING.value, "priority": Priority.LOW.value},
+        ),
+        Transition(
+            "adminapply_app",
+            Status.WAITING,
+            {"status": Status.DIAGNOSTIC.value, "priority": Priority.LOW.value},
+        ),
+        Transition(
+            "adminreject_app", Status.COMPLETED, {"status": Status.REJECTED.value}
+        ),
+        Transition(
+            "diag_finish",
+            Status.CARWAITING,
+            {"status": Status.REPAIR.value, "diag_price": 1500},
+        ),
+        Transition(
+            "mechanic_finish_app",
+            Status.DIAGNOSTIC,
+            {"status": Status.READY.value, "mechanic_price": 4000},
+        ),
+    ],
+    ids=lambda transition: f"{transition.route_name}-{transition.from_status.value}",
+)
+async def test_app_transition_outside_of_status_graph_is_refused(
+    staff_client: AsyncClient,
+    session: AsyncSession,
+    default_app: Application,
+    diag_user: User,
+    transition: Transition,
+) -> None:
+    default_app.status = transition.from_status
+    await session.commit()
+
+    response = await staff_client.post(
+        app.url_path_for(transition.route_name),
+        params={"app_id": default_app.id},
+        json=transition.request_body(diag_user),
+    )
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json() == {"detail": api_messages.INVALID_STATUS_TRANSITION}
+    db_app = await session.get(Application, default_app.id, populate_existing=True)
+    assert db_app is not None
+    assert db_app.status == transition.from_status
@@ -0,0 +1,213 @@
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import api_messages
+from app.core import database_session
+from app.core.security.jwt import create_jwt_token
+from app.main import app
+from app.models import Application, Car, Client, Priority, Role, Status, User
+from app.repositories.applications import DIAGNOSTIC_QUEUE, claim_next_app
+
+start = datetime(2025, 1, 1, tzinfo=UTC)
+# committed by concurrency test, far from ids of fixtures
+CONCURRENT_CLIENT_ID = 700100900
+
+
+def queue_apps(car: Car, diag_id: int | None = None) -> list[Application]:
+    # claim order is marked, other status ones are never claimed
+    def app(
+        priority: Priority,
+        hours: int,
+        arrival_hours: int | None = None,
+        app_status: Status = Status.DIAGNOSTIC,
+        assigned_to: int | None = None,
+    ) -> Application:
+        return Application(
+            client_id=car.client_id,
+            car_id=car.id,
+            problem=f"{priority.name} {hours}",
+            conn=1,
+            status=app_status,
+            priority=priority,
+            diag_id=assigned_to,
+            arrival_time=None
+            if arrival_hours is None
+            else start + timedelta(hours=arrival_hours),
+            created_at=start + timedelta(hours=hours),
+        )
+
+    return [
+        app(Priority.LOW, 0, arrival_hours=1),  # 5
+        app(Priority.HIGH, 5, arrival_hours=3),  # 2
+        app(Priority.HIGH, 1),  # 3, no arrival time goes last
+        app(Priority.HIGH, 6, arrival_hours=2),  # 1
+        app(Priority.MEDIUM, 2, arrival_hours=9),  # 4
+        app(Priority.HIGH, 0, app_status=Status.REPAIR),
+        app(Priority.HIGH, 0, app_status=Status.WAITING),
+        *([app(Priority.HIGH, 0, assigned_to=diag_id)] if diag_id else []),
+    ]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_diag_claim_next_takes_most_urgent_unassigned_application(
+    client: AsyncClient,
+    session: AsyncSession,
+    default_car: Car,
+    diag_user: User,
+) -> None:
+    apps = queue_apps(default_car, diag_id=diag_user.user_id)
+    session.add_all(apps)
+    await session.commit()
+    token = create_jwt_token(str(diag_user.user_id), role=Role.DIAGNOSTIC).access_token
+
+    claimed = []
+    for _ in range(5):
+        response = await client.post(
+            app.url_path_for("diag_claim_next"),
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        claimed.append(response.json()["app_id"])
+
+    assert claimed == [apps[3].id, apps[1].id, apps[2].id, apps[4].id, apps[0].id]
+    for app_id in claimed:
+        db_app = await session.get(Application, app_id, populate_existing=True)
+        assert db_app is not None
+        assert db_app.diag_id == diag_user.user_id
+
+    response = await client.post(
+        app.url_path_for("diag_claim_next"),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": api_messages.NO_APPLICATION_TO_CLAIM}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_mechanic_claim_next_is_forbidden_for_diagnostic(
+    client: AsyncClient,
+    diag_user: User,
+) -> None:
+    token = create_jwt_token(str(diag_user.user_id), role=Role.DIAGNOSTIC).access_token
+
+    response = await client.post(
+        app.url_path_for("mechanic_claim_next"),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_claim_next_app_uses_queue_index(
+    session: AsyncSession,
+    default_car: Car,
+    diag_user: User,
+) -> None:
+    session.add_all(queue_apps(default_car))
+    await session.commit()
+    captured: list[tuple[str, Any]] = []
+
+    def capture(*args: Any) -> None:
+        captured.append((args[2], args[3]))
+
+    sync_engine = database_session.get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await claim_next_app(session, DIAGNOSTIC_QUEUE, diag_user.user_id)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    [(statement, parameters)] = captured
+    connection = await session.connection()
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    await connection.exec_driver_sql("SET LOCAL enable_sort = off")
+    plan = (
+        await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+    ).scalar_one()
+    if not isinstance(plan, str):
+        plan = json.dumps(plan)
+    assert "ix_application_diag_queue" in plan
+    assert '"Sort"' not in plan
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_claims_skip_locked_application(
+    session: AsyncSession,
+) -> None:
+    # committed rows and two real transactions, test session is rolled back
+    engine = database_session.get_async_engine()
+    first_connection = await engine.connect()
+    second_connection = await engine.connect()
+    first = AsyncSession(bind=first_connection, expire_on_commit=False)
+    second = AsyncSession(bind=second_connection, expire_on_commit=False)
+    user_ids = (700100900, 700100901)
+    try:
+        first.add_all(
+            [
+                User(
+                    user_id=user_id,
+                    role=Role.DIAGNOSTIC,
+                    hashed_password="x",
+                    phone=f"+7999000090{i}",
+                )
+                for i, user_id in enumerate(user_ids)
+            ]
+        )
+        first.add(Client(client_id=CONCURRENT_CLIENT_ID, phone="+79990000909"))
+        await first.flush()
+        car = Car(
+            client_id=CONCURRENT_CLIENT_ID,
+            brand="Lada",
+            model="Niva",
+            number="B900BB",
+            year=2019,
+        )
+        first.add(car)
+        await first.flush()
+        apps = queue_apps(car)[1:3]
+        first.add_all(apps)
+        await first.commit()
+
+        claimed_first = await claim_next_app(first, DIAGNOSTIC_QUEUE, user_ids[0])
+        # first transaction still holds its row lock, second must not wait for it
+        claimed_second = await asyncio.wait_for(
+            claim_next_app(second, DIAGNOSTIC_QUEUE, user_ids[1]), timeout=2
+        )
+        claimed_third = await asyncio.wait_for(
+            claim_next_app(second, DIAGNOSTIC_QUEUE, user_ids[1]), timeout=2
+        )
+        await first.commit()
+        await second.commit()
+    finally:
+        await first.rollback()
+        await second.rollback()
+        for model, where in (
+            (Application, Application.client_id == CONCURRENT_CLIENT_ID),
+            (Car, Car.client_id == CONCURRENT_CLIENT_ID),
+            (Client, Client.client_id == CONCURRENT_CLIENT_ID),
+            (User, User.user_id.in_(user_ids)),
+        ):
+            await first.execute(delete(model).where(where))
+        await first.commit()
+        for db_session, connection in (
+            (first, first_connection),
+            (second, second_connection),
+        ):
+            await db_session.close()
+            await connection.close()
+
+    assert claimed_first is not None and claimed_second is not None
+    assert claimed_first["app_id"] == apps[0].id
+    assert claimed_second["app_id"] == apps[1].id
+    assert claimed_third is None
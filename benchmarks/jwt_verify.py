@@ -0,0 +1,61 @@
+# Microbenchmark of per request access token verification
+#
+# Compares verify_jwt_token as it was before verified tokens memo (settings
+# read twice, jwt.decode and new pydantic payload on every call), current
+# verify_jwt_token on memo miss and on memo hit (the same token sent again,
+# which is the common case for a logged in client).
+#
+# Usage:
+#
+# python -m benchmarks.jwt_verify
+# python -m benchmarks.jwt_verify --number 200000
+
+
+import argparse
+import timeit
+from collections.abc import Callable
+
+import jwt
+
+from app.core.config import get_settings
+from app.core.security import jwt as app_jwt
+
+
+def legacy_verify_jwt_token(token: str) -> app_jwt.JWTTokenPayload:
+    raw_payload = jwt.decode(
+        token,
+        get_settings().security.jwt_secret_key.get_secret_value(),
+        algorithms=[app_jwt.JWT_ALGORITHM],
+        options={"verify_signature": True},
+        issuer=get_settings().security.jwt_issuer,
+    )
+    return app_jwt.JWTTokenPayload(**raw_payload)
+
+
+def memo_miss(token: str) -> app_jwt.JWTTokenPayload:
+    app_jwt._get_jwt_config().verified.clear()
+    return app_jwt.verify_jwt_token(token)
+
+
+def measure(fn: Callable[[str], object], token: str, number: int) -> float:
+    best = min(timeit.repeat(lambda: fn(token), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main(number: int) -> None:
+    token = app_jwt.create_jwt_token("1").access_token
+
+    results = [
+        ("before (no memo)", measure(legacy_verify_jwt_token, token, number)),
+        ("after, memo miss", measure(memo_miss, token, number)),
+        ("after, memo hit", measure(app_jwt.verify_jwt_token, token, number)),
+    ]
+    baseline = results[0][1]
+    for name, usecs in results:
+        print(f"{name:<20} {usecs:8.2f} us/call  {baseline / usecs:6.1f}x")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Access token verification benchmark")
+    parser.add_argument("--number", type=int, default=20_000)
+    main(parser.parse_args().number)